@@ -2,15 +2,25 @@
 Markets API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import requests
+from datetime import datetime
+from types import SimpleNamespace
+import asyncio
 import json
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
-from poly_data.rate_limiter import get_rate_limiter
-from database import get_db, Market, TradingParams
+from services.change_bus import record_market_changes, record_market_changes_async
+from services.gamma_cache import get_gamma_cache
+from services.gamma_mirror import get_gamma_mirror
+from services.ingest_pipeline import IngestPipeline
+from database import (
+    get_db, get_async_db, Market, TradingParams, Position, Order,
+    DailyMarketStats, MarketPnlTotals
+)
 from schemas import (
     MarketCreate, MarketUpdate, MarketResponse, MarketWithConfig,
     TradingParamsCreate, TradingParamsUpdate, TradingParamsResponse,
@@ -27,7 +37,8 @@ fetch_progress = {
     "total_saved": 0,
     "error": None,
     "started_at": None,
-    "completed_at": None
+    "completed_at": None,
+    "stages": None  # per-stage counters of the streaming fetch pipeline
 }
 
 # IMPORTANT: More specific routes must come before less specific ones
@@ -85,7 +96,8 @@ async def fetch_all_markets(
             "total_saved": 0,
             "error": None,
             "started_at": datetime.utcnow().isoformat(),
-            "completed_at": None
+            "completed_at": None,
+            "stages": None
         })
         
         # Start background task (don't pass db session, create new one in background task)
@@ -139,7 +151,8 @@ async def fetch_crypto_markets(
         "total_saved": 0,
         "error": None,
         "started_at": datetime.utcnow().isoformat(),
-        "completed_at": None
+        "completed_at": None,
+        "stages": None
     })
     
     # Start background task (don't pass db session, create new one in background task)
@@ -158,22 +171,22 @@ async def get_markets(
     category: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = Query(None, description="Search query to filter markets by question"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all markets with optional filtering and search"""
-    query = db.query(Market)
+    query = select(Market)
     
     if category:
-        query = query.filter(Market.category == category)
+        query = query.where(Market.category == category)
     if is_active is not None:
-        query = query.filter(Market.is_active == is_active)
+        query = query.where(Market.is_active == is_active)
     if search:
         # Case-insensitive search in question field
         search_term = f"%{search}%"
-        query = query.filter(Market.question.ilike(search_term))
+        query = query.where(Market.question.ilike(search_term))
     
-    markets = query.offset(skip).limit(limit).all()
-    return markets
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/search", response_model=List[MarketResponse])
 async def search_markets(
@@ -181,22 +194,57 @@ async def search_markets(
     category: Optional[str] = None,
     is_active: Optional[bool] = None,
     limit: int = Query(default=100, le=1000),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search markets by question, category, and active status"""
-    query = db.query(Market)
-    
     # Search in question field (case-insensitive)
     search_term = f"%{q}%"
-    query = query.filter(Market.question.ilike(search_term))
+    query = select(Market).where(Market.question.ilike(search_term))
     
     if category:
-        query = query.filter(Market.category == category)
+        query = query.where(Market.category == category)
     if is_active is not None:
-        query = query.filter(Market.is_active == is_active)
+        query = query.where(Market.is_active == is_active)
     
-    markets = query.limit(limit).all()
-    return markets
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+async def _mirror_for_lookups():
+    """
+    The Gamma mirror if it is fresh enough to answer slug lookups, else None.
+    A stale mirror that has completed a sync before is refreshed in the background.
+    """
+    mirror = get_gamma_mirror()
+    # The mirror's SQLite reads run in a worker thread, off the event loop
+    if await asyncio.to_thread(mirror.is_fresh):
+        return mirror
+    if await asyncio.to_thread(mirror.last_synced) is not None:
+        mirror.refresh_in_background()
+    return None
+
+
+async def _event_by_slug(slug: str):
+    """(status, event) from the Gamma mirror, falling back to Gamma through GammaCache"""
+    mirror = await _mirror_for_lookups()
+    if mirror is not None:
+        event = await asyncio.to_thread(mirror.event_by_slug, slug)
+        if event is not None:
+            return 200, event
+    url = f"https://gamma-api.polymarket.com/events/slug/{slug}"
+    return await get_gamma_cache().get_json_async(url, endpoint='gamma_events')
+
+
+async def _market_by_slug(slug: str):
+    """(status, market) from the Gamma mirror, falling back to Gamma through GammaCache"""
+    mirror = await _mirror_for_lookups()
+    if mirror is not None:
+        found = await asyncio.to_thread(mirror.market_by_slug, slug)
+        if found is not None:
+            return 200, found[0]
+    url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
+    # Cached, coalesced and rate limited (gamma_markets) by GammaCache
+    return await get_gamma_cache().get_json_async(url, endpoint='gamma_markets')
+
 
 @router.get("/slug/{slug}/all")
 async def get_all_markets_by_slug(slug: str):
@@ -218,14 +266,9 @@ async def get_all_markets_by_slug(slug: str):
         market_service = MarketService()
         
         # Fetch from events endpoint
-        url = f"https://gamma-api.polymarket.com/events/slug/{slug}"
-        rate_limiter = get_rate_limiter()
-        rate_limiter.wait_if_needed_sync('gamma_events')
-        response = requests.get(url, timeout=10)
-        rate_limiter.record_request('gamma_events')
-        
-        if response.status_code == 200:
-            event_data = response.json()
+        status, event_data = await _event_by_slug(slug)
+        
+        if status == 200:
             
             # Handle different response formats
             if isinstance(event_data, dict):
@@ -301,14 +344,9 @@ async def get_all_markets_by_slug(slug: str):
                 }
         
         # Try market endpoint as fallback
-        url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-        rate_limiter = get_rate_limiter()
-        rate_limiter.wait_if_needed_sync('gamma_markets')
-        response = requests.get(url, timeout=10)
-        rate_limiter.record_request('gamma_markets')
-        
-        if response.status_code == 200:
-            market_data = response.json()
+        status, market_data = await _market_by_slug(slug)
+        
+        if status == 200:
             
             if isinstance(market_data, dict):
                 market = market_data.get('data', market_data)
@@ -471,15 +509,9 @@ async def get_market_by_slug(slug: str):
         market_service = MarketService()
         
         # Try to fetch from events endpoint first (events contain markets)
-        url = f"https://gamma-api.polymarket.com/events/slug/{slug}"
-        # Apply rate limiting for GAMMA events endpoint (100 requests / 10s)
-        rate_limiter = get_rate_limiter()
-        rate_limiter.wait_if_needed_sync('gamma_events')
-        response = requests.get(url, timeout=10)
-        rate_limiter.record_request('gamma_events')
-        
-        if response.status_code == 200:
-            event_data = response.json()
+        status, event_data = await _event_by_slug(slug)
+        
+        if status == 200:
             
             # Handle different response formats
             if isinstance(event_data, dict):
@@ -666,15 +698,9 @@ async def get_market_by_slug(slug: str):
                     }
         
         # If event not found, try market endpoint
-        url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-        # Apply rate limiting for GAMMA markets endpoint (125 requests / 10s)
-        rate_limiter = get_rate_limiter()
-        rate_limiter.wait_if_needed_sync('gamma_markets')
-        response = requests.get(url, timeout=10)
-        rate_limiter.record_request('gamma_markets')
-        
-        if response.status_code == 200:
-            market_data = response.json()
+        status, market_data = await _market_by_slug(slug)
+        
+        if status == 200:
             
             if isinstance(market_data, dict):
                 market = market_data.get('data', market_data)
@@ -812,6 +838,7 @@ async def create_market(market: MarketCreate, db: Session = Depends(get_db)):
             default_params = TradingParams(market_id=db_market.id)
             db.add(default_params)
         
+        record_market_changes(db, [db_market])
         db.commit()
         db.refresh(db_market)
         
@@ -848,6 +875,12 @@ async def update_market(market_id: int, market_update: MarketUpdate, db: Session
         for key, value in update_data.items():
             setattr(db_market, key, value)
         
+        changed = [db_market]
+        if (old_token1, old_token2, old_condition_id) != (db_market.token1, db_market.token2, db_market.condition_id):
+            # Let subscribers drop the old identifiers too
+            changed.append(SimpleNamespace(id=market_id, condition_id=old_condition_id,
+                                           token1=old_token1, token2=old_token2))
+        record_market_changes(db, changed)
         db.commit()
         db.refresh(db_market)
         
@@ -890,6 +923,7 @@ async def delete_market(market_id: int, db: Session = Depends(get_db)):
         token2 = db_market.token2
         condition_id = db_market.condition_id
         
+        record_market_changes(db, [db_market], 'deleted')
         db.delete(db_market)
         db.commit()
         
@@ -913,29 +947,53 @@ async def delete_market(market_id: int, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting market: {str(e)}")
 
+# Tables holding rows that belong to a market. SQLite does not enforce the
+# ON DELETE CASCADE foreign keys, so bulk deletes remove these explicitly.
+MARKET_CHILD_MODELS = (TradingParams, Position, Order, DailyMarketStats, MarketPnlTotals)
+
+
+def _invalidate_market_rows(rows):
+    """Drop cached lookups for the given (token1, token2, condition_id) rows in one call"""
+    if not rows:
+        return
+    try:
+        from services.market_cache_service import get_market_cache_service
+        get_market_cache_service().invalidate_markets(rows)
+    except Exception as e:
+        # Don't fail if cache invalidation fails
+        print(f"Warning: Failed to invalidate cache after bulk operation: {e}")
+
+
 @router.post("/bulk/update")
 async def bulk_update_markets(
     bulk_update: BulkMarketUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Bulk update multiple markets"""
+    """Bulk update multiple markets with a single UPDATE statement"""
     if not bulk_update.market_ids:
         raise HTTPException(status_code=400, detail="No market IDs provided")
     
-    markets = db.query(Market).filter(Market.id.in_(bulk_update.market_ids)).all()
-    if not markets:
-        raise HTTPException(status_code=404, detail="No markets found")
-    
     # Get update data excluding market_ids
-    update_data = bulk_update.model_dump(exclude={'market_ids'}, exclude_unset=True)
-    updated_count = 0
+    update_data = bulk_update.model_dump(mode='json', exclude={'market_ids'}, exclude_unset=True)
+    update_data['updated_at'] = datetime.utcnow()
     
-    for market in markets:
-        for key, value in update_data.items():
-            setattr(market, key, value)
-        updated_count += 1
+    result = await db.execute(
+        update(Market)
+        .where(Market.id.in_(bulk_update.market_ids))
+        .values(**update_data)
+        .returning(Market.id, Market.token1, Market.token2, Market.condition_id)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    if not rows:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="No markets found")
     
-    db.commit()
+    await record_market_changes_async(db, rows)
+    await db.commit()
+    _invalidate_market_rows(rows)
+    
+    updated_count = len(rows)
     return {
         "message": f"Successfully updated {updated_count} market(s)",
         "updated_count": updated_count
@@ -944,22 +1002,40 @@ async def bulk_update_markets(
 @router.post("/bulk/delete")
 async def bulk_delete_markets(
     bulk_delete: BulkMarketDelete,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Bulk delete multiple markets"""
+    """Bulk delete multiple markets and their trading params, positions, orders and stats"""
     if not bulk_delete.market_ids:
         raise HTTPException(status_code=400, detail="No market IDs provided")
     
-    markets = db.query(Market).filter(Market.id.in_(bulk_delete.market_ids)).all()
-    if not markets:
-        raise HTTPException(status_code=404, detail="No markets found")
+    market_ids = bulk_delete.market_ids
+    try:
+        for model in MARKET_CHILD_MODELS:
+            await db.execute(
+                delete(model).where(model.market_id.in_(market_ids))
+                .execution_options(synchronize_session=False)
+            )
+        result = await db.execute(
+            delete(Market)
+            .where(Market.id.in_(market_ids))
+            .returning(Market.id, Market.token1, Market.token2, Market.condition_id)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        if not rows:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="No markets found")
+        await record_market_changes_async(db, rows, 'deleted')
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error deleting markets: {str(e)}")
     
-    deleted_count = 0
-    for market in markets:
-        db.delete(market)
-        deleted_count += 1
+    _invalidate_market_rows(rows)
     
-    db.commit()
+    deleted_count = len(rows)
     return {
         "message": f"Successfully deleted {deleted_count} market(s)",
         "deleted_count": deleted_count
@@ -1059,18 +1135,176 @@ async def update_market_config(
     for key, value in update_data.items():
         setattr(market.trading_params, key, value)
     
+    # The bot picks this up from the change log instead of its 30s poll
+    record_market_changes(db, [market], 'config')
     db.commit()
     db.refresh(market.trading_params)
     return market.trading_params
 
+# ============ Bulk market upsert ============
+
+# Market columns accepted from fetched market data
+MARKET_UPSERT_FIELDS = (
+    'condition_id', 'question', 'answer1', 'answer2',
+    'token1', 'token2', 'market_slug', 'neg_risk',
+    'best_bid', 'best_ask', 'spread', 'category'
+)
+_REQUIRED_MARKET_FIELDS = ('condition_id', 'question', 'answer1', 'answer2', 'token1', 'token2')
+
+
+def _dialect_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's database"""
+    if db.bind.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _upsert_market_rows(db: Session, rows: List[dict], insert_only: tuple = ()):
+    """
+    Upsert market rows and create missing default trading params.
+
+    Issues one INSERT ... ON CONFLICT(condition_id) DO UPDATE per distinct
+    column set (normally one per batch), updating only markets whose values
+    changed, and one INSERT ... SELECT ... ON CONFLICT(market_id) DO NOTHING
+    for trading params. Does not commit.
+
+    Args:
+        rows: Market dicts keyed by Market column names
+        insert_only: Columns written for new markets but left unchanged on existing ones
+    """
+    insert = _dialect_insert(db)
+    now = datetime.utcnow()
+
+    by_columns = {}
+    for row in rows:
+        by_columns.setdefault(tuple(sorted(row)), []).append(row)
+
+    for columns, group in by_columns.items():
+        stmt = insert(Market)
+        changes = {
+            column: stmt.excluded[column] for column in columns
+            if column != 'condition_id' and column not in insert_only
+        }
+        if not changes:
+            db.execute(stmt.on_conflict_do_nothing(index_elements=['condition_id']), group)
+            continue
+        # Only rows whose values differ are touched, so updated_at keeps
+        # driving the incremental market loaders
+        changed = or_(*(Market.__table__.c[column].is_distinct_from(value) for column, value in changes.items()))
+        changes['updated_at'] = now
+        # executemany: one prepared statement for the whole group
+        db.execute(stmt.on_conflict_do_update(index_elements=['condition_id'], set_=changes, where=changed), group)
+
+    # Default trading params for markets that don't have any yet
+    condition_ids = [row['condition_id'] for row in rows]
+    params_stmt = insert(TradingParams).from_select(
+        ['market_id'],
+        select(Market.id).where(Market.condition_id.in_(condition_ids))
+    ).on_conflict_do_nothing(index_elements=['market_id'])
+    db.execute(params_stmt)
+
+
+def _save_market_batch(batch: List[dict], default_category: str, update_category: bool = True):
+    """
+    Save a batch of fetched markets with set-based upserts and invalidate
+    their cache entries once. Runs in a worker thread with its own session.
+
+    Args:
+        batch: Market dicts from MarketService
+        default_category: Category for markets that don't have one
+        update_category: If False, category is only set when a market is first inserted
+
+    Returns:
+        (saved_count, errors)
+    """
+    from database import SessionLocal
+    from services.market_mapping_service import get_market_mapper
+
+    errors = []
+    rows = {}
+    for market_data in batch:
+        # Only keep fields that exist in Market model
+        row = {k: v for k, v in market_data.items() if k in MARKET_UPSERT_FIELDS}
+        if not update_category or not row.get('category'):
+            row['category'] = default_category
+        missing = [field for field in _REQUIRED_MARKET_FIELDS if not row.get(field)]
+        if missing:
+            errors.append(f"Error saving market {market_data.get('question', 'unknown')}: missing {missing}")
+            continue
+        rows[row['condition_id']] = row  # Later duplicates win
+
+    rows = list(rows.values())
+    if not rows:
+        return 0, errors
+
+    insert_only = () if update_category else ('category',)
+    db = SessionLocal()
+    saved = 0
+    try:
+        try:
+            _upsert_market_rows(db, rows, insert_only)
+            db.commit()
+            saved = len(rows)
+        except Exception as e:
+            # Fall back to one row at a time so a single bad market doesn't drop the batch
+            db.rollback()
+            print(f"Batch upsert failed ({e}), retrying markets individually")
+            for row in rows:
+                try:
+                    _upsert_market_rows(db, [row], insert_only)
+                    db.commit()
+                    saved += 1
+                except Exception as row_error:
+                    db.rollback()
+                    errors.append(f"Error saving market {row.get('question', 'unknown')}: {row_error}")
+    finally:
+        db.close()
+
+    # One cache invalidation for the whole batch
+    try:
+        get_market_mapper().invalidate_many(
+            token_ids=[token for row in rows for token in (row['token1'], row['token2'])],
+            condition_ids=[row['condition_id'] for row in rows],
+        )
+    except Exception as e:
+        print(f"Warning: Failed to invalidate cache: {e}")
+
+    return saved, errors
+
+
+async def _save_markets_in_batches(markets: List[dict], default_category: str,
+                                   update_category: bool, batch_size: int = 1000):
+    """Upsert fetched markets batch by batch off the event loop, updating fetch_progress"""
+    total_saved = 0
+    errors = []
+    for i in range(0, len(markets), batch_size):
+        batch = markets[i:i + batch_size]
+        saved, batch_errors = await asyncio.to_thread(
+            _save_market_batch, batch, default_category, update_category
+        )
+        total_saved += saved
+        errors.extend(batch_errors)
+        fetch_progress["total_processed"] += len(batch)
+        fetch_progress["total_saved"] = total_saved
+        print(f"Processed {min(i + batch_size, len(markets))}/{len(markets)} markets...")
+    return total_saved, errors
+
+
+def _update_fetch_progress(stages: dict):
+    """Copy the ingest pipeline's stage counters into the top-level fetch_progress totals"""
+    fetch_progress["total_fetched"] = stages['categorize']['markets']
+    fetch_progress["total_processed"] = stages['upsert']['processed']
+    fetch_progress["total_saved"] = stages['upsert']['saved']
+    if stages['crawl']['done'] and fetch_progress["status"] == "fetching":
+        fetch_progress["status"] = "processing"
+
+
 async def fetch_and_save_all_markets():
     """Background task to fetch and save all markets with categorization"""
     from services.market_service import MarketService
     from datetime import datetime
-    from database import SessionLocal
-    
-    # Create new database session for background task
-    db = SessionLocal()
     
     try:
         # Initialize market service
@@ -1085,14 +1319,19 @@ async def fetch_and_save_all_markets():
             })
             return
         
-        # Fetch all markets with categorization
+        # Stream crawl -> parse -> categorize -> upsert; markets are saved while the crawl runs
         print("Fetching all markets from Polymarket...")
-        all_markets = await market_service.fetch_all_markets_categorized()
-        
-        fetch_progress["total_fetched"] = len(all_markets)
-        fetch_progress["status"] = "processing"
+        pipeline = IngestPipeline(
+            pages=market_service.iter_recent_event_pages(),
+            parse=market_service.event_market_items,
+            categorize=market_service.categorize_market_items,
+            save=lambda batch: _save_market_batch(batch, 'other', True),
+            on_progress=_update_fetch_progress,
+        )
+        fetch_progress["stages"] = pipeline.stages
+        total_saved, errors = await pipeline.run()
         
-        if not all_markets:
+        if not pipeline.stages['categorize']['markets']:
             fetch_progress.update({
                 "status": "error",
                 "error": "No markets found",
@@ -1100,103 +1339,19 @@ async def fetch_and_save_all_markets():
             })
             return
         
-        print(f"Found {len(all_markets)} markets, saving to database...")
-        
-        # Save to database in batches
-        saved_markets = []
-        errors = []
-        batch_size = 100  # Process 100 markets at a time
-        
-        for i in range(0, len(all_markets), batch_size):
-            batch = all_markets[i:i + batch_size]
-            
-            for market_data in batch:
-                try:
-                    # Filter out fields that don't exist in Market model
-                    valid_fields = {
-                        'condition_id', 'question', 'answer1', 'answer2', 
-                        'token1', 'token2', 'market_slug', 'neg_risk',
-                        'best_bid', 'best_ask', 'spread', 'category'
-                    }
-                    
-                    # Only keep fields that exist in Market model
-                    filtered_data = {
-                        k: v for k, v in market_data.items() 
-                        if k in valid_fields
-                    }
-                    
-                    # Ensure category is set
-                    if 'category' not in filtered_data or not filtered_data['category']:
-                        filtered_data['category'] = 'other'
-                    
-                    # Check if market already exists
-                    existing = db.query(Market).filter(
-                        Market.condition_id == filtered_data.get('condition_id')
-                    ).first()
-                    
-                    if existing:
-                        # Update existing market (including category)
-                        for key, value in filtered_data.items():
-                            if hasattr(existing, key) and key != 'id':
-                                setattr(existing, key, value)
-                        
-                        # Only create trading_params if they don't exist
-                        if not existing.trading_params:
-                            default_params = TradingParams(market_id=existing.id)
-                            db.add(default_params)
-                        
-                        saved_markets.append(existing)
-                    else:
-                        # Create new market with proper category
-                        db_market = Market(**filtered_data)
-                        db.add(db_market)
-                        db.flush()  # Flush to get the ID without committing
-                        
-                        # Verify market_id is set
-                        if db_market.id is None:
-                            raise ValueError(f"Market ID is None after flush for market: {filtered_data.get('question', 'unknown')}")
-                        
-                        # Create default trading params only if they don't exist
-                        existing_params = db.query(TradingParams).filter(TradingParams.market_id == db_market.id).first()
-                        if not existing_params:
-                            default_params = TradingParams(market_id=db_market.id)
-                            db.add(default_params)
-                        
-                        saved_markets.append(db_market)
-                    
-                    fetch_progress["total_processed"] += 1
-                    
-                except Exception as e:
-                    errors.append(f"Error saving market {market_data.get('question', 'unknown')}: {str(e)}")
-                    import traceback
-                    print(f"Full error: {traceback.format_exc()}")
-                    continue
-            
-            # Commit batch
-            try:
-                db.commit()
-                fetch_progress["total_saved"] = len(saved_markets)
-            except Exception as e:
-                db.rollback()
-                print(f"Error committing batch: {e}")
-            
-            # Progress update
-            if (i + batch_size) % 500 == 0 or (i + batch_size) >= len(all_markets):
-                print(f"Processed {min(i + batch_size, len(all_markets))}/{len(all_markets)} markets...")
-        
         if errors:
             print(f"Warning: {len(errors)} errors occurred while saving markets:")
             for error in errors[:5]:  # Print first 5 errors
                 print(f"  - {error}")
         
         fetch_progress.update({
-            "status": "completed" if saved_markets else "error",
-            "total_saved": len(saved_markets),
+            "status": "completed" if total_saved else "error",
+            "total_saved": total_saved,
             "error": f"{len(errors)} errors" if errors else None,
             "completed_at": datetime.utcnow().isoformat()
         })
         
-        print(f"Successfully saved {len(saved_markets)} markets to database")
+        print(f"Successfully saved {total_saved} markets to database")
         
     except Exception as e:
         error_msg = str(e)
@@ -1208,17 +1363,12 @@ async def fetch_and_save_all_markets():
             "error": error_msg,
             "completed_at": datetime.utcnow().isoformat()
         })
-    finally:
-        db.close()
+
 
 async def fetch_and_save_crypto_markets():
     """Background task to fetch and save crypto markets"""
     from services.market_service import MarketService
     from datetime import datetime
-    from database import SessionLocal
-    
-    # Create new database session for background task
-    db = SessionLocal()
     
     try:
         # Initialize market service
@@ -1250,77 +1400,10 @@ async def fetch_and_save_crypto_markets():
         
         print(f"Found {len(crypto_markets)} crypto markets, saving to database...")
         
-        # Save to database in batches
-        saved_markets = []
-        errors = []
-        batch_size = 100  # Process 100 markets at a time (increased for speed)
-        
-        for i in range(0, len(crypto_markets), batch_size):
-            batch = crypto_markets[i:i + batch_size]
-            
-            for market_data in batch:
-                try:
-                    # Filter out fields that don't exist in Market model
-                    valid_fields = {
-                        'condition_id', 'question', 'answer1', 'answer2', 
-                        'token1', 'token2', 'market_slug', 'neg_risk',
-                        'best_bid', 'best_ask', 'spread'
-                    }
-                    
-                    # Only keep fields that exist in Market model
-                    filtered_data = {
-                        k: v for k, v in market_data.items() 
-                        if k in valid_fields
-                    }
-                    
-                    # Check if market already exists
-                    existing = db.query(Market).filter(
-                        Market.condition_id == filtered_data.get('condition_id')
-                    ).first()
-                    
-                    if existing:
-                        # Update existing market
-                        for key, value in filtered_data.items():
-                            if hasattr(existing, key) and key != 'id':
-                                setattr(existing, key, value)
-                        saved_markets.append(existing)
-                    else:
-                        # Create new market with crypto category
-                        if 'category' not in filtered_data:
-                            filtered_data['category'] = 'crypto'
-                        db_market = Market(**filtered_data)
-                        db.add(db_market)
-                        db.flush()  # Flush to get the ID without committing
-                        
-                        # Verify market_id is set
-                        if db_market.id is None:
-                            raise ValueError(f"Market ID is None after flush for market: {filtered_data.get('question', 'unknown')}")
-                        
-                        # Create default trading params (now market_id is available)
-                        default_params = TradingParams(market_id=db_market.id)
-                        db.add(default_params)
-                        
-                        saved_markets.append(db_market)
-                    
-                    fetch_progress["total_processed"] += 1
-                    
-                except Exception as e:
-                    errors.append(f"Error saving market {market_data.get('question', 'unknown')}: {str(e)}")
-                    import traceback
-                    print(f"Full error: {traceback.format_exc()}")
-                    continue
-            
-            # Commit batch
-            try:
-                db.commit()
-                fetch_progress["total_saved"] = len(saved_markets)
-            except Exception as e:
-                db.rollback()
-                print(f"Error committing batch: {e}")
-            
-            # Progress update
-            if (i + batch_size) % 500 == 0 or (i + batch_size) >= len(crypto_markets):
-                print(f"Processed {min(i + batch_size, len(crypto_markets))}/{len(crypto_markets)} markets...")
+        # Save to database in batches (one upsert per batch)
+        total_saved, errors = await _save_markets_in_batches(
+            crypto_markets, default_category='crypto', update_category=False
+        )
         
         if errors:
             print(f"Warning: {len(errors)} errors occurred while saving markets:")
@@ -1328,13 +1411,13 @@ async def fetch_and_save_crypto_markets():
                 print(f"  - {error}")
         
         fetch_progress.update({
-            "status": "completed" if saved_markets else "error",
-            "total_saved": len(saved_markets),
+            "status": "completed" if total_saved else "error",
+            "total_saved": total_saved,
             "error": f"{len(errors)} errors" if errors else None,
             "completed_at": datetime.utcnow().isoformat()
         })
         
-        print(f"Successfully saved {len(saved_markets)} markets to database")
+        print(f"Successfully saved {total_saved} markets to database")
         
     except Exception as e:
         error_msg = str(e)
@@ -1346,6 +1429,5 @@ async def fetch_and_save_crypto_markets():
             "error": error_msg,
             "completed_at": datetime.utcnow().isoformat()
         })
-    finally:
-        db.close()
+
 
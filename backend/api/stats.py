@@ -2,63 +2,65 @@
 Statistics API endpoints
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import get_db, Market, Position, Order, TradingStatus
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from database import get_async_db, Market, Position, Order, TradingStatus, DailyMarketStats, MarketPnlTotals
 from schemas import StatsResponse
+from services.client_registry import get_client_registry, check_client_config, ClientInitializing
+from services.balance_cache import get_wallet_balances
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
 @router.get("/", response_model=StatsResponse)
-async def get_stats(db: Session = Depends(get_db)):
+async def get_stats(db: AsyncSession = Depends(get_async_db)):
     """Get overall trading statistics"""
-    # Count markets
-    total_markets = db.query(Market).count()
-    active_markets = db.query(Market).filter(Market.is_active == True).count()
+    today = datetime.utcnow().strftime('%Y-%m-%d')
     
-    # Count positions
-    total_positions = db.query(Position).filter(Position.size > 0).count()
-    
-    # Calculate PnL
-    total_pnl = db.query(func.sum(Position.realized_pnl + Position.unrealized_pnl)).scalar() or 0.0
-    
-    # Today's PnL (from orders filled today)
-    today = datetime.utcnow().date()
-    today_pnl = db.query(func.sum(Position.realized_pnl)).filter(
-        func.date(Position.updated_at) == today
-    ).scalar() or 0.0
-    
-    # Count orders
-    total_orders = db.query(Order).count()
-    active_orders = db.query(Order).filter(Order.status == 'PENDING').count()
+    # All counts and sums in a single round trip
+    counts = (await db.execute(select(
+        select(func.count(Market.id)).scalar_subquery(),
+        select(func.count(Market.id)).where(Market.is_active == True).scalar_subquery(),
+        select(func.count(Position.id)).where(Position.size > 0).scalar_subquery(),
+        # PnL from the per-market rollups
+        select(func.sum(MarketPnlTotals.realized_pnl + MarketPnlTotals.unrealized_pnl)).scalar_subquery(),
+        # Today's realized PnL
+        select(func.sum(DailyMarketStats.realized_pnl)).where(DailyMarketStats.day == today).scalar_subquery(),
+        select(func.count(Order.id)).scalar_subquery(),
+        select(func.count(Order.id)).where(Order.status == 'PENDING').scalar_subquery(),
+    ))).one()
+    total_markets, active_markets, total_positions, total_pnl, today_pnl, total_orders, active_orders = counts
+    total_pnl = total_pnl or 0.0
+    today_pnl = today_pnl or 0.0
     
     # Fetch wallet balances from Polymarket
     positions_value = None
     usdc_balance = None
     total_balance = None
+    balance_cache_age = None
+    balance_stale = None
     
     try:
-        import os
-        from dotenv import load_dotenv
-        load_dotenv()
-        
-        # Check if credentials are configured
-        pk = os.getenv("PK", "")
-        browser_address = os.getenv("BROWSER_ADDRESS", "")
+        registry = get_client_registry()
+        config_error = check_client_config()
         
         # Skip balance fetch if credentials are not configured
-        if not pk or pk in ["your_private_key_here", "your_actual_private_key"]:
-            print("Warning: PK not configured, skipping wallet balance fetch")
-        elif not browser_address or browser_address in ["your_wallet_address_here", "your_actual_wallet_address"]:
-            print("Warning: BROWSER_ADDRESS not configured, skipping wallet balance fetch")
+        if config_error:
+            print(f"Warning: {config_error.split('.')[0]}, skipping wallet balance fetch")
         else:
-            from poly_data.polymarket_client import PolymarketClient
-            client = PolymarketClient()
-            # Fetch both USDC and positions balance
-            usdc_balance = round(client.get_usdc_balance(), 2)
-            positions_value = round(client.get_pos_balance(), 2)
+            # The shared client is built once in the background; don't wait for it here
+            client = await registry.get_async(timeout=0)
+            
+            # Shared with the wallet endpoints; concurrent polls make one upstream call
+            balances = await get_wallet_balances(client)
+            usdc_balance = round(balances['usdc_balance'], 2)
+            positions_value = round(balances['positions_value'], 2)
             total_balance = round(usdc_balance + positions_value, 2)
+            balance_cache_age = balances['cache_age']
+            balance_stale = balances['stale']
+    except ClientInitializing:
+        # Balances appear once the client is ready
+        pass
     except Exception as e:
         error_msg = str(e)
         # Only log if it's not a configuration issue
@@ -76,21 +78,23 @@ async def get_stats(db: Session = Depends(get_db)):
         active_orders=active_orders,
         usdc_balance=usdc_balance,
         total_balance=total_balance,
-        positions_value=positions_value
+        positions_value=positions_value,
+        balance_cache_age=balance_cache_age,
+        balance_stale=balance_stale
     )
 
 @router.get("/pnl/breakdown")
-async def get_pnl_breakdown(db: Session = Depends(get_db)):
+async def get_pnl_breakdown(db: AsyncSession = Depends(get_async_db)):
     """Get PnL breakdown by market"""
-    positions = db.query(
-        Position.market_id,
+    totals = (await db.execute(select(
+        MarketPnlTotals.market_id,
         Market.question,
-        func.sum(Position.realized_pnl).label('realized'),
-        func.sum(Position.unrealized_pnl).label('unrealized')
-    ).join(Market).group_by(Position.market_id, Market.question).all()
+        MarketPnlTotals.realized_pnl.label('realized'),
+        MarketPnlTotals.unrealized_pnl.label('unrealized')
+    ).join(Market, Market.id == MarketPnlTotals.market_id))).all()
     
     breakdown = []
-    for pos in positions:
+    for pos in totals:
         breakdown.append({
             'market_id': pos.market_id,
             'question': pos.question,
@@ -102,29 +106,29 @@ async def get_pnl_breakdown(db: Session = Depends(get_db)):
     return {'breakdown': breakdown}
 
 @router.get("/performance/daily")
-async def get_daily_performance(days: int = 7, db: Session = Depends(get_db)):
+async def get_daily_performance(days: int = 7, db: AsyncSession = Depends(get_async_db)):
     """Get daily performance for the last N days"""
-    performance = []
+    if days <= 0:
+        return {'performance': []}
     
-    for i in range(days):
-        date = (datetime.utcnow() - timedelta(days=i)).date()
-        
-        # Orders filled on this day
-        orders_count = db.query(Order).filter(
-            func.date(Order.filled_at) == date,
-            Order.status == 'FILLED'
-        ).count()
-        
-        # PnL on this day (approximate from position updates)
-        daily_pnl = db.query(func.sum(Position.realized_pnl)).filter(
-            func.date(Position.updated_at) == date
-        ).scalar() or 0.0
-        
+    today = datetime.utcnow().date()
+    dates = [str(today - timedelta(days=i)) for i in range(days)][::-1]  # Oldest first
+    
+    # One indexed range scan over the daily rollups
+    rows = (await db.execute(select(
+        DailyMarketStats.day,
+        func.sum(DailyMarketStats.fills),
+        func.sum(DailyMarketStats.realized_pnl)
+    ).where(DailyMarketStats.day >= dates[0]).group_by(DailyMarketStats.day))).all()
+    by_day = {day: (fills or 0, pnl or 0.0) for day, fills, pnl in rows}
+    
+    performance = []
+    for date in dates:
+        orders_count, daily_pnl = by_day.get(date, (0, 0.0))
         performance.append({
-            'date': str(date),
-            'orders': orders_count,
+            'date': date,
+            'orders': int(orders_count),
             'pnl': round(daily_pnl, 2)
         })
     
-    return {'performance': performance[::-1]}  # Reverse to show oldest first
-
+    return {'performance': performance}
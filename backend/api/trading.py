@@ -214,17 +214,14 @@ async def get_trading_diagnostics(db: Session = Depends(get_db)):
                 ).filter(Market.is_active == True).count()
                 
                 # Quick check of global state
-                loaded_in_memory = 0
-                try:
-                    if hasattr(global_state, 'df') and global_state.df is not None and hasattr(global_state.df, '__len__'):
-                        loaded_in_memory = len(global_state.df) if not global_state.df.empty else 0
-                except:
-                    pass
+                state = global_state.snapshot()
+                loaded_in_memory = len(state.market_index)
                 
                 diagnostics["markets"] = {
                     "total_active": total_active,
                     "markets_with_params": markets_with_params,
                     "loaded_in_memory": loaded_in_memory,
+                    "state_version": state.version,
                     "message": f"✅ {markets_with_params} active markets with trading params" if markets_with_params > 0 else "❌ No active markets with trading params"
                 }
                 
@@ -246,7 +243,7 @@ async def get_trading_diagnostics(db: Session = Depends(get_db)):
             # Check websocket/tokens (fast)
             try:
                 import poly_data.global_state as global_state
-                tokens_count = len(global_state.all_tokens) if hasattr(global_state, 'all_tokens') and global_state.all_tokens else 0
+                tokens_count = len(global_state.snapshot().all_tokens)
                 client_initialized = hasattr(global_state, 'client') and global_state.client is not None
                 
                 diagnostics["websocket"] = {
@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from database import get_db
 from schemas import WalletBalanceResponse
+from services.client_registry import get_client_registry, check_client_config, ClientInitializing
+from services.balance_cache import get_balance_cache, get_wallet_balances
 import os
 from dotenv import load_dotenv
 
@@ -13,38 +15,16 @@ load_dotenv()
 
 router = APIRouter()
 
-def get_polymarket_client():
-    """Get initialized Polymarket client"""
+async def get_polymarket_client():
+    """Get the shared Polymarket client (initialized once per process)"""
+    config_error = check_client_config()
+    if config_error:
+        raise HTTPException(status_code=400, detail=config_error)
+
     try:
-        # Check if credentials are configured
-        pk = os.getenv("PK", "")
-        browser_address = os.getenv("BROWSER_ADDRESS", "")
-        
-        # Check for placeholder values
-        if not pk or pk in ["your_private_key_here", "your_actual_private_key"]:
-            raise HTTPException(
-                status_code=400,
-                detail="Private key (PK) not configured. Please set a valid private key in your .env file (starts with 0x)."
-            )
-        
-        if not browser_address or browser_address in ["your_wallet_address_here", "your_actual_wallet_address"]:
-            raise HTTPException(
-                status_code=400,
-                detail="Wallet address (BROWSER_ADDRESS) not configured. Please set a valid wallet address in your .env file (starts with 0x)."
-            )
-        
-        # Validate wallet address format (should be hex string starting with 0x)
-        if not browser_address.startswith("0x") or len(browser_address) != 42:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid wallet address format. Expected hex string starting with 0x and 42 characters long. Got: {browser_address[:20]}..."
-            )
-        
-        from poly_data.polymarket_client import PolymarketClient
-        client = PolymarketClient()
-        return client
-    except HTTPException:
-        raise
+        return await get_client_registry().get_async()
+    except ClientInitializing as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         error_msg = str(e)
         
@@ -71,15 +51,19 @@ async def get_usdc_balance():
     Get USDC balance from connected wallet
     """
     try:
-        client = get_polymarket_client()
-        balance = client.get_usdc_balance()
+        client = await get_polymarket_client()
+        balance = await get_balance_cache().get('usdc_balance', client.get_usdc_balance)
         
         return WalletBalanceResponse(
-            usdc_balance=round(balance, 2),
+            usdc_balance=round(balance.value, 2),
             total_balance=None,
             positions_value=None,
-            wallet_address=os.getenv("BROWSER_ADDRESS", "")
+            wallet_address=os.getenv("BROWSER_ADDRESS", ""),
+            cache_age=balance.age,
+            stale=balance.stale
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -92,17 +76,21 @@ async def get_total_balance():
     Get total balance (USDC + positions value) from connected wallet
     """
     try:
-        client = get_polymarket_client()
-        total_balance = client.get_total_balance()
-        usdc_balance = client.get_usdc_balance()
-        positions_value = client.get_pos_balance()
+        client = await get_polymarket_client()
+        balances = await get_wallet_balances(client)
+        usdc_balance = balances['usdc_balance']
+        positions_value = balances['positions_value']
         
         return WalletBalanceResponse(
             usdc_balance=round(usdc_balance, 2),
-            total_balance=round(total_balance, 2),
+            total_balance=round(usdc_balance + positions_value, 2),
             positions_value=round(positions_value, 2),
-            wallet_address=os.getenv("BROWSER_ADDRESS", "")
+            wallet_address=os.getenv("BROWSER_ADDRESS", ""),
+            cache_age=balances['cache_age'],
+            stale=balances['stale']
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -115,16 +103,19 @@ async def get_positions_value():
     Get total value of all positions
     """
     try:
-        client = get_polymarket_client()
-        positions_value = client.get_pos_balance()
-        usdc_balance = client.get_usdc_balance()
+        client = await get_polymarket_client()
+        balances = await get_wallet_balances(client)
         
         return WalletBalanceResponse(
-            usdc_balance=round(usdc_balance, 2),
+            usdc_balance=round(balances['usdc_balance'], 2),
             total_balance=None,
-            positions_value=round(positions_value, 2),
-            wallet_address=os.getenv("BROWSER_ADDRESS", "")
+            positions_value=round(balances['positions_value'], 2),
+            wallet_address=os.getenv("BROWSER_ADDRESS", ""),
+            cache_age=balances['cache_age'],
+            stale=balances['stale']
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -153,13 +144,14 @@ async def get_token_balances():
     Excludes USDC, only shows position tokens
     """
     try:
-        client = get_polymarket_client()
+        client = await get_polymarket_client()
         
         # Get all positions
-        positions_df = client.get_all_positions()
+        positions = await get_balance_cache().get('positions', client.get_all_positions)
+        positions_df = positions.value
         
         if positions_df.empty:
-            return {"tokens": [], "total_value": 0.0}
+            return {"tokens": [], "total_value": 0.0, "cache_age": positions.age, "stale": positions.stale}
         
         # Filter positions with balance > 0
         active_positions = positions_df[positions_df['size'] > 0]
@@ -182,8 +174,12 @@ async def get_token_balances():
         return {
             "tokens": tokens,
             "total_value": round(total_value, 2),
-            "count": len(tokens)
+            "count": len(tokens),
+            "cache_age": positions.age,
+            "stale": positions.stale
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,9 +1,10 @@
 """
 Database models and configuration for Polymarket Trading Bot
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index
+from sqlalchemy import create_engine, event, func, inspect, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, Session
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from datetime import datetime
 import os
 
@@ -183,10 +184,314 @@ class TradingStatus(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class DailyMarketStats(Base):
+    """Per-day, per-market performance rollup (maintained on flush, see _update_stats_rollups)"""
+    __tablename__ = 'daily_market_stats'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(String(10), nullable=False)  # YYYY-MM-DD (UTC)
+    market_id = Column(Integer, ForeignKey('markets.id', ondelete='CASCADE'), nullable=False, index=True)
+    
+    __table_args__ = (
+        UniqueConstraint('day', 'market_id', name='uq_daily_market_stats_day_market'),
+        Index('idx_daily_market_stats_day', 'day'),
+    )
+    
+    fills = Column(Integer, default=0)
+    volume = Column(Float, default=0.0)  # filled size * price
+    realized_pnl = Column(Float, default=0.0)  # realized PnL booked on this day
+    unrealized_pnl = Column(Float, default=0.0)  # change in unrealized PnL on this day
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MarketPnlTotals(Base):
+    """All-time performance rollup per market (maintained on flush, see _update_stats_rollups)"""
+    __tablename__ = 'market_pnl_totals'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    market_id = Column(Integer, ForeignKey('markets.id', ondelete='CASCADE'), unique=True, nullable=False)
+    
+    fills = Column(Integer, default=0)
+    volume = Column(Float, default=0.0)
+    realized_pnl = Column(Float, default=0.0)
+    unrealized_pnl = Column(Float, default=0.0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MarketChange(Base):
+    """
+    Change log of market / trading params edits made through the API.
+    The bot polls it to apply edits immediately (see services/change_bus.py).
+    No foreign key: events for deleted markets must survive the delete.
+    """
+    __tablename__ = 'market_changes'
+    # Never reuse ids of pruned rows, subscribers track the last id they saw
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    market_id = Column(Integer, nullable=False)
+    condition_id = Column(String)
+    token1 = Column(String)
+    token2 = Column(String)
+    kind = Column(String, nullable=False)  # market, config, deleted
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class MarketScanRow(Base):
+    """
+    Output of the hourly market scan (update_markets.py), one row per sheet row.
+    Position 0 holds the column headers. `published` is what was last written
+    to the Google Sheet, so the exporter only sends rows that differ
+    (see data_updater/sheet_publisher.py).
+    """
+    __tablename__ = 'market_scan_rows'
+
+    id = Column(Integer, primary_key=True, index=True)
+    sheet = Column(String, nullable=False)  # Worksheet title
+    position = Column(Integer, nullable=False)  # 0-based sheet row
+
+    __table_args__ = (
+        UniqueConstraint('sheet', 'position', name='uq_market_scan_rows_sheet_position'),
+    )
+
+    condition_id = Column(String, index=True)
+    cells = Column(Text)  # JSON list of cell values from the latest scan, NULL once the row is gone
+    published = Column(Text)  # JSON list of cell values last written to the sheet
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# ============ Stats Rollups ============
+#
+# Fills (orders reaching FILLED / filled_size growing) and PnL changes on
+# positions are folded into DailyMarketStats and MarketPnlTotals in the same
+# flush that writes them, so the stats endpoints never re-aggregate history.
+
+def _attr_delta(session: Session, obj, name: str) -> float:
+    """New minus old value of a numeric column for a pending or dirty object"""
+    state = inspect(obj)
+    new = getattr(obj, name) or 0.0
+    if state.pending:
+        return new
+    history = state.attrs[name].history
+    if not history.has_changes():
+        return 0.0
+    if history.deleted:
+        old = history.deleted[0]
+    else:
+        # Attribute was expired when it was set, read the stored value
+        model = type(obj)
+        with session.no_autoflush:
+            old = session.query(getattr(model, name)).filter(model.id == obj.id).scalar()
+    return new - (old or 0.0)
+
+
+def _status_changed_to(session: Session, obj, status: str) -> bool:
+    """True if the object's status is being set to `status` by this flush"""
+    state = inspect(obj)
+    if obj.status != status:
+        return False
+    if state.pending:
+        return True
+    history = state.attrs['status'].history
+    if not history.has_changes():
+        return False
+    if history.deleted:
+        return history.deleted[0] != status
+    model = type(obj)
+    with session.no_autoflush:
+        return session.query(model.status).filter(model.id == obj.id).scalar() != status
+
+
+def _apply_rollup_deltas(session: Session, deltas: dict):
+    """
+    Add per-(day, market) deltas to the rollup tables.
+
+    Args:
+        deltas: (day, market_id) -> {'fills', 'volume', 'realized_pnl', 'unrealized_pnl'}
+    """
+    market_ids = {market_id for _, market_id in deltas}
+    days = {day for day, _ in deltas}
+    daily = {
+        (row.day, row.market_id): row for row in session.query(DailyMarketStats).filter(
+            DailyMarketStats.day.in_(days), DailyMarketStats.market_id.in_(market_ids)
+        )
+    }
+    totals = {
+        row.market_id: row for row in session.query(MarketPnlTotals).filter(
+            MarketPnlTotals.market_id.in_(market_ids)
+        )
+    }
+
+    for (day, market_id), delta in deltas.items():
+        for rows, key, model, keys in (
+            (daily, (day, market_id), DailyMarketStats, {'day': day, 'market_id': market_id}),
+            (totals, market_id, MarketPnlTotals, {'market_id': market_id}),
+        ):
+            row = rows.get(key)
+            if row is None:
+                row = model(fills=0, volume=0.0, realized_pnl=0.0, unrealized_pnl=0.0, **keys)
+                session.add(row)
+                rows[key] = row
+            row.fills += delta['fills']
+            row.volume += delta['volume']
+            row.realized_pnl += delta['realized_pnl']
+            row.unrealized_pnl += delta['unrealized_pnl']
+
+
+def _update_stats_rollups(session, flush_context, instances):
+    """Fold order fills and position PnL changes into the rollup tables"""
+    deltas = {}
+
+    def add(market_id, day, **values):
+        if not market_id:
+            return
+        delta = deltas.setdefault((day, market_id), {
+            'fills': 0, 'volume': 0.0, 'realized_pnl': 0.0, 'unrealized_pnl': 0.0,
+        })
+        for name, value in values.items():
+            delta[name] += value
+
+    today = datetime.utcnow().strftime('%Y-%m-%d')
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Order):
+            filled = _attr_delta(session, obj, 'filled_size')
+            became_filled = _status_changed_to(session, obj, 'FILLED')
+            if became_filled and obj.filled_at is None:
+                obj.filled_at = datetime.utcnow()
+            if filled or became_filled:
+                day = obj.filled_at.strftime('%Y-%m-%d') if obj.filled_at else today
+                add(obj.market_id, day, fills=1 if became_filled else 0,
+                    volume=max(filled, 0.0) * (obj.price or 0.0))
+        elif isinstance(obj, Position):
+            realized = _attr_delta(session, obj, 'realized_pnl')
+            unrealized = _attr_delta(session, obj, 'unrealized_pnl')
+            if realized or unrealized:
+                add(obj.market_id, today, realized_pnl=realized, unrealized_pnl=unrealized)
+
+    if deltas:
+        with session.no_autoflush:
+            _apply_rollup_deltas(session, deltas)
+
+
+def rebuild_stats_rollups(db: Session):
+    """
+    Recompute the rollup tables from orders and positions.
+    Used once to backfill history recorded before the rollups existed.
+    """
+    db.query(DailyMarketStats).delete(synchronize_session=False)
+    db.query(MarketPnlTotals).delete(synchronize_session=False)
+
+    deltas = {}
+
+    def add(market_id, day, **values):
+        delta = deltas.setdefault((day, market_id), {
+            'fills': 0, 'volume': 0.0, 'realized_pnl': 0.0, 'unrealized_pnl': 0.0,
+        })
+        delta.update(values)
+
+    fills = db.query(
+        Order.market_id,
+        func.date(Order.filled_at).label('day'),
+        func.count(Order.id),
+        func.sum(Order.filled_size * Order.price),
+    ).filter(Order.status == 'FILLED', Order.filled_at.isnot(None), Order.market_id > 0).group_by(
+        Order.market_id, func.date(Order.filled_at)
+    )
+    for market_id, day, count, volume in fills:
+        add(market_id, day, fills=count, volume=volume or 0.0)
+
+    pnl = db.query(
+        Position.market_id,
+        func.date(Position.updated_at).label('day'),
+        func.sum(Position.realized_pnl),
+        func.sum(Position.unrealized_pnl),
+    ).filter(Position.market_id > 0).group_by(Position.market_id, func.date(Position.updated_at))
+    for market_id, day, realized, unrealized in pnl:
+        add(market_id, day, realized_pnl=realized or 0.0, unrealized_pnl=unrealized or 0.0)
+
+    with db.no_autoflush:
+        _apply_rollup_deltas(db, deltas)
+    db.commit()
+
+
 # Database engine and session
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./polymarket_bot.db')
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith('sqlite') else {})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+IS_SQLITE = DATABASE_URL.startswith('sqlite')
+IS_SQLITE_MEMORY = IS_SQLITE and (DATABASE_URL in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in DATABASE_URL)
+
+# SQLite performance profile. The bot, the API and background fetch tasks all
+# share one file: WAL lets readers run while a writer commits, NORMAL sync is
+# durable across application crashes in WAL mode, and mmap/cache keep hot pages
+# out of the read() path.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -int(os.getenv('SQLITE_CACHE_KB', 64 * 1024)),  # negative = KiB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,  # ms to wait for a lock instead of failing immediately
+}
+
+if IS_SQLITE and not IS_SQLITE_MEMORY:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        pool_pre_ping=True,
+    )
+elif IS_SQLITE:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    engine = create_engine(DATABASE_URL, pool_size=10, max_overflow=20, pool_pre_ping=True)
+
+
+# Async engine for the API (aiosqlite). Shares the file, pragmas and session class with the sync engine.
+ASYNC_DATABASE_URL = os.getenv(
+    'ASYNC_DATABASE_URL',
+    DATABASE_URL.replace('sqlite://', 'sqlite+aiosqlite://', 1) if IS_SQLITE else DATABASE_URL
+)
+if IS_SQLITE and not IS_SQLITE_MEMORY:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        pool_pre_ping=True,
+    )
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLITE_PRAGMAS to every new pooled connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if name == 'journal_mode' and IS_SQLITE_MEMORY:
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+
+class BotSession(Session):
+    """Session class used by both the sync and async session factories"""
+
+
+# Stats rollups are maintained on every flush, sync or async
+event.listen(BotSession, "before_flush", _update_stats_rollups)
+
+SessionLocal = sessionmaker(class_=BotSession, autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, sync_session_class=BotSession,
+                                       autoflush=False, expire_on_commit=False)
 
 
 def get_db():
@@ -198,6 +503,15 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Async dependency for FastAPI endpoints.
+    Queries are awaited on the event loop instead of blocking it.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
@@ -224,6 +538,17 @@ def init_db():
         except Exception as e:
             print(f"Warning: Could not clean orphan records: {e}")
             db.rollback()
+        
+        # Backfill the stats rollups the first time they exist
+        try:
+            if db.query(MarketPnlTotals.id).first() is None and (
+                db.query(Order.id).first() is not None or db.query(Position.id).first() is not None
+            ):
+                rebuild_stats_rollups(db)
+                print("Backfilled daily performance rollups")
+        except Exception as e:
+            print(f"Warning: Could not backfill stats rollups: {e}")
+            db.rollback()
     finally:
         db.close()
 
@@ -3,6 +3,7 @@ FastAPI main application for Polymarket Trading Bot
 """
 from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
@@ -11,6 +12,7 @@ from dotenv import load_dotenv
 from database import get_db, init_db
 from api import markets, trading, positions, orders, settings, stats, wallet
 from services.trading_service import TradingService
+from services.client_registry import get_client_registry
 from config import Config
 
 load_dotenv()
@@ -37,6 +39,9 @@ async def startup_event():
     """Initialize database and services on startup"""
     init_db()
     print("✅ Database initialized")
+    # Build the shared Polymarket client in the background so requests never pay for it
+    if get_client_registry().start():
+        print("⏳ Initializing Polymarket client in the background")
 
 # Health check endpoint
 @app.get("/")
@@ -53,8 +58,21 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Health check endpoint (liveness), with the shared client's state"""
+    return {"status": "healthy", "polymarket_client": get_client_registry().status()}
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint: 503 until the shared Polymarket client is initialized.
+    Without wallet credentials there is no client to wait for.
+    """
+    client_status = get_client_registry().status()
+    ready = client_status['state'] in ('ready', 'unconfigured')
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "polymarket_client": client_status}
+    )
 
 # Include routers
 app.include_router(markets.router, prefix="/api/markets", tags=["markets"])
@@ -205,6 +205,8 @@ class StatsResponse(BaseModel):
     usdc_balance: Optional[float] = None
     total_balance: Optional[float] = None
     positions_value: Optional[float] = None
+    balance_cache_age: Optional[float] = None  # Seconds since the balances were fetched
+    balance_stale: Optional[bool] = None  # Older than the cache TTL, refresh in progress
 
 # Wallet schemas
 class WalletBalanceResponse(BaseModel):
@@ -212,6 +214,8 @@ class WalletBalanceResponse(BaseModel):
     total_balance: Optional[float] = None
     positions_value: Optional[float] = None
     wallet_address: str
+    cache_age: Optional[float] = None  # Seconds since the balances were fetched
+    stale: Optional[bool] = None  # Older than the cache TTL, refresh in progress
 
 # Market with full config
 class MarketWithConfig(MarketResponse):
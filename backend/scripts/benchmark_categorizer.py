@@ -0,0 +1,100 @@
+"""
+Benchmark for the market categorizer.
+
+Categorizes a synthetic corpus of market questions and reports markets per
+second for the previous substring scan (one `keyword in text` check per
+keyword), the compiled single-pass categorizer, and the compiled
+categorizer spread over a process pool.
+
+Usage:
+    python backend/scripts/benchmark_categorizer.py --markets 50000 --processes 4
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from services.market_categorizer import (
+    CATEGORY_KEYWORDS, CRYPTO_COINS, CRYPTO_QUESTION_PATTERNS, EXPLICIT_CRYPTO_TERMS,
+    PRICE_PATTERNS, TIME_PATTERNS, MarketCategorizer,
+)
+
+QUESTION_TEMPLATES = [
+    "Will Bitcoin reach ${n},000 by December 31?",
+    "Will Ethereum close above ${n},000 on Friday?",
+    "Will Trump win the {n} presidential election?",
+    "Will the Lakers win the NBA Finals in {n}?",
+    "Will the Fed cut interest rates in March {n}?",
+    "Will Oppenheimer win {n} Oscars?",
+    "Will OpenAI launch GPT-{n} this year?",
+    "Will a hurricane make landfall in Florida before {n}?",
+    "Will {n} people attend the parade?",
+    "Who will host the {n} summit?",
+]
+
+DESCRIPTION = ("This market will resolve to Yes if the outcome in the title happens before the "
+               "resolution date, according to the official source. Otherwise it resolves No.")
+
+
+def make_corpus(count: int, seed: int = 7) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    return [(rng.choice(QUESTION_TEMPLATES).format(n=rng.randint(1, 2030)), DESCRIPTION)
+            for _ in range(count)]
+
+
+class SubstringCategorizer:
+    """Baseline: the previous categorize_market, one substring scan per keyword"""
+
+    def __init__(self):
+        self.context = PRICE_PATTERNS + TIME_PATTERNS + CRYPTO_QUESTION_PATTERNS
+
+    def categorize(self, question: str, description: str = '') -> str:
+        text = f"{question} {description}".lower()
+        if any(coin in text for coin in CRYPTO_COINS) and any(p in text for p in self.context):
+            return 'crypto'
+        if any(term in text for term in EXPLICIT_CRYPTO_TERMS):
+            return 'crypto'
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            if any(keyword in text for keyword in keywords):
+                return category
+        return 'other'
+
+
+def _time(label: str, fn: Callable[[], List[str]], count: int) -> Dict:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return {'label': label, 'elapsed': elapsed, 'rate': count / elapsed if elapsed else float('inf')}
+
+
+def run_benchmark(count: int, processes: int) -> List[Dict]:
+    corpus = make_corpus(count)
+    baseline = SubstringCategorizer()
+    compiled = MarketCategorizer()
+
+    results = [
+        _time('substring scan', lambda: [baseline.categorize(q, d) for q, d in corpus], count),
+        _time('compiled', lambda: compiled.categorize_many(corpus), count),
+    ]
+    if processes > 1:
+        results.append(_time(f'compiled x{processes} processes',
+                             lambda: compiled.categorize_many(corpus, processes=processes), count))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark market categorization throughput")
+    parser.add_argument("--markets", type=int, default=50000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"📊 Categorizing {args.markets} markets")
+    for result in run_benchmark(args.markets, args.processes):
+        print(f"  {result['label']:<28} {result['elapsed']:7.2f}s  {result['rate']:>10,.0f} markets/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Concurrent load test for the backend API.
+
+Fires a mix of read requests (markets list, stats) at a running API server
+and reports throughput and latency. Run it against the same database before
+and after a change to compare.
+
+Usage:
+    python backend/scripts/load_test_api.py --url http://localhost:8000 --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import aiohttp
+
+READ_ENDPOINTS = [
+    "/api/markets/?limit=1000",
+    "/api/stats/performance/daily?days=30",
+    "/api/stats/pnl/breakdown",
+]
+
+
+async def _request(session: aiohttp.ClientSession, url: str) -> float:
+    start = time.perf_counter()
+    async with session.get(url) as response:
+        await response.read()
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run_load_test(base_url: str, total: int, concurrency: int) -> Dict:
+    """
+    Run `total` requests with at most `concurrency` in flight.
+
+    Returns:
+        dict with requests, errors, elapsed, rps, p50_ms and p95_ms
+    """
+    async with aiohttp.ClientSession() as session:
+        urls = [base_url + READ_ENDPOINTS[i % len(READ_ENDPOINTS)] for i in range(total)]
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        errors = 0
+
+        async def worker(url):
+            nonlocal errors
+            async with semaphore:
+                try:
+                    latencies.append(await _request(session, url))
+                except Exception:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(url) for url in urls))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors,
+        'elapsed': round(elapsed, 2),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the backend API")
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.url.rstrip('/'), args.requests, args.concurrency))
+    print(f"Requests: {result['requests']}  errors: {result['errors']}  elapsed: {result['elapsed']}s")
+    print(f"Throughput: {result['rps']} req/s  p50: {result['p50_ms']} ms  p95: {result['p95_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
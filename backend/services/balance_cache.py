@@ -0,0 +1,163 @@
+"""
+Wallet Balance Cache
+
+The dashboard polls several wallet endpoints and /api/stats/ in parallel,
+and each used to read the USDC balance from the Polygon RPC node and the
+positions value from the data API. This cache sits in front of those reads:
+
+- A value younger than TTL is served from memory.
+- Single flight: concurrent requests for a missing or expired value share
+  one upstream call.
+- Stale-while-revalidate: a value older than TTL but younger than MAX_STALE
+  is served immediately while one background refresh runs.
+- If a refresh fails, the last value is served while it is younger than
+  MAX_STALE; after that the error reaches the caller.
+- Every read reports the age of what it returns, for the API responses.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+# Seconds a balance is served without refreshing
+BALANCE_TTL = 10
+# Seconds a balance may still be served while it is refreshed
+MAX_STALE = 120
+
+
+@dataclass
+class CachedValue:
+    """A cached read and when it was fetched"""
+    value: Any
+    fetched_at: float
+    stale: bool = False
+
+    @property
+    def age(self) -> float:
+        return round(time.time() - self.fetched_at, 2)
+
+
+class BalanceCache:
+    """
+    TTL cache with single-flight refreshes for blocking wallet reads.
+    """
+
+    def __init__(self, ttl: float = BALANCE_TTL, max_stale: float = MAX_STALE):
+        """
+        Args:
+            ttl: Seconds a value is served without refreshing
+            max_stale: Seconds a value may be served while (or after failing) refreshing
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries: Dict[str, CachedValue] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'fetches': 0, 'errors': 0}
+
+    async def _fetch(self, key: str, loader: Callable[[], Any]) -> CachedValue:
+        self.stats['fetches'] += 1
+        try:
+            value = await asyncio.to_thread(loader)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+        entry = CachedValue(value, time.time())
+        self._entries[key] = entry
+        return entry
+
+    def _refresh(self, key: str, loader: Callable[[], Any]) -> asyncio.Task:
+        """The in-flight refresh of a key, started if there is none"""
+        task = self._inflight.get(key)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Background refresh errors are reported on the next read, not here
+        if not task.cancelled():
+            task.exception()
+
+    async def get(self, key: str, loader: Callable[[], Any]) -> CachedValue:
+        """
+        Read a value through the cache.
+
+        Args:
+            key: Cache key (e.g. 'usdc_balance')
+            loader: Blocking call producing the value, run in a worker thread
+
+        Returns:
+            CachedValue with the value, its fetch time and whether it is stale
+        """
+        entry = self._entries.get(key)
+        now = time.time()
+
+        if entry is not None and now - entry.fetched_at < self.ttl:
+            self.stats['hits'] += 1
+            return entry
+
+        if entry is not None and now - entry.fetched_at < self.max_stale:
+            self.stats['stale_hits'] += 1
+            self._refresh(key, loader)
+            return CachedValue(entry.value, entry.fetched_at, stale=True)
+
+        self.stats['misses'] += 1
+        try:
+            # Shield so one cancelled request doesn't cancel the shared fetch
+            return await asyncio.shield(self._refresh(key, loader))
+        except Exception:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.fetched_at < self.max_stale:
+                return CachedValue(entry.value, entry.fetched_at, stale=True)
+            raise
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one cached value, or all of them"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+async def get_wallet_balances(client, cache: Optional['BalanceCache'] = None) -> Dict:
+    """
+    USDC balance and positions value of the wallet, read through the cache.
+
+    Returns:
+        {'usdc_balance', 'positions_value', 'cache_age', 'stale'} where the age
+        and staleness describe the older of the two reads
+    """
+    cache = cache or get_balance_cache()
+    usdc, positions = await asyncio.gather(
+        cache.get('usdc_balance', client.get_usdc_balance),
+        cache.get('positions_value', client.get_pos_balance),
+    )
+    return {
+        'usdc_balance': usdc.value,
+        'positions_value': positions.value,
+        'cache_age': max(usdc.age, positions.age),
+        'stale': usdc.stale or positions.stale,
+    }
+
+
+_balance_cache_instance: Optional[BalanceCache] = None
+_balance_cache_lock = Lock()
+
+
+def get_balance_cache() -> BalanceCache:
+    """
+    Get the shared balance cache (singleton).
+
+    Returns:
+        BalanceCache instance
+    """
+    global _balance_cache_instance
+    if _balance_cache_instance is None:
+        with _balance_cache_lock:
+            if _balance_cache_instance is None:
+                _balance_cache_instance = BalanceCache()
+    return _balance_cache_instance
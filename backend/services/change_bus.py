@@ -0,0 +1,130 @@
+"""
+Market Change Bus
+
+Lightweight invalidation channel from the backend API to the trading bot,
+backed by the market_changes table in the shared SQLite database.
+
+The API records one row per edited market in the same transaction as the
+edit, so an event is visible exactly when the change is committed. The bot
+polls with a primary-key range scan (id > last seen id), drops the affected
+markets from its TokenMarketMapper and re-reads only the changed markets,
+instead of waiting for the 30 second market config poll.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List
+import sys
+import os
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from database import SessionLocal, MarketChange
+
+# Events older than this are pruned when new ones are recorded
+CHANGE_RETENTION = timedelta(hours=1)
+
+CHANGE_KINDS = ('market', 'config', 'deleted')
+
+
+def market_change_rows(markets: Iterable, kind: str) -> List[dict]:
+    """
+    Build market_changes rows for Market objects (or rows with id/market_id,
+    condition_id, token1 and token2).
+    """
+    if kind not in CHANGE_KINDS:
+        raise ValueError(f"Unknown market change kind: {kind}")
+    now = datetime.utcnow()
+    rows = []
+    for market in markets:
+        market_id = getattr(market, 'market_id', None) or getattr(market, 'id', None)
+        rows.append({
+            'market_id': market_id,
+            'condition_id': market.condition_id,
+            'token1': market.token1,
+            'token2': market.token2,
+            'kind': kind,
+            'created_at': now,
+        })
+    return rows
+
+
+def _record_statements():
+    cutoff = datetime.utcnow() - CHANGE_RETENTION
+    return (
+        insert(MarketChange),
+        delete(MarketChange).where(MarketChange.created_at < cutoff),
+    )
+
+
+def record_market_changes(db: Session, markets: Iterable, kind: str = 'market') -> int:
+    """
+    Record change events in the caller's transaction (does not commit).
+
+    Returns:
+        Number of events recorded
+    """
+    rows = market_change_rows(markets, kind)
+    if rows:
+        insert_stmt, prune_stmt = _record_statements()
+        db.execute(insert_stmt, rows)
+        db.execute(prune_stmt)
+    return len(rows)
+
+
+async def record_market_changes_async(db, markets: Iterable, kind: str = 'market') -> int:
+    """record_market_changes for an AsyncSession"""
+    rows = market_change_rows(markets, kind)
+    if rows:
+        insert_stmt, prune_stmt = _record_statements()
+        await db.execute(insert_stmt, rows)
+        await db.execute(prune_stmt)
+    return len(rows)
+
+
+class MarketChangeSubscriber:
+    """
+    Reads market change events in commit order.
+    """
+
+    def __init__(self, from_latest: bool = True):
+        """
+        Args:
+            from_latest: Skip events that exist already (the subscriber does a
+                full load at startup anyway)
+        """
+        self._last_id = self.latest_id() if from_latest else 0
+        self.stats = {'polls': 0, 'events': 0}
+
+    @staticmethod
+    def latest_id() -> int:
+        db = SessionLocal()
+        try:
+            return db.execute(select(func.max(MarketChange.id))).scalar() or 0
+        finally:
+            db.close()
+
+    def poll(self, limit: int = 1000) -> List:
+        """
+        Fetch events recorded since the last poll.
+
+        Returns:
+            Rows with id, market_id, condition_id, token1, token2 and kind
+        """
+        db = SessionLocal()
+        try:
+            changes = db.execute(
+                select(MarketChange.id, MarketChange.market_id, MarketChange.condition_id,
+                       MarketChange.token1, MarketChange.token2, MarketChange.kind)
+                .where(MarketChange.id > self._last_id)
+                .order_by(MarketChange.id)
+                .limit(limit)
+            ).all()
+        finally:
+            db.close()
+
+        self.stats['polls'] += 1
+        if changes:
+            self._last_id = changes[-1].id
+            self.stats['events'] += len(changes)
+        return changes
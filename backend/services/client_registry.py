@@ -0,0 +1,224 @@
+"""
+Process-wide PolymarketClient for the API
+
+Constructing a PolymarketClient derives API credentials over the network,
+builds a web3 provider and three contracts, which takes seconds. The wallet
+and stats endpoints used to pay that on every request. The registry builds
+one client per process and shares it:
+
+- start() initializes the client in a background thread (called at startup).
+- get() returns the shared client. While an initialization is running,
+  callers wait for it (bounded by a timeout) instead of starting their own.
+- A failed initialization is remembered; requests get the same error until
+  RETRY_INTERVAL has passed, then the next request retries.
+- status() reports the state for the health and readiness endpoints.
+"""
+import asyncio
+import os
+import sys
+import time
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+# Seconds before a failed initialization is retried
+RETRY_INTERVAL = 30
+# Seconds a request waits for an initialization in progress
+INIT_WAIT = 20
+
+PK_PLACEHOLDERS = ["your_private_key_here", "your_actual_private_key"]
+ADDRESS_PLACEHOLDERS = ["your_wallet_address_here", "your_actual_wallet_address"]
+
+
+class ClientInitializing(Exception):
+    """The shared client is still being initialized"""
+
+
+def check_client_config() -> Optional[str]:
+    """
+    Check the wallet credentials in the environment.
+
+    Returns:
+        A message describing what is missing or malformed, or None when configured
+    """
+    pk = os.getenv("PK", "")
+    browser_address = os.getenv("BROWSER_ADDRESS", "")
+
+    if not pk or pk in PK_PLACEHOLDERS:
+        return "Private key (PK) not configured. Please set a valid private key in your .env file (starts with 0x)."
+    if not browser_address or browser_address in ADDRESS_PLACEHOLDERS:
+        return ("Wallet address (BROWSER_ADDRESS) not configured. "
+                "Please set a valid wallet address in your .env file (starts with 0x).")
+    if not browser_address.startswith("0x") or len(browser_address) != 42:
+        return ("Invalid wallet address format. Expected hex string starting with 0x and 42 characters long. "
+                f"Got: {browser_address[:20]}...")
+    return None
+
+
+def _create_client():
+    from poly_data.polymarket_client import PolymarketClient
+    return PolymarketClient()
+
+
+class ClientRegistry:
+    """
+    Lazily initialized, shared PolymarketClient.
+    """
+
+    def __init__(self, factory: Callable = _create_client, retry_interval: float = RETRY_INTERVAL):
+        """
+        Args:
+            factory: Builds a client (PolymarketClient by default)
+            retry_interval: Seconds before a failed initialization is retried
+        """
+        self._factory = factory
+        self.retry_interval = retry_interval
+        self._lock = Lock()
+        self._client = None
+        self._error: Optional[Exception] = None
+        self._attempt_done: Optional[Event] = None
+        self._initializing = False
+        self._last_attempt: Optional[float] = None
+        self._initialized_at: Optional[float] = None
+        self._init_seconds: Optional[float] = None
+        self.stats = {'attempts': 0, 'failures': 0, 'hits': 0}
+
+    def _initialize(self, done: Event):
+        start = time.time()
+        try:
+            client = self._factory()
+        except Exception as e:
+            with self._lock:
+                self._error = e
+                self.stats['failures'] += 1
+                self._initializing = False
+            print(f"❌ Polymarket client initialization failed: {e}")
+        else:
+            with self._lock:
+                self._client = client
+                self._error = None
+                self._initialized_at = time.time()
+                self._init_seconds = self._initialized_at - start
+                self._initializing = False
+            print(f"✅ Polymarket client ready in {self._init_seconds:.1f}s")
+        finally:
+            done.set()
+
+    def start(self) -> Optional[Event]:
+        """
+        Start initializing in a background thread, unless the client is ready,
+        an initialization is running, credentials are missing or the last
+        attempt failed less than retry_interval ago.
+
+        Returns:
+            Event set when the current attempt finishes, or None when no attempt is running
+        """
+        if check_client_config() is not None:
+            return None
+        with self._lock:
+            if self._client is not None:
+                return None
+            if self._initializing:
+                return self._attempt_done
+            if self._error is not None and time.time() - self._last_attempt < self.retry_interval:
+                return None
+            self._initializing = True
+            self._last_attempt = time.time()
+            self.stats['attempts'] += 1
+            self._attempt_done = Event()
+            done = self._attempt_done
+        Thread(target=self._initialize, args=(done,), daemon=True, name="polymarket-client-init").start()
+        return done
+
+    def get(self, timeout: float = INIT_WAIT):
+        """
+        Get the shared client, initializing it if needed.
+
+        Args:
+            timeout: Seconds to wait for an initialization in progress
+
+        Raises:
+            ValueError: If wallet credentials are not configured
+            ClientInitializing: If the client is not ready within timeout
+            Exception: The last initialization error, until it is retried
+        """
+        client = self._client
+        if client is not None:
+            self.stats['hits'] += 1
+            return client
+
+        config_error = check_client_config()
+        if config_error is not None:
+            raise ValueError(config_error)
+
+        done = self.start()
+        if done is not None:
+            done.wait(timeout)
+
+        with self._lock:
+            if self._client is not None:
+                self.stats['hits'] += 1
+                return self._client
+            if self._initializing:
+                raise ClientInitializing("Polymarket client is still initializing, please retry shortly")
+            if self._error is not None:
+                raise self._error
+        raise ClientInitializing("Polymarket client is not initialized")
+
+    async def get_async(self, timeout: float = INIT_WAIT):
+        """get() without blocking the event loop while waiting"""
+        client = self._client
+        if client is not None:
+            self.stats['hits'] += 1
+            return client
+        return await asyncio.to_thread(self.get, timeout)
+
+    def reset(self):
+        """Drop the shared client (e.g. after credentials changed); the next get() rebuilds it"""
+        with self._lock:
+            self._client = None
+            self._error = None
+            self._initialized_at = None
+
+    def status(self) -> Dict:
+        """State of the shared client for health and readiness checks"""
+        config_error = check_client_config()
+        with self._lock:
+            if self._client is not None:
+                state = 'ready'
+            elif config_error is not None:
+                state = 'unconfigured'
+            elif self._initializing:
+                state = 'initializing'
+            elif self._error is not None:
+                state = 'failed'
+            else:
+                state = 'idle'
+            return {
+                'state': state,
+                'ready': state == 'ready',
+                'error': config_error if state == 'unconfigured' else (str(self._error) if self._error else None),
+                'initialized_at': self._initialized_at,
+                'init_seconds': round(self._init_seconds, 2) if self._init_seconds is not None else None,
+                **self.stats,
+            }
+
+
+_client_registry_instance: Optional[ClientRegistry] = None
+_client_registry_lock = Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Get the process-wide client registry (singleton).
+
+    Returns:
+        ClientRegistry instance
+    """
+    global _client_registry_instance
+    if _client_registry_instance is None:
+        with _client_registry_lock:
+            if _client_registry_instance is None:
+                _client_registry_instance = ClientRegistry()
+    return _client_registry_instance
@@ -0,0 +1,252 @@
+"""
+Gamma API Response Cache
+
+Persistent, TTL-based cache for Gamma API GET requests (tags, events and
+markets by slug) shared by every MarketService instance and API worker.
+
+- Responses are stored in a small SQLite file, so they survive restarts and
+  are shared between processes.
+- A fresh entry is returned without any network request. A stale entry is
+  revalidated with If-None-Match / If-Modified-Since when Gamma sent an
+  ETag or Last-Modified header; a 304 only refreshes the entry's age.
+- 404s are cached for a short time so repeated lookups of a bad slug don't
+  spend rate budget.
+- Concurrent lookups of the same URL are coalesced: one thread fetches,
+  the others wait for its result.
+- If Gamma fails and a stale copy exists, the stale copy is served.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from threading import Event, Lock
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from poly_data.rate_limiter import get_rate_limiter
+
+GAMMA_CACHE_PATH = os.getenv(
+    'GAMMA_CACHE_PATH',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'gamma_cache.db')
+)
+
+# Default time-to-live per kind of lookup (seconds)
+TAGS_TTL = 6 * 3600
+SLUG_TTL = 120
+NOT_FOUND_TTL = 60
+
+
+class GammaCache:
+    """
+    Read-through cache for Gamma GET requests.
+    """
+
+    def __init__(self, path: str = GAMMA_CACHE_PATH, default_ttl: float = SLUG_TTL,
+                 not_found_ttl: float = NOT_FOUND_TTL):
+        """
+        Args:
+            path: SQLite file holding cached responses
+            default_ttl: Seconds a response is served without revalidation
+            not_found_ttl: Seconds a 404 is remembered
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.not_found_ttl = not_found_ttl
+        self._lock = Lock()
+        # cache key -> Event set when the in-flight fetch finishes
+        self._inflight: Dict[str, Event] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'coalesced': 0,
+                      'stale_served': 0, 'errors': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, status INTEGER NOT NULL, body TEXT,"
+                " etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ============ Storage ============
+
+    def _load(self, key: str) -> Optional[Dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT status, body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        status, body, etag, last_modified, fetched_at = row
+        return {
+            'status': status,
+            'data': json.loads(body) if body is not None else None,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+        }
+
+    def _store(self, key: str, status: int, data: Any = None, etag: Optional[str] = None,
+               last_modified: Optional[str] = None):
+        body = json.dumps(data) if data is not None else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, body, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, body, etag, last_modified, time.time())
+            )
+
+    def _touch(self, key: str):
+        with self._connect() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    def get_value(self, key: str, ttl: float) -> Optional[Any]:
+        """Return a value stored with put_value if it is younger than ttl seconds"""
+        entry = self._load(f"value:{key}")
+        if entry is None or time.time() - entry['fetched_at'] >= ttl:
+            return None
+        return entry['data']
+
+    def put_value(self, key: str, value: Any):
+        """Store a derived value (e.g. the category -> tag id map)"""
+        self._store(f"value:{key}", 200, value)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
+
+    # ============ Lookups ============
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get_json(self, url: str, params: Optional[Dict] = None, endpoint: str = 'gamma_events',
+                 ttl: Optional[float] = None, timeout: float = 10) -> Tuple[int, Any]:
+        """
+        GET a Gamma URL through the cache.
+
+        Args:
+            url: Request URL
+            params: Query parameters (part of the cache key)
+            endpoint: Rate limiter endpoint to charge when a request is made
+            ttl: Seconds a cached response is used as is (default: default_ttl)
+            timeout: Request timeout in seconds
+
+        Returns:
+            (status_code, parsed JSON or None)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        key = self.make_key(url, params)
+
+        while True:
+            entry = self._load(key)
+            if entry is not None and self._is_fresh(entry, ttl):
+                self.stats['hits'] += 1
+                return entry['status'], entry['data']
+
+            with self._lock:
+                waiting = self._inflight.get(key)
+                if waiting is None:
+                    done = self._inflight[key] = Event()
+            if waiting is None:
+                break
+            # Someone else is fetching this URL: wait, then read their result
+            self.stats['coalesced'] += 1
+            waiting.wait(timeout + 5)
+
+        try:
+            return self._fetch(key, url, params, endpoint, timeout, entry)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            done.set()
+
+    async def get_json_async(self, url: str, params: Optional[Dict] = None, endpoint: str = 'gamma_events',
+                             ttl: Optional[float] = None, timeout: float = 10) -> Tuple[int, Any]:
+        """get_json without blocking the event loop"""
+        return await asyncio.to_thread(self.get_json, url, params, endpoint, ttl, timeout)
+
+    def _is_fresh(self, entry: Dict, ttl: float) -> bool:
+        age = time.time() - entry['fetched_at']
+        if entry['status'] == 404:
+            return age < self.not_found_ttl
+        return entry['status'] == 200 and age < ttl
+
+    def _fetch(self, key: str, url: str, params: Optional[Dict], endpoint: str,
+               timeout: float, entry: Optional[Dict]) -> Tuple[int, Any]:
+        headers = {}
+        if entry is not None and entry['status'] == 200:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        rate_limiter = get_rate_limiter()
+        try:
+            rate_limiter.wait_if_needed_sync(endpoint)
+            response = requests.get(url, params=params, headers=headers, timeout=timeout)
+            rate_limiter.record_request(endpoint)
+        except requests.RequestException as e:
+            self.stats['errors'] += 1
+            if entry is not None and entry['status'] == 200:
+                self.stats['stale_served'] += 1
+                print(f"⚠️  Gamma request failed ({e}), serving cached copy of {key}")
+                return entry['status'], entry['data']
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            self.stats['revalidated'] += 1
+            self._touch(key)
+            return entry['status'], entry['data']
+
+        self.stats['misses'] += 1
+        if response.status_code == 200:
+            data = response.json()
+            self._store(key, 200, data, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return 200, data
+        if response.status_code == 404:
+            self._store(key, 404)
+            return 404, None
+
+        self.stats['errors'] += 1
+        if entry is not None and entry['status'] == 200:
+            self.stats['stale_served'] += 1
+            return entry['status'], entry['data']
+        return response.status_code, None
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+
+# Global singleton instance
+_gamma_cache_instance: Optional[GammaCache] = None
+_gamma_cache_lock = Lock()
+
+
+def get_gamma_cache() -> GammaCache:
+    """
+    Get the global GammaCache instance (singleton pattern).
+
+    Returns:
+        GammaCache instance
+    """
+    global _gamma_cache_instance
+    if _gamma_cache_instance is None:
+        with _gamma_cache_lock:
+            if _gamma_cache_instance is None:
+                _gamma_cache_instance = GammaCache()
+    return _gamma_cache_instance
@@ -0,0 +1,176 @@
+"""
+Concurrent Gamma /events crawler
+
+Walks offset-paginated Gamma endpoints with several pages in flight at once
+over one pooled keep-alive aiohttp session. Every request takes a slot from
+the shared rate limiter (RateLimiter.acquire), so a crawl runs as fast as
+the endpoint's budget allows instead of one round trip at a time.
+
+Pages are yielded as they arrive, not in offset order. The crawl stops
+scheduling new pages once a page comes back short or empty (or the caller
+calls stop_after()), and pages past that point are cancelled or dropped.
+It is abandoned on a non-retryable 4xx or after max_consecutive_errors
+failed pages in a row, so a broken endpoint doesn't drain the rate budget.
+"""
+import asyncio
+import os
+import sys
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import aiohttp
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+from poly_data.rate_limiter import get_rate_limiter
+
+# Pages of /events fetched at once; throughput is still capped by the gamma_events rate limit
+GAMMA_CRAWL_CONCURRENCY = int(os.getenv('GAMMA_CRAWL_CONCURRENCY', '8'))
+
+# Statuses worth retrying after a short backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def extract_events(data) -> Tuple[List[Dict], Optional[bool]]:
+    """
+    Pull the event list and has-more flag out of a Gamma /events response.
+
+    Returns:
+        (events, has_more) where has_more is None if the response doesn't say
+    """
+    if isinstance(data, dict):
+        events = data.get('data', data.get('results', data.get('events', [])))
+        has_more = data.get('hasMore', data.get('has_more', None))
+        return events or [], has_more
+    if isinstance(data, list):
+        return data, None
+    return [], None
+
+
+class GammaPageCrawler:
+    """
+    Fetches pages of an offset-paginated Gamma endpoint concurrently.
+    """
+
+    def __init__(self, url: str, params: Optional[Dict] = None, page_size: int = 100,
+                 max_pages: int = 500, concurrency: int = 8, endpoint: str = 'gamma_events',
+                 timeout: float = 30.0, max_retries: int = 2,
+                 max_consecutive_errors: Optional[int] = None):
+        """
+        Args:
+            url: Endpoint URL
+            params: Query parameters shared by every page (limit/offset are added)
+            page_size: Items per page ('limit')
+            max_pages: Upper bound on pages fetched
+            concurrency: Pages in flight at once
+            endpoint: Rate limiter endpoint to charge
+            timeout: Per-request timeout in seconds
+            max_retries: Retries for 429/5xx responses and network errors
+            max_consecutive_errors: Failed pages in a row that abandon the crawl
+                (default: concurrency)
+        """
+        self.url = url
+        self.params = dict(params or {})
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_consecutive_errors = max_consecutive_errors or concurrency
+        # Pages after this index are not fetched or yielded
+        self._last_page = max_pages - 1
+        # True once a short page, an empty page or a 404 showed where the listing ends
+        self.reached_end = False
+        # True if the crawl was abandoned because of errors
+        self.aborted = False
+        self.stats = {'requests': 0, 'pages': 0, 'errors': 0, 'cancelled': 0}
+
+    def stop_after(self, page: int):
+        """Do not fetch or yield pages after `page` (e.g. once results get too old)"""
+        self._last_page = min(self._last_page, page)
+
+    async def _fetch_page(self, session: aiohttp.ClientSession, page: int) -> Tuple[int, Optional[object]]:
+        params = {**self.params, 'limit': self.page_size, 'offset': page * self.page_size}
+        rate_limiter = get_rate_limiter()
+
+        for attempt in range(self.max_retries + 1):
+            await rate_limiter.acquire(self.endpoint)
+            self.stats['requests'] += 1
+            try:
+                async with session.get(self.url, params=params) as response:
+                    if response.status == 200:
+                        return 200, await response.json(content_type=None)
+                    if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                        return response.status, None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    print(f"  Error fetching page {page + 1}: {e}")
+                    return 0, None
+            await asyncio.sleep(2 ** attempt)
+        return 0, None
+
+    async def pages(self) -> AsyncIterator[Tuple[int, List[Dict]]]:
+        """
+        Yield (page_index, events) as pages complete.
+
+        A 404 or a short/empty page ends the crawl after that page. Other
+        failed pages are reported and skipped, until a non-retryable 4xx or
+        max_consecutive_errors failures in a row abandon the crawl.
+        """
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            in_flight: Dict[asyncio.Task, int] = {}
+            next_page = 0
+            consecutive_errors = 0
+            try:
+                while True:
+                    while len(in_flight) < self.concurrency and next_page <= self._last_page:
+                        task = asyncio.create_task(self._fetch_page(session, next_page))
+                        in_flight[task] = next_page
+                        next_page += 1
+                    if not in_flight:
+                        return
+
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        page = in_flight.pop(task)
+                        status, data = task.result()
+                        if page > self._last_page:
+                            continue
+
+                        if status == 404:
+                            # Past the last page: the end of the listing, not an error
+                            self.reached_end = True
+                            self.stop_after(page)
+                            continue
+                        if status != 200:
+                            self.stats['errors'] += 1
+                            consecutive_errors += 1
+                            print(f"  Error fetching page {page + 1}: {status}")
+                            if (400 <= status < 500 and status not in RETRY_STATUSES) \
+                                    or consecutive_errors >= self.max_consecutive_errors:
+                                print(f"  Abandoning crawl of {self.url}: HTTP {status}, {consecutive_errors} failed pages in a row")
+                                self.aborted = True
+                                self.stop_after(-1)
+                            continue
+
+                        consecutive_errors = 0
+                        events, has_more = extract_events(data)
+                        if len(events) < self.page_size or has_more is False:
+                            self.reached_end = True
+                            self.stop_after(page)
+                        self.stats['pages'] += 1
+                        if events:
+                            yield page, events
+
+                    # Drop requests for pages past a newly found end
+                    for task, page in list(in_flight.items()):
+                        if page > self._last_page:
+                            task.cancel()
+                            del in_flight[task]
+                            self.stats['cancelled'] += 1
+            finally:
+                for task in in_flight:
+                    task.cancel()
+                if in_flight:
+                    await asyncio.gather(*in_flight, return_exceptions=True)
@@ -0,0 +1,481 @@
+"""
+Local mirror of the Gamma event catalog
+
+Keeps active Gamma events (with their nested markets) in a small SQLite
+file, so market fetches, tag/category filters and slug lookups read from
+disk instead of re-downloading the whole active catalog each time.
+
+- sync() crawls active events newest-updatedAt first and stores the ones
+  whose updatedAt changed. Once a complete sync has finished, it stops at
+  the first page where every event is already mirrored at the same
+  version, so a refresh costs a page or two when little changed.
+- sweep_closed() walks recently updated *closed* events (newest first, down
+  to the previous sweep's watermark) and marks mirrored ones closed; closed
+  events drop out of the active listing, so sync() alone never sees them.
+  It runs at most every SWEEP_INTERVAL seconds.
+- refresh() does both; concurrent callers on the same event loop share one
+  refresh.
+
+SQLite work runs in worker threads (asyncio.to_thread) when called from the
+async methods, so large mirror scans don't block the event loop.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from threading import Lock
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from services.gamma_crawler import GAMMA_CRAWL_CONCURRENCY, GammaPageCrawler
+
+GAMMA_API_BASE = "https://gamma-api.polymarket.com"
+
+GAMMA_MIRROR_PATH = os.getenv(
+    'GAMMA_MIRROR_PATH',
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'gamma_mirror.db')
+)
+
+# Seconds between closed/resolved sweeps
+SWEEP_INTERVAL = 3600
+# Mirror data younger than this is served for slug lookups without asking Gamma
+MAX_STALENESS = 600
+
+
+def _event_created(event: Dict) -> Optional[str]:
+    return event.get('creationDate') or event.get('createdAt') or event.get('startDate')
+
+
+def _matches(event: Dict, created_since: Optional[datetime], tag_id) -> bool:
+    """The filters of iter_events(), applied to an event from a live page"""
+    if tag_id is not None and str(tag_id) not in {
+            str(tag.get('id')) for tag in (event.get('tags') or []) if isinstance(tag, dict)}:
+        return False
+    created = _event_created(event)
+    return created_since is None or created is None or created >= created_since.strftime('%Y-%m-%d')
+
+
+class GammaMirror:
+    """
+    SQLite mirror of active Gamma events and their markets.
+    """
+
+    def __init__(self, path: str = GAMMA_MIRROR_PATH, base_url: str = GAMMA_API_BASE,
+                 concurrency: int = GAMMA_CRAWL_CONCURRENCY, page_size: int = 100):
+        """
+        Args:
+            path: SQLite file holding the mirror
+            base_url: Gamma API base URL
+            concurrency: Pages in flight during a sync
+            page_size: Events per page
+        """
+        self.path = path
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.page_size = page_size
+        # One refresh lock per event loop (an asyncio.Lock belongs to a single loop)
+        self._refresh_locks: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = WeakKeyDictionary()
+        self._locks_guard = Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.stats = {'syncs': 0, 'sweeps': 0, 'pages': 0, 'requests': 0, 'events_changed': 0,
+                      'events_closed': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " id TEXT PRIMARY KEY, slug TEXT, updated_at TEXT, created_at TEXT,"
+                " closed INTEGER NOT NULL DEFAULT 0, body TEXT NOT NULL, synced_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS ix_events_slug ON events (slug);"
+                "CREATE INDEX IF NOT EXISTS ix_events_active_created ON events (closed, created_at);"
+                "CREATE TABLE IF NOT EXISTS event_tags ("
+                " tag_id TEXT NOT NULL, event_id TEXT NOT NULL, PRIMARY KEY (tag_id, event_id));"
+                "CREATE TABLE IF NOT EXISTS event_markets ("
+                " slug TEXT NOT NULL, event_id TEXT NOT NULL, market_index INTEGER NOT NULL,"
+                " PRIMARY KEY (slug, event_id));"
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+            )
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # ============ Metadata ============
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _save_meta(self, **values):
+        with self._connect() as conn:
+            for key, value in values.items():
+                self._set_meta(conn, key, value)
+
+    def last_synced(self) -> Optional[float]:
+        """Time of the last completed sync (epoch seconds), or None"""
+        value = self._get_meta('synced_at')
+        return float(value) if value else None
+
+    def is_fresh(self, max_age: float = MAX_STALENESS) -> bool:
+        synced = self.last_synced()
+        return synced is not None and time.time() - synced < max_age
+
+    # ============ Writes ============
+
+    def _versions(self, conn: sqlite3.Connection, event_ids: List[str]) -> Dict[str, Tuple]:
+        if not event_ids:
+            return {}
+        marks = ','.join('?' * len(event_ids))
+        rows = conn.execute(
+            f"SELECT id, updated_at, closed FROM events WHERE id IN ({marks})", event_ids
+        ).fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def _store_events(self, conn: sqlite3.Connection, events: List[Dict], closed: bool):
+        now = time.time()
+        event_ids = [str(event['id']) for event in events]
+        conn.execute(
+            f"DELETE FROM event_tags WHERE event_id IN ({','.join('?' * len(event_ids))})", event_ids
+        )
+        conn.execute(
+            f"DELETE FROM event_markets WHERE event_id IN ({','.join('?' * len(event_ids))})", event_ids
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO events (id, slug, updated_at, created_at, closed, body, synced_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(str(event['id']), event.get('slug'), event.get('updatedAt'),
+              _event_created(event),
+              int(closed), json.dumps(event), now) for event in events]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO event_tags (tag_id, event_id) VALUES (?, ?)",
+            [(str(tag['id']), str(event['id'])) for event in events
+             for tag in (event.get('tags') or []) if isinstance(tag, dict) and tag.get('id') is not None]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO event_markets (slug, event_id, market_index) VALUES (?, ?, ?)",
+            [(market['slug'], str(event['id']), index) for event in events
+             for index, market in enumerate(event.get('markets') or [])
+             if isinstance(market, dict) and market.get('slug')]
+        )
+
+    def apply_active_page(self, events: List[Dict]) -> int:
+        """
+        Store events from an active-events page whose version changed.
+
+        Returns:
+            Number of new or changed events (0 means the page was already mirrored)
+        """
+        events = [event for event in events if event.get('id') is not None]
+        with self._connect() as conn:
+            known = self._versions(conn, [str(event['id']) for event in events])
+            changed = [event for event in events
+                       if known.get(str(event['id'])) != (event.get('updatedAt'), 0)]
+            if changed:
+                self._store_events(conn, changed, closed=False)
+        return len(changed)
+
+    def apply_closed_page(self, events: List[Dict]) -> int:
+        """
+        Mark mirrored events from a closed-events page as closed. Closed
+        events that were never mirrored are ignored.
+
+        Returns:
+            Number of events newly marked closed
+        """
+        events = [event for event in events if event.get('id') is not None]
+        with self._connect() as conn:
+            known = self._versions(conn, [str(event['id']) for event in events])
+            closing = [event for event in events
+                       if str(event['id']) in known and known[str(event['id'])][1] == 0]
+            if closing:
+                self._store_events(conn, closing, closed=True)
+        return len(closing)
+
+    # ============ Sync ============
+
+    def _crawler(self, params: Dict, max_pages: int) -> GammaPageCrawler:
+        return GammaPageCrawler(
+            f"{self.base_url}/events",
+            params={**params, 'order': 'updatedAt', 'ascending': 'false'},
+            page_size=self.page_size,
+            max_pages=max_pages,
+            concurrency=self.concurrency,
+            endpoint='gamma_events',
+        )
+
+    async def sync(self, max_pages: int = 500,
+                   on_page: Optional[Callable[[List[Dict]], None]] = None) -> Dict:
+        """
+        Bring active events up to date.
+
+        Args:
+            max_pages: Upper bound on pages crawled
+            on_page: Called with each page's events once they are stored
+
+        Returns:
+            dict with pages, requests, changed and full (whether every page was crawled)
+        """
+        incremental = await asyncio.to_thread(self._get_meta, 'complete') == '1'
+        crawler = self._crawler({'closed': 'false'}, max_pages)
+        changed = 0
+        async for page, events in crawler.pages():
+            page_changed = await asyncio.to_thread(self.apply_active_page, events)
+            changed += page_changed
+            if on_page is not None:
+                on_page(events)
+            # Newest versions come first: a fully mirrored page means the rest is too
+            if incremental and page_changed == 0:
+                crawler.stop_after(page)
+
+        succeeded = crawler.stats['errors'] == 0 and not crawler.aborted
+        if succeeded and (incremental or crawler.reached_end):
+            # A first sync only counts as complete once it reached the end of the
+            # listing; one cut off at max_pages is redone in full next time
+            await asyncio.to_thread(self._save_meta, complete=1, synced_at=time.time())
+
+        self.stats['syncs'] += 1
+        self.stats['pages'] += crawler.stats['pages']
+        self.stats['requests'] += crawler.stats['requests']
+        self.stats['events_changed'] += changed
+        print(f"🪞 Gamma mirror sync: {changed} events changed, {crawler.stats['pages']} pages, "
+              f"{crawler.stats['requests']} requests ({'incremental' if incremental else 'full'})")
+        return {'pages': crawler.stats['pages'], 'requests': crawler.stats['requests'],
+                'changed': changed, 'full': not incremental}
+
+    async def sweep_closed(self, max_pages: int = 50) -> int:
+        """
+        Mark mirrored events that were closed since the previous sweep.
+
+        Returns:
+            Number of events marked closed
+        """
+        watermark = await asyncio.to_thread(self._get_meta, 'closed_watermark')
+        crawler = self._crawler({'closed': 'true'}, max_pages)
+        closed = 0
+        newest = watermark
+        async for page, events in crawler.pages():
+            closed += await asyncio.to_thread(self.apply_closed_page, events)
+            versions = [event.get('updatedAt') for event in events if event.get('updatedAt')]
+            if versions:
+                newest = max([newest] + versions) if newest else max(versions)
+                # Everything after this page was already swept last time
+                if watermark and min(versions) <= watermark:
+                    crawler.stop_after(page)
+            if watermark is None:
+                # First sweep: the newest page sets the watermark; older closures
+                # were never in the active listing we mirrored
+                crawler.stop_after(page)
+
+        meta = {'swept_at': time.time()}
+        if newest:
+            meta['closed_watermark'] = newest
+        await asyncio.to_thread(self._save_meta, **meta)
+
+        self.stats['sweeps'] += 1
+        self.stats['requests'] += crawler.stats['requests']
+        self.stats['events_closed'] += closed
+        print(f"🪞 Gamma mirror sweep: {closed} events closed, {crawler.stats['requests']} requests")
+        return closed
+
+    async def refresh(self, sweep_interval: float = SWEEP_INTERVAL,
+                      on_page: Optional[Callable[[List[Dict]], None]] = None) -> Dict:
+        """
+        sync(), plus sweep_closed() if the last sweep is older than sweep_interval.
+        Concurrent callers on the same loop wait for the refresh already running
+        (their on_page is not called).
+        """
+        refresh_lock = self._refresh_lock()
+        if refresh_lock.locked():
+            async with refresh_lock:
+                return {'coalesced': True}
+
+        async with refresh_lock:
+            result = await self.sync(on_page=on_page)
+            swept_at = await asyncio.to_thread(self._get_meta, 'swept_at')
+            if swept_at is None or time.time() - float(swept_at) >= sweep_interval:
+                result['closed'] = await self.sweep_closed()
+            return result
+
+    def _refresh_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._locks_guard:
+            lock = self._refresh_locks.get(loop)
+            if lock is None:
+                lock = self._refresh_locks[loop] = asyncio.Lock()
+        return lock
+
+    def refresh_in_background(self):
+        """Start refresh() on the running loop unless one is already scheduled there"""
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._refresh_task = asyncio.ensure_future(self.refresh())
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️  Gamma mirror refresh failed ({task.exception()}), serving mirrored data as is")
+
+    # ============ Reads ============
+
+    def event_by_slug(self, slug: str) -> Optional[Dict]:
+        """Mirrored active event with this slug, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT body FROM events WHERE slug = ? AND closed = 0", (slug,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def market_by_slug(self, slug: str) -> Optional[Tuple[Dict, Dict]]:
+        """(market, event) for a mirrored active market slug, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT e.body, m.market_index FROM event_markets m JOIN events e ON e.id = m.event_id"
+                " WHERE m.slug = ? AND e.closed = 0", (slug,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        event = json.loads(row[0])
+        return event['markets'][row[1]], event
+
+    def iter_events(self, created_since: Optional[datetime] = None, tag_id=None,
+                    batch_size: int = 100) -> Iterator[List[Dict]]:
+        """
+        Yield batches of active events, newest created first.
+
+        Args:
+            created_since: Only events created at or after this time
+            tag_id: Only events with this Gamma tag
+            batch_size: Events per batch
+        """
+        query = "SELECT e.body FROM events e"
+        params: list = []
+        if tag_id is not None:
+            query += " JOIN event_tags t ON t.event_id = e.id AND t.tag_id = ?"
+            params.append(str(tag_id))
+        query += " WHERE e.closed = 0"
+        if created_since is not None:
+            # Events without a parseable date are kept, as in the live crawl
+            query += " AND (e.created_at IS NULL OR e.created_at >= ?)"
+            params.append(created_since.strftime('%Y-%m-%d'))
+        query += " ORDER BY e.created_at DESC"
+
+        # The async variant resumes this generator from different worker threads
+        conn = self._connect(check_same_thread=False)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [json.loads(row[0]) for row in rows]
+        finally:
+            conn.close()
+
+    async def iter_events_async(self, created_since: Optional[datetime] = None, tag_id=None,
+                                batch_size: int = 100) -> AsyncIterator[List[Dict]]:
+        """iter_events() with each batch read in a worker thread"""
+        batches = self.iter_events(created_since=created_since, tag_id=tag_id, batch_size=batch_size)
+        try:
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            try:
+                await asyncio.to_thread(batches.close)
+            except ValueError:
+                # Cancelled while a batch was being read; the connection closes with the generator
+                pass
+
+    async def events_async(self, created_since: Optional[datetime] = None, tag_id=None,
+                           batch_size: int = 100) -> AsyncIterator[List[Dict]]:
+        """
+        Active events for a listing, without waiting for a refresh.
+
+        A mirror that has synced before is served as it is while a refresh
+        runs in the background. A cold mirror is filled by a refresh whose
+        pages are yielded (filtered, in crawl order) as soon as they are
+        stored.
+        """
+        if await asyncio.to_thread(self.last_synced) is not None:
+            self.refresh_in_background()
+            async for batch in self.iter_events_async(created_since=created_since, tag_id=tag_id,
+                                                      batch_size=batch_size):
+                yield batch
+            return
+
+        pages: asyncio.Queue = asyncio.Queue()
+        refresh = asyncio.ensure_future(self.refresh(on_page=pages.put_nowait))
+        refresh.add_done_callback(lambda _: pages.put_nowait(None))
+        streamed = False
+        try:
+            while True:
+                events = await pages.get()
+                if events is None:
+                    break
+                matching = [event for event in events if _matches(event, created_since, tag_id)]
+                if matching:
+                    streamed = True
+                    yield matching
+        finally:
+            if not refresh.done():
+                # The caller stopped early; let the sync finish filling the mirror
+                refresh.add_done_callback(self._log_refresh_error)
+        if refresh.exception() is not None:
+            print(f"⚠️  Gamma mirror refresh failed ({refresh.exception()}), serving mirrored data as is")
+        if not streamed and (refresh.exception() is not None or refresh.result().get('coalesced')):
+            # Another caller's refresh filled the mirror (or ours failed part way)
+            async for batch in self.iter_events_async(created_since=created_since, tag_id=tag_id,
+                                                      batch_size=batch_size):
+                yield batch
+
+    def get_stats(self) -> Dict:
+        conn = self._connect()
+        try:
+            active, closed = conn.execute(
+                "SELECT COALESCE(SUM(closed = 0), 0), COALESCE(SUM(closed = 1), 0) FROM events"
+            ).fetchone()
+        finally:
+            conn.close()
+        return {**self.stats, 'active_events': active, 'closed_events': closed,
+                'last_synced': self.last_synced()}
+
+
+# Global singleton instance
+_gamma_mirror_instance: Optional[GammaMirror] = None
+_gamma_mirror_lock = Lock()
+
+
+def get_gamma_mirror() -> GammaMirror:
+    """
+    Get the global GammaMirror instance (singleton pattern).
+
+    Returns:
+        GammaMirror instance
+    """
+    global _gamma_mirror_instance
+    if _gamma_mirror_instance is None:
+        with _gamma_mirror_lock:
+            if _gamma_mirror_instance is None:
+                _gamma_mirror_instance = GammaMirror()
+    return _gamma_mirror_instance
@@ -0,0 +1,158 @@
+"""
+Streaming market ingestion pipeline
+
+Runs a market fetch as four concurrent stages connected by bounded asyncio
+queues:
+
+    crawl (pages of events) -> parse (sub-markets) -> categorize -> upsert (batches)
+
+Markets are written to the database while the crawl is still running, so
+the first markets show up within seconds, and at most a few pages/batches
+are held in memory at once: when the database falls behind, the full queues
+pause the crawl instead of letting results pile up.
+
+Per-stage counters are kept in `stages` (a plain dict that can be exposed
+as is, e.g. through /api/markets/fetch/status).
+"""
+import asyncio
+import time
+from typing import AsyncIterable, Callable, Dict, List, Optional, Tuple
+
+# Marks the end of a queue's stream
+_DONE = object()
+
+
+class IngestPipeline:
+    """
+    crawl -> parse -> categorize -> upsert, with backpressure.
+    """
+
+    def __init__(self, pages: AsyncIterable[Tuple[int, List[Dict]]],
+                 parse: Callable[[List[Dict]], List[Tuple[Dict, str]]],
+                 categorize: Callable[[List[Tuple[Dict, str]]], List[Dict]],
+                 save: Callable[[List[Dict]], Tuple[int, List[str]]],
+                 batch_size: int = 500, queue_size: int = 4,
+                 on_progress: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            pages: Async iterable of (page_index, events)
+            parse: events -> (market, categorization context) pairs
+            categorize: (market, context) pairs -> categorized markets
+            save: Blocking batch writer returning (saved_count, errors); runs in a worker thread
+            batch_size: Markets per upsert batch
+            queue_size: Items (pages or batches) buffered between two stages
+            on_progress: Called with `stages` whenever a stage finishes a page or batch
+        """
+        self.pages = pages
+        self.parse = parse
+        self.categorize = categorize
+        self.save = save
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.on_progress = on_progress
+        self.errors: List[str] = []
+        self.stages = {
+            'crawl': {'pages': 0, 'events': 0, 'done': False},
+            'parse': {'pages': 0, 'markets': 0, 'queued': 0, 'done': False},
+            'categorize': {'markets': 0, 'queued': 0, 'done': False},
+            'upsert': {'batches': 0, 'processed': 0, 'saved': 0, 'errors': 0, 'queued': 0, 'done': False},
+        }
+        self.first_saved_after = None
+
+    def _report(self):
+        if self.on_progress is not None:
+            self.on_progress(self.stages)
+
+    async def _crawl(self, outbox: asyncio.Queue):
+        stats = self.stages['crawl']
+        async for _, events in self.pages:
+            stats['pages'] += 1
+            stats['events'] += len(events)
+            self._report()
+            await outbox.put(events)
+        stats['done'] = True
+        self._report()
+        await outbox.put(_DONE)
+
+    async def _parse(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        stats = self.stages['parse']
+        while True:
+            events = await inbox.get()
+            stats['queued'] = inbox.qsize()
+            if events is _DONE:
+                break
+            items = self.parse(events)
+            stats['pages'] += 1
+            stats['markets'] += len(items)
+            self._report()
+            if items:
+                await outbox.put(items)
+        stats['done'] = True
+        await outbox.put(_DONE)
+
+    async def _categorize(self, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        stats = self.stages['categorize']
+        batch: List[Dict] = []
+        while True:
+            items = await inbox.get()
+            stats['queued'] = inbox.qsize()
+            if items is _DONE:
+                break
+            markets = self.categorize(items)
+            stats['markets'] += len(markets)
+            self._report()
+            batch.extend(markets)
+            while len(batch) >= self.batch_size:
+                await outbox.put(batch[:self.batch_size])
+                batch = batch[self.batch_size:]
+        if batch:
+            await outbox.put(batch)
+        stats['done'] = True
+        await outbox.put(_DONE)
+
+    async def _upsert(self, inbox: asyncio.Queue, started: float):
+        stats = self.stages['upsert']
+        while True:
+            batch = await inbox.get()
+            stats['queued'] = inbox.qsize()
+            if batch is _DONE:
+                break
+            saved, errors = await asyncio.to_thread(self.save, batch)
+            stats['batches'] += 1
+            stats['processed'] += len(batch)
+            stats['saved'] += saved
+            stats['errors'] += len(errors)
+            self.errors.extend(errors)
+            self._report()
+            if saved and self.first_saved_after is None:
+                self.first_saved_after = time.monotonic() - started
+                print(f"💾 First {saved} markets saved after {self.first_saved_after:.1f}s")
+        stats['done'] = True
+        self._report()
+
+    async def run(self) -> Tuple[int, List[str]]:
+        """
+        Run all stages to completion. If any stage fails, the others are
+        cancelled and the error is raised.
+
+        Returns:
+            (saved_count, errors)
+        """
+        started = time.monotonic()
+        events_q = asyncio.Queue(self.queue_size)
+        parsed_q = asyncio.Queue(self.queue_size)
+        batches_q = asyncio.Queue(self.queue_size)
+        tasks = [
+            asyncio.create_task(self._crawl(events_q)),
+            asyncio.create_task(self._parse(events_q, parsed_q)),
+            asyncio.create_task(self._categorize(parsed_q, batches_q)),
+            asyncio.create_task(self._upsert(batches_q, started)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return self.stages['upsert']['saved'], self.errors
@@ -3,6 +3,10 @@ Market Cache Service
 
 Provides synchronization between database and cache, with periodic refresh
 and event-driven invalidation.
+
+A full refresh loads every active market and swaps it into the mapper in one
+step, so lookups never see a half-filled cache. Between full refreshes only
+markets (or trading params) whose updated_at moved are reloaded.
 """
 import threading
 import time
@@ -11,10 +15,17 @@ from datetime import datetime, timedelta
 import sys
 import os
 
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from database import SessionLocal, Market
+from database import SessionLocal, Market, TradingParams
 from services.market_mapping_service import get_market_mapper
 
+# Incremental refreshes re-read this far behind the last one, so rows whose
+# updated_at was set just before a slow commit are not missed
+INCREMENTAL_OVERLAP = timedelta(seconds=5)
+
 
 class MarketCacheService:
     """
@@ -22,23 +33,31 @@ class MarketCacheService:
     Provides periodic refresh and event-driven invalidation.
     """
     
-    def __init__(self, refresh_interval_seconds: int = 300):
+    def __init__(self, refresh_interval_seconds: int = 300, incremental_interval_seconds: int = 15):
         """
         Initialize the cache service.
         
         Args:
-            refresh_interval_seconds: How often to refresh cache from database (default: 5 minutes)
+            refresh_interval_seconds: How often to fully reload the cache from database (default: 5 minutes)
+            incremental_interval_seconds: How often to reload changed markets in between (default: 15s)
         """
         self.refresh_interval = refresh_interval_seconds
+        self.incremental_interval = incremental_interval_seconds
         self.mapper = get_market_mapper()
         self._lock = threading.Lock()
         self._refresh_thread: Optional[threading.Thread] = None
         self._stop_refresh = threading.Event()
         self._last_refresh: Optional[datetime] = None
+        self._last_full_refresh: Optional[float] = None  # time.monotonic()
+        self._changed_since: Optional[datetime] = None
         self._is_running = False
+        self.stats = {'full_refreshes': 0, 'incremental_refreshes': 0, 'markets_reloaded': 0}
     
     def start_periodic_refresh(self):
-        """Start periodic cache refresh in background thread"""
+        """
+        Start periodic cache refresh in background thread.
+        Does a full refresh first unless one was just done (e.g. at startup).
+        """
         if self._is_running:
             return
         
@@ -48,17 +67,22 @@ class MarketCacheService:
         def refresh_loop():
             while not self._stop_refresh.is_set():
                 try:
-                    self.refresh_cache()
+                    last_full = self._last_full_refresh
+                    if last_full is None or time.monotonic() - last_full >= self.refresh_interval:
+                        self.refresh_cache()
+                    else:
+                        self.refresh_changed()
                 except Exception as e:
                     print(f"Error in cache refresh: {e}")
                 
-                # Wait for refresh interval or until stop event
-                if self._stop_refresh.wait(timeout=self.refresh_interval):
+                # Wait for next refresh or until stop event
+                if self._stop_refresh.wait(timeout=self.incremental_interval):
                     break
         
         self._refresh_thread = threading.Thread(target=refresh_loop, daemon=True)
         self._refresh_thread.start()
-        print(f"Market cache service started with {self.refresh_interval}s refresh interval")
+        print(f"Market cache service started with {self.refresh_interval}s full / "
+              f"{self.incremental_interval}s incremental refresh interval")
     
     def stop_periodic_refresh(self):
         """Stop periodic cache refresh"""
@@ -71,36 +95,79 @@ class MarketCacheService:
         self._is_running = False
         print("Market cache service stopped")
     
+    def _load_markets(self, changed_since: Optional[datetime] = None) -> List[Market]:
+        """
+        Load detached markets with their trading params.
+        
+        Args:
+            changed_since: Only markets whose row or trading params were updated
+                at or after this time (default: all active markets)
+        """
+        db = SessionLocal()
+        try:
+            query = db.query(Market).options(joinedload(Market.trading_params))
+            if changed_since is None:
+                query = query.filter(Market.is_active == True)
+            else:
+                query = query.outerjoin(TradingParams, TradingParams.market_id == Market.id).filter(
+                    or_(Market.updated_at >= changed_since, TradingParams.updated_at >= changed_since)
+                )
+            return query.all()
+        finally:
+            db.close()
+    
     def refresh_cache(self):
         """
         Refresh cache from database.
-        Loads all active markets and updates the cache.
+        Loads all active markets and swaps them into the cache atomically.
         """
-        db = SessionLocal()
         try:
-            # Get all active markets
-            markets = db.query(Market).filter(Market.is_active == True).all()
+            started = datetime.utcnow()
+            markets = self._load_markets()
+            
+            # Built off-lock and swapped in, lookups keep hitting the old cache meanwhile
+            self.mapper.replace(markets)
             
             with self._lock:
-                # Clear existing cache
-                self.mapper.clear_cache()
-                
-                # Pre-populate cache with all active markets
-                for market in markets:
-                    # Add to cache by condition_id
-                    self.mapper._condition_to_market_cache[market.condition_id] = market
-                    # Add to cache by token1
-                    self.mapper._token_to_market_cache[str(market.token1)] = market
-                    # Add to cache by token2
-                    self.mapper._token_to_market_cache[str(market.token2)] = market
-                
-                self._last_refresh = datetime.utcnow()
+                self._last_refresh = started
+                self._last_full_refresh = time.monotonic()
+                self._changed_since = started - INCREMENTAL_OVERLAP
+                self.stats['full_refreshes'] += 1
+                self.stats['markets_reloaded'] += len(markets)
             
             print(f"Cache refreshed: {len(markets)} active markets loaded")
         except Exception as e:
             print(f"Error refreshing cache: {e}")
-        finally:
-            db.close()
+    
+    def refresh_changed(self) -> int:
+        """
+        Reload only markets changed since the last refresh.
+        Falls back to a full refresh if there was none yet.
+        
+        Returns:
+            Number of markets reloaded
+        """
+        with self._lock:
+            changed_since = self._changed_since
+        if changed_since is None:
+            self.refresh_cache()
+            return 0
+        
+        try:
+            started = datetime.utcnow()
+            markets = self._load_markets(changed_since)
+            if markets:
+                self.mapper.prime(markets)
+            
+            with self._lock:
+                self._last_refresh = started
+                self._changed_since = started - INCREMENTAL_OVERLAP
+                self.stats['incremental_refreshes'] += 1
+                self.stats['markets_reloaded'] += len(markets)
+            return len(markets)
+        except Exception as e:
+            print(f"Error refreshing changed markets: {e}")
+            return 0
     
     def invalidate_market(self, market_id: Optional[int] = None, condition_id: Optional[str] = None, 
                          token_id: Optional[str] = None):
@@ -130,7 +197,21 @@ class MarketCacheService:
                 self.mapper.invalidate_market_cache(market)
         finally:
             db.close()
-    
+
+    def invalidate_markets(self, markets):
+        """
+        Invalidate cache entries for many markets at once, without querying the database.
+
+        Args:
+            markets: Iterable of rows or objects with token1, token2 and condition_id
+        """
+        token_ids = []
+        condition_ids = []
+        for market in markets:
+            token_ids.extend((market.token1, market.token2))
+            condition_ids.append(market.condition_id)
+        self.mapper.invalidate_many(token_ids=token_ids, condition_ids=condition_ids)
+
     def get_cache_stats(self) -> Dict:
         """
         Get cache statistics.
@@ -145,7 +226,9 @@ class MarketCacheService:
                 **mapper_stats,
                 'last_refresh': self._last_refresh.isoformat() if self._last_refresh else None,
                 'is_running': self._is_running,
-                'refresh_interval_seconds': self.refresh_interval
+                'refresh_interval_seconds': self.refresh_interval,
+                'incremental_interval_seconds': self.incremental_interval,
+                **self.stats
             }
     
     def clear_all_cache(self):
@@ -153,6 +236,8 @@ class MarketCacheService:
         self.mapper.clear_cache()
         with self._lock:
             self._last_refresh = None
+            self._last_full_refresh = None
+            self._changed_since = None
 
 
 # Global singleton instance
@@ -0,0 +1,243 @@
+"""
+Compiled market categorizer
+
+All keyword groups used to categorize markets are compiled once into lookup
+tables of words and phrases -> groups. A question is split into words once;
+single-word keywords are found with one set intersection and phrases are
+only looked up at words that can start one, so every matching group is
+known after a single pass (instead of one substring scan per keyword).
+
+Keywords match whole words. Keywords of 4+ characters also match simple
+inflections (s/es/d/ed), so 'election' matches 'elections' and 'resign'
+matches 'resigned', while short tickers like 'eth' or 'sol' no longer match
+inside 'whether' or 'resolve'.
+
+categorize_many() categorizes large batches, optionally across a process
+pool for full-catalog runs.
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Crypto coin names and tickers
+CRYPTO_COINS = [
+    'bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol',
+    'dogecoin', 'doge', 'ripple', 'xrp', 'ethereum classic', 'etc',
+    'hyperliquid', 'hype', 'cardano', 'ada', 'polkadot', 'dot',
+    'avalanche', 'avax', 'polygon', 'matic', 'chainlink', 'link',
+    'litecoin', 'ltc', 'shiba', 'uniswap', 'uni', 'aave', 'maker', 'mkr',
+    'compound', 'comp', 'tether', 'usdt', 'usdc', 'dai', 'binance', 'bnb',
+    'fantom', 'ftm', 'cosmos', 'atom', 'algorand', 'algo', 'tezos', 'xtz',
+    'monero', 'xmr', 'zcash', 'zec', 'stellar', 'xlm', 'eos', 'tron', 'trx',
+    'neo', 'dash', 'iota', 'vechain', 'vet', 'theta', 'filecoin', 'fil',
+]
+
+# Price-related patterns (only relevant if a crypto coin is present)
+PRICE_PATTERNS = ['price', 'hit', 'reach', 'above', 'below', 'trading at', 'close at', 'settle at']
+
+TIME_PATTERNS = [
+    'november', 'december', 'january', 'february', 'march', 'april',
+    'may', 'june', 'july', 'august', 'september', 'october',
+    'weekly', 'monthly', 'daily', 'end of', 'by end', 'by',
+]
+
+# Crypto-specific question patterns
+CRYPTO_QUESTION_PATTERNS = [
+    'what price will', 'what will', 'will bitcoin', 'will ethereum', 'will solana',
+    'will doge', 'will xrp', 'will etc', 'will hype', 'bitcoin price', 'ethereum price',
+    'solana price', 'doge price', 'xrp price', 'etc price', 'hype price',
+    'bitcoin hit', 'ethereum hit', 'solana hit', 'bitcoin reach', 'ethereum reach',
+]
+
+# Crypto terms that are enough on their own
+EXPLICIT_CRYPTO_TERMS = ['crypto', 'cryptocurrency', 'blockchain', 'defi', 'nft', 'web3', 'metaverse']
+
+# Non-crypto categories, checked in this order
+CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    'politics': [
+        'president', 'election', 'trump', 'biden', 'senate', 'congress', 'house', 'senator',
+        'governor', 'mayor', 'vote', 'voting', 'ballot', 'democrat', 'republican', 'party',
+        'impeachment', 'supreme court', 'judge', 'nomination', 'cabinet', 'federal', 'state',
+        'primary', 'caucus', 'debate', 'poll', 'approval rating', 'resign', 'impeach',
+    ],
+    'sports': [
+        'nfl', 'nba', 'mlb', 'nhl', 'soccer', 'football', 'basketball', 'baseball', 'hockey',
+        'tennis', 'golf', 'boxing', 'ufc', 'mma', 'olympics', 'world cup', 'super bowl',
+        'championship', 'playoff', 'final', 'semifinal', 'quarterfinal', 'game',
+        'match', 'team', 'player', 'coach', 'draft', 'trade', 'injury', 'retire', 'mvp',
+        'heisman', 'stanley cup', 'world series', 'nba finals',
+    ],
+    'economics': [
+        'fed', 'federal reserve', 'interest rate', 'inflation', 'gdp', 'unemployment',
+        'jobs report', 'economic', 'recession', 'depression', 'stock market', 'dow',
+        's&p', 'nasdaq', 'dollar', 'currency', 'yen', 'euro', 'pound', 'trade war',
+        'tariff', 'import', 'export', 'gdp growth', 'consumer price', 'cpi', 'ppi',
+    ],
+    'entertainment': [
+        'movie', 'film', 'oscar', 'grammy', 'emmy', 'award', 'celebrity', 'actor',
+        'actress', 'director', 'producer', 'album', 'song', 'music', 'tv show',
+        'television', 'streaming', 'netflix', 'disney', 'marvel', 'dc', 'comic',
+        'book', 'author', 'release', 'premiere', 'box office', 'ticket sales',
+    ],
+    'technology': [
+        'ai', 'artificial intelligence', 'chatgpt', 'openai', 'google', 'apple', 'microsoft',
+        'amazon', 'meta', 'facebook', 'twitter', 'x.com', 'tesla', 'spacex', 'tech', 'technology',
+        'software', 'hardware', 'chip', 'semiconductor', 'nvidia', 'amd', 'intel', 'iphone',
+        'ipad', 'macbook', 'product launch', 'release date',
+    ],
+    'science': [
+        'nasa', 'space', 'rocket', 'mars', 'moon', 'planet', 'asteroid', 'comet', 'earthquake',
+        'volcano', 'climate', 'global warming', 'temperature', 'weather', 'hurricane', 'tornado',
+        'research', 'study', 'discovery', 'scientist', 'nobel prize', 'medicine', 'drug',
+        'vaccine', 'cure', 'treatment', 'disease', 'pandemic', 'epidemic',
+    ],
+}
+
+KEYWORD_GROUPS: Dict[str, List[str]] = {
+    'coin': CRYPTO_COINS,
+    'price': PRICE_PATTERNS,
+    'time': TIME_PATTERNS,
+    'crypto_question': CRYPTO_QUESTION_PATTERNS,
+    'crypto_term': EXPLICIT_CRYPTO_TERMS,
+    **CATEGORY_KEYWORDS,
+}
+
+# Groups whose keywords are exact tokens (tickers); no inflections
+_EXACT_GROUPS = {'coin'}
+_SUFFIXES = ('s', 'es', 'd', 'ed')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _surface_forms(keyword: str, inflect: bool) -> List[Tuple[str, ...]]:
+    """Word tuples a keyword matches ('s&p' -> ('s', 'p'); 'vote' -> ('vote',), ('votes',), ...)"""
+    tokens = tuple(_TOKEN_RE.findall(keyword))
+    forms = [tokens]
+    if inflect and len(keyword) >= 4 and keyword[-1].isalpha():
+        forms += [tokens[:-1] + (tokens[-1] + suffix,) for suffix in _SUFFIXES]
+    return forms
+
+
+class MarketCategorizer:
+    """
+    Single-pass keyword matcher for market categorization.
+    """
+
+    def __init__(self, groups: Dict[str, Sequence[str]] = None):
+        """
+        Args:
+            groups: Group name -> keywords (default: KEYWORD_GROUPS)
+        """
+        groups = groups or KEYWORD_GROUPS
+        # keyword -> names of the groups it belongs to
+        keyword_groups: Dict[str, Set[str]] = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                keyword_groups.setdefault(keyword, set()).add(group)
+
+        # Compile every keyword into lookup tables keyed by its words
+        # ('s&p' -> 's p'). A keyword listed in an exact group (e.g. a ticker)
+        # is never inflected.
+        table: Dict[str, Set[str]] = {}
+        for keyword, in_groups in keyword_groups.items():
+            for form in _surface_forms(keyword, not (in_groups & _EXACT_GROUPS)):
+                table.setdefault(' '.join(form), set()).update(in_groups)
+        self._words = {form: frozenset(hit) for form, hit in table.items() if ' ' not in form}
+        self._phrases = {form: frozenset(hit) for form, hit in table.items() if ' ' in form}
+        self._word_keys = frozenset(self._words)
+        self._phrase_starts = frozenset(form.split(' ', 1)[0] for form in self._phrases)
+        self._max_words = max(form.count(' ') + 1 for form in table)
+
+    def groups(self, text: str) -> Set[str]:
+        """Names of all keyword groups matched anywhere in text (one pass over its words)"""
+        found: Set[str] = set()
+        if not text:
+            return found
+        tokens = _TOKEN_RE.findall(text.lower())
+        distinct = set(tokens)
+        # Single-word keywords: one set intersection
+        for word in distinct & self._word_keys:
+            found |= self._words[word]
+        # Phrases: only walk the text if a word that starts one is present
+        if not distinct.isdisjoint(self._phrase_starts):
+            phrases, starts = self._phrases, self._phrase_starts
+            for i, token in enumerate(tokens):
+                if token in starts:
+                    for n in range(2, self._max_words + 1):
+                        hit = phrases.get(' '.join(tokens[i:i + n]))
+                        if hit:
+                            found |= hit
+        return found
+
+    @staticmethod
+    def _is_crypto(found: Set[str]) -> bool:
+        # Crypto coin AND (price pattern OR time pattern OR crypto question pattern),
+        # or an explicit crypto term
+        if 'coin' in found and found & {'price', 'time', 'crypto_question'}:
+            return True
+        return 'crypto_term' in found
+
+    def categorize(self, question: str, description: str = '') -> str:
+        """
+        Returns: 'crypto', 'politics', 'sports', 'economics', 'entertainment', 'technology', 'science', 'other'
+        """
+        if not question:
+            return 'other'
+        found = self.groups(f"{question} {description or ''}")
+        if self._is_crypto(found):
+            return 'crypto'
+        for category in CATEGORY_KEYWORDS:
+            if category in found:
+                return category
+        return 'other'
+
+    def is_crypto_related(self, text: str) -> bool:
+        return bool(text) and self._is_crypto(self.groups(text))
+
+    def categorize_many(self, items: Iterable[Tuple[str, str]], processes: int = 0,
+                        chunksize: int = 2000) -> List[str]:
+        """
+        Categorize many (question, description) pairs.
+
+        Args:
+            items: (question, description) pairs
+            processes: Worker processes to spread large batches over (0 = this process)
+            chunksize: Items per task sent to a worker
+
+        Returns:
+            Categories in input order
+        """
+        items = list(items)
+        if processes <= 1 or len(items) <= chunksize:
+            return [self.categorize(question, description) for question, description in items]
+
+        chunks = [items[i:i + chunksize] for i in range(0, len(items), chunksize)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = pool.map(_categorize_chunk, chunks)
+            return [category for chunk in results for category in chunk]
+
+
+def _categorize_chunk(chunk: List[Tuple[str, str]]) -> List[str]:
+    """Process pool worker: uses the worker's own compiled categorizer"""
+    categorizer = get_categorizer()
+    return [categorizer.categorize(question, description) for question, description in chunk]
+
+
+# Global singleton instance
+_categorizer_instance: Optional[MarketCategorizer] = None
+_categorizer_lock = Lock()
+
+
+def get_categorizer() -> MarketCategorizer:
+    """
+    Get the global MarketCategorizer instance (singleton pattern).
+
+    Returns:
+        MarketCategorizer instance
+    """
+    global _categorizer_instance
+    if _categorizer_instance is None:
+        with _categorizer_lock:
+            if _categorizer_instance is None:
+                _categorizer_instance = MarketCategorizer()
+    return _categorizer_instance
@@ -2,8 +2,14 @@
 Market-Token Mapping Service
 
 Provides fast token_id to market lookup with LRU cache for performance optimization.
+
+Each key type (token id, condition id) has its own OrderedDict-based LRU with
+O(1) lookups, recency updates and evictions. Entries expire after a TTL, and
+lookups that find no market are cached too (for a much shorter TTL) so
+repeated lookups of unknown tokens don't hit the database every time.
 """
-from functools import lru_cache
+import time
+from collections import OrderedDict
 from typing import Optional, Dict
 from sqlalchemy.orm import Session, joinedload
 from threading import Lock
@@ -13,51 +19,124 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from database import SessionLocal, Market, TradingParams
 
+# Returned by _TTLCache.get when a key is not cached (None is a cached "not found")
+_MISSING = object()
+
+
+class _TTLCache:
+    """
+    Size-bounded LRU cache with per-entry expiry. Not thread safe; the mapper
+    holds its lock around every call.
+    """
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.max_size = max_size
+        # Bound used by put(): max_size, or the size of a larger full replacement
+        self._capacity = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'evictions': 0, 'expirations': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        if value is None:
+            self.stats['negative_hits'] += 1
+        return value
+
+    def put(self, key: str, value, now: float):
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (now + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def build(self, items, now: float) -> "OrderedDict[str, tuple]":
+        """
+        Build a replacement entry table (no lock needed, nothing is shared yet).
+        A full replacement is kept whole, even beyond max_size.
+        """
+        expires_at = now + self.ttl
+        entries = OrderedDict()
+        for key, value in items:
+            entries[key] = (expires_at, value)
+            entries.move_to_end(key)
+        return entries
+
+    def swap(self, entries: "OrderedDict[str, tuple]"):
+        self._entries = entries
+        self._capacity = max(self.max_size, len(entries))
+
+    def clear(self):
+        self._entries.clear()
+        self._capacity = self.max_size
+
 
 class TokenMarketMapper:
     """
     Service for mapping token IDs and condition IDs to Market objects.
-    Uses LRU cache for fast lookups and provides cache invalidation.
+    Uses TTL-bounded LRU caches for fast lookups and provides cache invalidation.
     """
     
-    def __init__(self, cache_size: int = 1000):
+    def __init__(self, cache_size: int = 10000, ttl_seconds: float = 600.0,
+                 negative_ttl_seconds: float = 5.0):
         """
         Initialize the mapper with a cache.
         
         Args:
-            cache_size: Maximum number of items to cache (default: 1000)
+            cache_size: Maximum number of markets cached (default: 10000); the token
+                cache holds twice as many entries. A full replace() may exceed it.
+            ttl_seconds: Seconds a found market stays cached (default: 600, twice the
+                MarketCacheService full refresh interval)
+            negative_ttl_seconds: Seconds a "not found" result stays cached (default: 5)
         """
         self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
         self._lock = Lock()
-        # Cache dictionaries
-        self._token_to_market_cache: Dict[str, Optional[Market]] = {}
-        self._condition_to_market_cache: Dict[str, Optional[Market]] = {}
-        self._cache_access_order: list = []  # For LRU eviction
+        # Two tokens per market
+        self._token_to_market_cache = _TTLCache(2 * cache_size, ttl_seconds, negative_ttl_seconds)
+        self._condition_to_market_cache = _TTLCache(cache_size, ttl_seconds, negative_ttl_seconds)
         
     def _get_db_session(self) -> Session:
         """Get a database session"""
         return SessionLocal()
     
-    def _evict_lru(self):
-        """Evict least recently used items from cache"""
-        if len(self._token_to_market_cache) >= self.cache_size:
-            # Remove oldest accessed items
-            to_remove = len(self._token_to_market_cache) - self.cache_size + 1
-            for _ in range(to_remove):
-                if self._cache_access_order:
-                    key = self._cache_access_order.pop(0)
-                    if key.startswith('token:'):
-                        token_id = key.replace('token:', '')
-                        self._token_to_market_cache.pop(token_id, None)
-                    elif key.startswith('condition:'):
-                        condition_id = key.replace('condition:', '')
-                        self._condition_to_market_cache.pop(condition_id, None)
-    
-    def _update_access_order(self, key: str):
-        """Update access order for LRU eviction"""
-        if key in self._cache_access_order:
-            self._cache_access_order.remove(key)
-        self._cache_access_order.append(key)
+    @staticmethod
+    def _detach(db: Session, market: Optional[Market]) -> Optional[Market]:
+        """Load trading params and detach the market from its session before caching"""
+        if market:
+            # Access trading_params to ensure it's loaded (eager loading should handle this)
+            trading_params = market.trading_params
+            db.expunge(market)
+            # trading_params might already be detached when loaded via joinedload
+            if trading_params:
+                try:
+                    db.expunge(trading_params)
+                except Exception:
+                    pass
+        return market
     
     def get_market_by_token_id(self, token_id: str) -> Optional[Market]:
         """
@@ -74,13 +153,11 @@ class TokenMarketMapper:
         
         # Convert to string for consistency
         token_id = str(token_id)
-        cache_key = f'token:{token_id}'
         
         with self._lock:
-            # Check cache first
-            if token_id in self._token_to_market_cache:
-                self._update_access_order(cache_key)
-                return self._token_to_market_cache[token_id]
+            cached = self._token_to_market_cache.get(token_id, time.monotonic())
+        if cached is not _MISSING:
+            return cached
         
         # Cache miss - query database
         db = self._get_db_session()
@@ -93,31 +170,11 @@ class TokenMarketMapper:
             ).filter(
                 (Market.token1 == token_id) | (Market.token2 == token_id)
             ).first()
-            
-            # If market found, detach it from session before caching
-            # We need to access trading_params while still in session to load it
-            if market:
-                # Access trading_params to ensure it's loaded (eager loading should handle this)
-                trading_params = market.trading_params  # Force load if not already loaded
-                # Now expunge to detach from session
-                db.expunge(market)
-                # Try to expunge trading_params if it exists
-                # Note: trading_params might not be in the session if it was loaded via joinedload
-                # and already detached, so we wrap in try-except
-                if trading_params:
-                    try:
-                        db.expunge(trading_params)
-                    except Exception:
-                        # If expunge fails, it's okay - the object might not be in session
-                        # or might already be detached. The relationship will still work in cache.
-                        pass
+            market = self._detach(db, market)
             
             with self._lock:
-                # Store in cache
-                self._evict_lru()
-                if market:
-                    self._token_to_market_cache[token_id] = market
-                    self._update_access_order(cache_key)
+                # Cache the result, including "not found"
+                self._token_to_market_cache.put(token_id, market, time.monotonic())
             
             return market
         finally:
@@ -138,13 +195,11 @@ class TokenMarketMapper:
         
         # Convert to string for consistency
         condition_id = str(condition_id)
-        cache_key = f'condition:{condition_id}'
         
         with self._lock:
-            # Check cache first
-            if condition_id in self._condition_to_market_cache:
-                self._update_access_order(cache_key)
-                return self._condition_to_market_cache[condition_id]
+            cached = self._condition_to_market_cache.get(condition_id, time.monotonic())
+        if cached is not _MISSING:
+            return cached
         
         # Cache miss - query database
         db = self._get_db_session()
@@ -155,35 +210,53 @@ class TokenMarketMapper:
             ).filter(
                 Market.condition_id == condition_id
             ).first()
-            
-            # If market found, detach it from session before caching
-            if market:
-                # Access trading_params to ensure it's loaded
-                trading_params = market.trading_params  # Force load if not already loaded
-                # Now expunge to detach from session
-                db.expunge(market)
-                # Try to expunge trading_params if it exists
-                # Note: trading_params might not be in the session if it was loaded via joinedload
-                # and already detached, so we wrap in try-except
-                if trading_params:
-                    try:
-                        db.expunge(trading_params)
-                    except Exception:
-                        # If expunge fails, it's okay - the object might not be in session
-                        # or might already be detached. The relationship will still work in cache.
-                        pass
+            market = self._detach(db, market)
             
             with self._lock:
-                # Store in cache
-                self._evict_lru()
-                if market:
-                    self._condition_to_market_cache[condition_id] = market
-                    self._update_access_order(cache_key)
+                # Cache the result, including "not found"
+                self._condition_to_market_cache.put(condition_id, market, time.monotonic())
             
             return market
         finally:
             db.close()
     
+    def prime(self, markets):
+        """
+        Cache already loaded (detached) markets by condition ID and both tokens.
+        
+        Args:
+            markets: Iterable of Market objects
+        """
+        now = time.monotonic()
+        with self._lock:
+            for market in markets:
+                self._condition_to_market_cache.put(str(market.condition_id), market, now)
+                self._token_to_market_cache.put(str(market.token1), market, now)
+                self._token_to_market_cache.put(str(market.token2), market, now)
+    
+    def replace(self, markets):
+        """
+        Replace both caches with the given (detached) markets.
+
+        The new tables are built without holding the lock and swapped in at
+        once, so concurrent lookups see either the old or the new cache and
+        never an empty one.
+
+        Args:
+            markets: Iterable of Market objects
+        """
+        markets = list(markets)
+        now = time.monotonic()
+        tokens = self._token_to_market_cache.build(
+            ((str(token), market) for market in markets for token in (market.token1, market.token2)), now
+        )
+        conditions = self._condition_to_market_cache.build(
+            ((str(market.condition_id), market) for market in markets), now
+        )
+        with self._lock:
+            self._token_to_market_cache.swap(tokens)
+            self._condition_to_market_cache.swap(conditions)
+    
     def invalidate_token_cache(self, token_id: str):
         """
         Invalidate cache for a specific token ID.
@@ -191,14 +264,8 @@ class TokenMarketMapper:
         Args:
             token_id: Token ID to invalidate
         """
-        token_id = str(token_id)
         with self._lock:
-            if token_id in self._token_to_market_cache:
-                del self._token_to_market_cache[token_id]
-            # Remove from access order
-            cache_key = f'token:{token_id}'
-            if cache_key in self._cache_access_order:
-                self._cache_access_order.remove(cache_key)
+            self._token_to_market_cache.pop(str(token_id))
     
     def invalidate_condition_cache(self, condition_id: str):
         """
@@ -207,14 +274,8 @@ class TokenMarketMapper:
         Args:
             condition_id: Condition ID to invalidate
         """
-        condition_id = str(condition_id)
         with self._lock:
-            if condition_id in self._condition_to_market_cache:
-                del self._condition_to_market_cache[condition_id]
-            # Remove from access order
-            cache_key = f'condition:{condition_id}'
-            if cache_key in self._cache_access_order:
-                self._cache_access_order.remove(cache_key)
+            self._condition_to_market_cache.pop(str(condition_id))
     
     def invalidate_market_cache(self, market: Market):
         """
@@ -224,31 +285,55 @@ class TokenMarketMapper:
             market: Market object to invalidate
         """
         if market:
-            self.invalidate_token_cache(market.token1)
-            self.invalidate_token_cache(market.token2)
-            self.invalidate_condition_cache(market.condition_id)
+            self.invalidate_many(token_ids=(market.token1, market.token2),
+                                 condition_ids=(market.condition_id,))
     
+    def invalidate_many(self, token_ids=(), condition_ids=()):
+        """
+        Invalidate many tokens and condition IDs under a single lock acquisition.
+
+        Args:
+            token_ids: Token IDs to invalidate
+            condition_ids: Condition IDs to invalidate
+        """
+        with self._lock:
+            for token_id in token_ids:
+                if token_id:
+                    self._token_to_market_cache.pop(str(token_id))
+            for condition_id in condition_ids:
+                if condition_id:
+                    self._condition_to_market_cache.pop(str(condition_id))
+
     def clear_cache(self):
         """Clear all caches"""
         with self._lock:
             self._token_to_market_cache.clear()
             self._condition_to_market_cache.clear()
-            self._cache_access_order.clear()
     
     def get_cache_stats(self) -> Dict[str, int]:
         """
         Get cache statistics.
         
         Returns:
-            Dictionary with cache statistics
+            Dictionary with cache sizes and hit, miss and eviction counters
         """
         with self._lock:
-            return {
+            token_stats = self._token_to_market_cache.stats
+            condition_stats = self._condition_to_market_cache.stats
+            hits = token_stats['hits'] + condition_stats['hits']
+            misses = token_stats['misses'] + condition_stats['misses']
+            stats = {
                 'token_cache_size': len(self._token_to_market_cache),
                 'condition_cache_size': len(self._condition_to_market_cache),
                 'total_cached': len(self._token_to_market_cache) + len(self._condition_to_market_cache),
-                'max_cache_size': self.cache_size
+                'max_cache_size': self.cache_size,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
             }
+            for name in token_stats:
+                stats[name] = token_stats[name] + condition_stats[name]
+                stats[f'token_{name}'] = token_stats[name]
+                stats[f'condition_{name}'] = condition_stats[name]
+            return stats
 
 
 # Global singleton instance
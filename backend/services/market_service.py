@@ -1,7 +1,6 @@
 """
 Market fetching and filtering service
 """
-import requests
 import pandas as pd
 from typing import List, Dict, Optional
 import os
@@ -10,7 +9,6 @@ from py_clob_client.client import ClobClient
 from py_clob_client.constants import POLYGON
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
-from poly_data.rate_limiter import get_rate_limiter
 
 # Use robust env loading that handles BOM and encoding issues
 try:
@@ -20,9 +18,18 @@ except ImportError:
     from dotenv import load_dotenv
     load_dotenv(encoding='utf-8-sig')
 
+# Imported after .env is loaded: they read settings at import time
+from services.gamma_cache import get_gamma_cache, TAGS_TTL
+from services.gamma_crawler import GAMMA_CRAWL_CONCURRENCY, GammaPageCrawler
+from services.gamma_mirror import get_gamma_mirror
+from services.market_categorizer import get_categorizer
+
 # Gamma API base URL
 GAMMA_API_BASE = "https://gamma-api.polymarket.com"
 
+# Serve event listings from the local Gamma mirror (refreshed incrementally) instead of crawling
+GAMMA_MIRROR_ENABLED = os.getenv('GAMMA_MIRROR_ENABLED', 'true').lower() == 'true'
+
 # Crypto-related keywords for filtering
 CRYPTO_KEYWORDS = [
     # Major cryptocurrencies
@@ -144,15 +151,19 @@ class MarketService:
         if self.tag_cache:
             return self.tag_cache
         
+        # The category map derived from the tags is cached on disk as well,
+        # so new service instances skip both the download and the rescan
+        gamma_cache = get_gamma_cache()
+        cached_tags = gamma_cache.get_value('tag_categories', ttl=TAGS_TTL)
+        if cached_tags:
+            self.tag_cache = {category: int(tag_id) for category, tag_id in cached_tags.items()}
+            return self.tag_cache
+        
         try:
             print("Fetching all tags from Gamma API...")
-            # Apply rate limiting for GAMMA tags endpoint (100 requests / 10s)
-            rate_limiter = get_rate_limiter()
-            rate_limiter.wait_if_needed_sync('gamma_tags')
-            response = requests.get(f"{GAMMA_API_BASE}/tags", timeout=10)
-            rate_limiter.record_request('gamma_tags')
-            if response.status_code == 200:
-                tags_data = response.json()
+            # Cached (with revalidation) and rate limited (gamma_tags) by GammaCache
+            status, tags_data = gamma_cache.get_json(f"{GAMMA_API_BASE}/tags", endpoint='gamma_tags', ttl=TAGS_TTL)
+            if status == 200:
                 
                 # Handle different response formats
                 if isinstance(tags_data, dict):
@@ -294,173 +305,91 @@ class MarketService:
                             break
                 
                 print(f"Loaded {len(self.tag_cache)} category tags")
+                if self.tag_cache:
+                    gamma_cache.put_value('tag_categories', self.tag_cache)
                 return self.tag_cache
             else:
-                print(f"Error fetching tags: {response.status_code}")
+                print(f"Error fetching tags: {status}")
         except Exception as e:
             print(f"Error loading tags: {e}")
         
         return {}
     
-    def _fetch_markets_by_tag(self, tag_id: int, category: str, limit: int = 100, max_pages: int = 500) -> List[Dict]:
+    def _event_markets(self, event: Dict) -> List[Dict]:
+        """Sub-markets of a Gamma event, or the event itself if it has none"""
+        sub_markets = self.parse_sub_markets(event)
+        if not sub_markets:
+            # If no sub-markets found, try to use event itself as a market
+            if event.get('condition_id') or event.get('question') or event.get('title'):
+                sub_markets = [{
+                    'condition_id': event.get('condition_id', ''),
+                    'question': event.get('question') or event.get('title', ''),
+                    'answer1': 'YES',
+                    'answer2': 'NO',
+                    'token1': '',
+                    'token2': '',
+                    'market_slug': event.get('slug', event.get('market_slug', '')),
+                    'neg_risk': event.get('neg_risk', event.get('negRisk', 'FALSE')),
+                    'parent_market': None
+                }]
+        return sub_markets
+    
+    def _event_crawler(self, params: Dict, limit: int, max_pages: int) -> GammaPageCrawler:
+        """Concurrent crawler over active Gamma events, newest first"""
+        return GammaPageCrawler(
+            f"{GAMMA_API_BASE}/events",
+            params={**params, 'closed': 'false', 'order': 'id', 'ascending': 'false'},
+            page_size=limit,
+            max_pages=max_pages,
+            concurrency=GAMMA_CRAWL_CONCURRENCY,
+            endpoint='gamma_events',
+        )
+    
+    async def _fetch_markets_by_tag(self, tag_id: int, category: str, limit: int = 100, max_pages: int = 500) -> List[Dict]:
         """
-        Fetch markets/events for a specific tag_id from Gamma API.
+        Fetch markets/events for a specific tag_id, from the Gamma mirror or,
+        with GAMMA_MIRROR_ENABLED off, from Gamma API with pages fetched
+        concurrently within the gamma_events rate limit.
         Returns list of market dictionaries with category already set.
         """
-        all_markets = []
-        offset = 0
-        page = 0
+        if not tag_id:
+            print(f"  Invalid tag_id for {category}, skipping...")
+            return []
         
         print(f"Fetching {category} markets (tag_id={tag_id})...")
-        
-        # Debug: Test the API call first
-        test_url = f"{GAMMA_API_BASE}/events"
-        test_params = {
-            'tag_id': str(tag_id),
-            'closed': 'false',
-            'limit': 1,
-            'offset': 0
-        }
-        print(f"  Testing API call: {test_url}?tag_id={tag_id}&closed=false&limit=1")
-        
-        while page < max_pages:
-            try:
-                # Use events endpoint (events contain their markets)
-                url = f"{GAMMA_API_BASE}/events"
-                # Convert tag_id to string if needed (API might expect string)
-                tag_id_param = str(tag_id) if tag_id else None
-                if not tag_id_param:
-                    print(f"  Invalid tag_id for {category}, skipping...")
-                    break
-                    
-                params = {
-                    'tag_id': tag_id_param,
-                    'closed': 'false',
-                    'limit': limit,
-                    'offset': offset,
-                    'order': 'id',
-                    'ascending': 'false'
-                }
-                
-                # Debug: Print the actual request
-                if page == 0:
-                    print(f"  Request URL: {url}")
-                    print(f"  Request params: {params}")
-                
-                # Apply rate limiting for GAMMA events endpoint (100 requests / 10s)
-                rate_limiter = get_rate_limiter()
-                rate_limiter.wait_if_needed_sync('gamma_events')
-                response = requests.get(url, params=params, timeout=30)
-                rate_limiter.record_request('gamma_events')
-                
-                # Debug: Print response status and first few chars of response
-                if page == 0:
-                    print(f"  Response status: {response.status_code}")
-                    if response.status_code != 200:
-                        print(f"  Response text (first 500 chars): {response.text[:500]}")
-                
-                if response.status_code != 200:
-                    print(f"  Error fetching {category} markets (page {page + 1}): {response.status_code}")
-                    if response.status_code == 404:
-                        # Tag might not exist or have no events
-                        print(f"  Tag {tag_id} might not exist or have no events")
-                        break
-                    # For other errors, try next page
-                    offset += limit
-                    page += 1
-                    continue
-                
-                events_data = response.json()
-                
-                # Debug: Print response structure
-                if page == 0:
-                    if isinstance(events_data, dict):
-                        print(f"  Response keys: {list(events_data.keys())}")
-                    elif isinstance(events_data, list):
-                        print(f"  Response is a list with {len(events_data)} items")
-                    else:
-                        print(f"  Response type: {type(events_data)}")
-                if isinstance(events_data, dict):
-                    events = events_data.get('data', events_data.get('results', events_data.get('events', [])))
-                    # Check for pagination info in response
-                    total_count = events_data.get('count', events_data.get('total', None))
-                    has_more = events_data.get('hasMore', events_data.get('has_more', None))
-                elif isinstance(events_data, list):
-                    events = events_data
-                    total_count = None
-                    has_more = None
-                else:
-                    events = []
-                    total_count = None
-                    has_more = None
-                
-                if not events:
-                    # No more events
-                    break
-                
-                # Debug: Print first event structure
-                if page == 0 and events:
-                    print(f"  Sample event structure: {list(events[0].keys())}")
-                    if 'markets' in events[0]:
-                        print(f"  Event has {len(events[0].get('markets', []))} markets")
-                    if total_count:
-                        print(f"  Total events available: {total_count}")
-                
-                # Parse markets from events
-                events_processed = 0
+        all_markets = []
+        if GAMMA_MIRROR_ENABLED:
+            async for events in get_gamma_mirror().events_async(tag_id=tag_id, batch_size=limit):
                 for event in events:
-                    sub_markets = self.parse_sub_markets(event)
-                    if not sub_markets:
-                        # If no sub-markets found, try to use event itself as a market
-                        if event.get('condition_id') or event.get('question') or event.get('title'):
-                            sub_markets = [{
-                                'condition_id': event.get('condition_id', ''),
-                                'question': event.get('question') or event.get('title', ''),
-                                'answer1': 'YES',
-                                'answer2': 'NO',
-                                'token1': '',
-                                'token2': '',
-                                'market_slug': event.get('slug', event.get('market_slug', '')),
-                                'neg_risk': event.get('neg_risk', event.get('negRisk', 'FALSE')),
-                                'parent_market': None
-                            }]
-                    
-                    if sub_markets:
-                        events_processed += 1
-                        for sub_market in sub_markets:
-                            sub_market['category'] = category
-                            sub_market['best_bid'] = 0.0
-                            sub_market['best_ask'] = 0.0
-                            sub_market['spread'] = 0.0
-                            all_markets.append(sub_market)
-                
-                print(f"  Page {page + 1}: Fetched {len(events)} events ({events_processed} with markets), {len(all_markets)} total markets so far...")
-                
-                # Check if there are more pages
-                # Continue if we got a full page of results
-                if len(events) < limit:
-                    # Got fewer results than limit, we're done
-                    break
-                
-                # Check has_more flag if available
-                if has_more is False:
-                    break
-                
-                # Move to next page
-                offset += limit
-                page += 1
-                
-            except Exception as e:
-                print(f"  Error fetching {category} markets (page {page + 1}): {e}")
-                import traceback
-                traceback.print_exc()
-                # Try next page anyway
-                offset += limit
-                page += 1
-                if page >= max_pages:
-                    break
+                    for sub_market in self._event_markets(event):
+                        sub_market['category'] = category
+                        sub_market['best_bid'] = 0.0
+                        sub_market['best_ask'] = 0.0
+                        sub_market['spread'] = 0.0
+                        all_markets.append(sub_market)
+            print(f"  Total {category} markets: {len(all_markets)} (from Gamma mirror)")
+            return all_markets
+        
+        crawler = self._event_crawler({'tag_id': str(tag_id)}, limit, max_pages)
+        
+        async for page, events in crawler.pages():
+            # Parse markets from events
+            events_processed = 0
+            for event in events:
+                sub_markets = self._event_markets(event)
+                if sub_markets:
+                    events_processed += 1
+                    for sub_market in sub_markets:
+                        sub_market['category'] = category
+                        sub_market['best_bid'] = 0.0
+                        sub_market['best_ask'] = 0.0
+                        sub_market['spread'] = 0.0
+                        all_markets.append(sub_market)
+            
+            print(f"  Page {page + 1}: Fetched {len(events)} events ({events_processed} with markets), {len(all_markets)} total markets so far...")
         
-        print(f"  Total {category} markets: {len(all_markets)} (from {page + 1} pages)")
+        print(f"  Total {category} markets: {len(all_markets)} (from {crawler.stats['pages']} pages, "
+              f"{crawler.stats['requests']} requests)")
         return all_markets
     
     def categorize_market(self, question: str, description: str = '') -> str:
@@ -470,159 +399,16 @@ class MarketService:
         
         IMPORTANT: Only categorize as crypto if there's a clear crypto coin name AND price-related context.
         Just having "price" is not enough - must have a crypto coin name too.
+        Keyword rules live in services.market_categorizer.
         """
-        if not question:
-            return 'other'
-        
-        text_lower = (question + ' ' + description).lower()
-        
-        # Crypto category - STRICT matching: must have crypto coin name + price/price-related context
-        crypto_coins = ['bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol', 
-                       'dogecoin', 'doge', 'ripple', 'xrp', 'ethereum classic', 'etc',
-                       'hyperliquid', 'hype', 'cardano', 'ada', 'polkadot', 'dot',
-                       'avalanche', 'avax', 'polygon', 'matic', 'chainlink', 'link',
-                       'litecoin', 'ltc', 'shiba', 'uniswap', 'uni', 'aave', 'maker', 'mkr',
-                       'compound', 'comp', 'tether', 'usdt', 'usdc', 'dai', 'binance', 'bnb',
-                       'fantom', 'ftm', 'cosmos', 'atom', 'algorand', 'algo', 'tezos', 'xtz',
-                       'monero', 'xmr', 'zcash', 'zec', 'stellar', 'xlm', 'eos', 'tron', 'trx',
-                       'neo', 'dash', 'iota', 'vechain', 'vet', 'theta', 'filecoin', 'fil']
-        
-        # Check if text contains a crypto coin
-        has_crypto_coin = any(coin in text_lower for coin in crypto_coins)
-        
-        # Price-related patterns (only relevant if crypto coin is present)
-        price_patterns = ['price', 'hit', 'reach', 'above', 'below', 'trading at', 'close at', 'settle at']
-        time_patterns = ['november', 'december', 'january', 'february', 'march', 'april',
-                        'may', 'june', 'july', 'august', 'september', 'october',
-                        'weekly', 'monthly', 'daily', 'end of', 'by end', 'by']
-        
-        # Crypto-specific question patterns
-        crypto_question_patterns = [
-            'what price will', 'what will', 'will bitcoin', 'will ethereum', 'will solana',
-            'will doge', 'will xrp', 'will etc', 'will hype', 'bitcoin price', 'ethereum price',
-            'solana price', 'doge price', 'xrp price', 'etc price', 'hype price',
-            'bitcoin hit', 'ethereum hit', 'solana hit', 'bitcoin reach', 'ethereum reach'
-        ]
-        
-        # Only categorize as crypto if:
-        # 1. Has crypto coin AND (price pattern OR time pattern OR crypto question pattern)
-        # 2. OR has explicit crypto/cryptocurrency/blockchain terms
-        if has_crypto_coin and (any(p in text_lower for p in price_patterns) or 
-                               any(p in text_lower for p in time_patterns) or
-                               any(p in text_lower for p in crypto_question_patterns)):
-            return 'crypto'
-        
-        # Explicit crypto terms (without price context)
-        explicit_crypto_terms = ['crypto', 'cryptocurrency', 'blockchain', 'defi', 'nft', 'web3', 'metaverse']
-        if any(term in text_lower for term in explicit_crypto_terms):
-            return 'crypto'
-        
-        # Politics category
-        politics_keywords = ['president', 'election', 'trump', 'biden', 'senate', 'congress', 'house', 'senator',
-                            'governor', 'mayor', 'vote', 'voting', 'ballot', 'democrat', 'republican', 'party',
-                            'impeachment', 'supreme court', 'judge', 'nomination', 'cabinet', 'federal', 'state',
-                            'primary', 'caucus', 'debate', 'poll', 'approval rating', 'resign', 'impeach']
-        if any(keyword in text_lower for keyword in politics_keywords):
-            return 'politics'
-        
-        # Sports category
-        sports_keywords = ['nfl', 'nba', 'mlb', 'nhl', 'soccer', 'football', 'basketball', 'baseball', 'hockey',
-                          'tennis', 'golf', 'boxing', 'ufc', 'mma', 'olympics', 'world cup', 'super bowl',
-                          'championship', 'playoff', 'playoff', 'final', 'semifinal', 'quarterfinal', 'game',
-                          'match', 'team', 'player', 'coach', 'draft', 'trade', 'injury', 'retire', 'mvp',
-                          'heisman', 'stanley cup', 'world series', 'nba finals', 'super bowl']
-        if any(keyword in text_lower for keyword in sports_keywords):
-            return 'sports'
-        
-        # Economics category
-        economics_keywords = ['fed', 'federal reserve', 'interest rate', 'inflation', 'gdp', 'unemployment',
-                             'jobs report', 'economic', 'recession', 'depression', 'stock market', 'dow',
-                             's&p', 'nasdaq', 'dollar', 'currency', 'yen', 'euro', 'pound', 'trade war',
-                             'tariff', 'import', 'export', 'gdp growth', 'consumer price', 'cpi', 'ppi']
-        if any(keyword in text_lower for keyword in economics_keywords):
-            return 'economics'
-        
-        # Entertainment category
-        entertainment_keywords = ['movie', 'film', 'oscar', 'grammy', 'emmy', 'award', 'celebrity', 'actor',
-                                 'actress', 'director', 'producer', 'album', 'song', 'music', 'tv show',
-                                 'television', 'streaming', 'netflix', 'disney', 'marvel', 'dc', 'comic',
-                                 'book', 'author', 'release', 'premiere', 'box office', 'ticket sales']
-        if any(keyword in text_lower for keyword in entertainment_keywords):
-            return 'entertainment'
-        
-        # Technology category
-        tech_keywords = ['ai', 'artificial intelligence', 'chatgpt', 'openai', 'google', 'apple', 'microsoft',
-                        'amazon', 'meta', 'facebook', 'twitter', 'x.com', 'tesla', 'spacex', 'tech', 'technology',
-                        'software', 'hardware', 'chip', 'semiconductor', 'nvidia', 'amd', 'intel', 'iphone',
-                        'ipad', 'macbook', 'product launch', 'release date']
-        if any(keyword in text_lower for keyword in tech_keywords):
-            return 'technology'
-        
-        # Science category
-        science_keywords = ['nasa', 'space', 'rocket', 'mars', 'moon', 'planet', 'asteroid', 'comet', 'earthquake',
-                           'volcano', 'climate', 'global warming', 'temperature', 'weather', 'hurricane', 'tornado',
-                           'research', 'study', 'discovery', 'scientist', 'nobel prize', 'medicine', 'drug',
-                           'vaccine', 'cure', 'treatment', 'disease', 'pandemic', 'epidemic']
-        if any(keyword in text_lower for keyword in science_keywords):
-            return 'science'
-        
-        # Default to 'other'
-        return 'other'
+        return get_categorizer().categorize(question, description)
     
     def is_crypto_related(self, text: str) -> bool:
         """
         Check if text contains crypto-related keywords or patterns.
         Uses strict matching: must have crypto coin name + price/context.
         """
-        if not text:
-            return False
-        
-        text_lower = text.lower()
-        
-        # Crypto coin names (specific coins only)
-        crypto_coins = ['bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol',
-                       'dogecoin', 'doge', 'ripple', 'xrp', 'ethereum classic', 'etc',
-                       'hyperliquid', 'hype', 'cardano', 'ada', 'polkadot', 'dot',
-                       'avalanche', 'avax', 'polygon', 'matic', 'chainlink', 'link',
-                       'litecoin', 'ltc', 'shiba', 'uniswap', 'uni', 'aave', 'maker', 'mkr',
-                       'compound', 'comp', 'tether', 'usdt', 'usdc', 'dai', 'binance', 'bnb',
-                       'fantom', 'ftm', 'cosmos', 'atom', 'algorand', 'algo', 'tezos', 'xtz',
-                       'monero', 'xmr', 'zcash', 'zec', 'stellar', 'xlm', 'eos', 'tron', 'trx',
-                       'neo', 'dash', 'iota', 'vechain', 'vet', 'theta', 'filecoin', 'fil']
-        
-        # Check if text contains a crypto coin
-        has_crypto_coin = any(coin in text_lower for coin in crypto_coins)
-        
-        # Explicit crypto terms
-        explicit_crypto_terms = ['crypto', 'cryptocurrency', 'blockchain', 'defi', 'nft', 'web3', 'metaverse']
-        has_explicit_crypto = any(term in text_lower for term in explicit_crypto_terms)
-        
-        # Price-related patterns (only relevant if crypto coin is present)
-        price_patterns = ['price', 'hit', 'reach', 'above', 'below', 'trading at', 'close at', 'settle at']
-        time_patterns = ['november', 'december', 'january', 'february', 'march', 'april',
-                        'may', 'june', 'july', 'august', 'september', 'october',
-                        'weekly', 'monthly', 'daily', 'end of', 'by end', 'by']
-        
-        # Crypto-specific question patterns
-        crypto_question_patterns = [
-            'what price will', 'what will', 'will bitcoin', 'will ethereum', 'will solana',
-            'will doge', 'will xrp', 'will etc', 'will hype', 'bitcoin price', 'ethereum price',
-            'solana price', 'doge price', 'xrp price', 'etc price', 'hype price',
-            'bitcoin hit', 'ethereum hit', 'solana hit', 'bitcoin reach', 'ethereum reach'
-        ]
-        
-        # Return True only if:
-        # 1. Has explicit crypto terms, OR
-        # 2. Has crypto coin AND (price pattern OR time pattern OR crypto question pattern)
-        if has_explicit_crypto:
-            return True
-        
-        if has_crypto_coin and (any(p in text_lower for p in price_patterns) or 
-                               any(p in text_lower for p in time_patterns) or
-                               any(p in text_lower for p in crypto_question_patterns)):
-            return True
-        
-        return False
+        return get_categorizer().is_crypto_related(text)
     
     def parse_sub_markets(self, market_data: Dict) -> List[Dict]:
         """
@@ -853,7 +639,7 @@ class MarketService:
             return await self._fetch_crypto_markets_fallback()
         
         # Fetch markets using tag_id
-        return self._fetch_markets_by_tag(crypto_tag_id, 'crypto')
+        return await self._fetch_markets_by_tag(crypto_tag_id, 'crypto')
     
     async def _fetch_crypto_markets_fallback(self) -> List[Dict]:
         """Fallback method using keyword filtering if tags are not available"""
@@ -885,177 +671,138 @@ class MarketService:
         print(f"Found {len(crypto_markets)} crypto-related markets")
         return crypto_markets
     
-    async def fetch_all_markets_categorized(self, months_back: int = 3) -> List[Dict]:
+    @staticmethod
+    def _event_date(event: Dict) -> Optional[datetime]:
+        """Creation date of a Gamma event (naive UTC), or None if missing/unparseable"""
+        creation_date_str = event.get('creationDate') or event.get('createdAt') or event.get('startDate')
+        if not creation_date_str or not isinstance(creation_date_str, str):
+            return None
+        try:
+            # Try ISO format first
+            if 'T' in creation_date_str:
+                event_date = datetime.fromisoformat(creation_date_str.replace('Z', '+00:00'))
+            else:
+                event_date = datetime.strptime(creation_date_str, '%Y-%m-%d')
+        except (ValueError, TypeError):
+            return None
+        # Convert to UTC if timezone-aware
+        if event_date.tzinfo:
+            event_date = event_date.replace(tzinfo=None)
+        return event_date
+    
+    async def iter_recent_event_pages(self, months_back: int = 3, limit: int = 100, max_pages: int = 200):
         """
-        Fetch active markets from Polymarket created in the last N months and categorize them.
-        Uses Gamma API /events endpoint to fetch active events, then categorizes each market.
-        This is more reliable than relying on tags, as recommended in Polymarket docs.
+        Active Gamma events created in the last N months, newest first.
+        Served from the Gamma mirror (refreshed in the background, or streamed
+        page by page while a cold mirror is first filled), unless
+        GAMMA_MIRROR_ENABLED is off.
         
         Args:
-            months_back: Number of months to look back (default: 3 months)
+            months_back: Number of months to look back
+            limit: Events per page
+            max_pages: Upper bound on pages fetched (live crawl only)
+        
+        Yields:
+            (page_index, events)
+        """
+        if not GAMMA_MIRROR_ENABLED:
+            async for page, events in self._iter_live_event_pages(months_back, limit, max_pages):
+                yield page, events
+            return
+        
+        date_threshold = datetime.utcnow() - timedelta(days=months_back * 30)
+        page = 0
+        async for events in get_gamma_mirror().events_async(created_since=date_threshold,
+                                                            batch_size=limit):
+            yield page, events
+            page += 1
+    
+    async def _iter_live_event_pages(self, months_back: int = 3, limit: int = 100, max_pages: int = 200):
+        """
+        Crawl active Gamma events created in the last N months, newest first.
+        
+        Args:
+            months_back: Number of months to look back
+            limit: Events per page
+            max_pages: Upper bound on pages fetched
+        
+        Yields:
+            (page_index, events) with events older than the window removed
         """
         # Calculate date threshold (N months ago)
         date_threshold = datetime.utcnow() - timedelta(days=months_back * 30)
         date_threshold_str = date_threshold.strftime('%Y-%m-%d')
+        print(f"Fetching active events from Gamma API created in the last {months_back} months "
+              f"(since {date_threshold_str}, up to {max_pages * limit} events)...")
+        
+        crawler = self._event_crawler({}, limit, max_pages)
+        async for page, events in crawler.pages():
+            # Events whose date can't be parsed are kept
+            recent = []
+            for event in events:
+                event_date = self._event_date(event)
+                if event_date is None or event_date >= date_threshold:
+                    recent.append(event)
+            filtered = len(events) - len(recent)
+            if filtered:
+                print(f"  Page {page + 1}: Fetched {len(events)} events ({filtered} filtered by date)")
+            else:
+                print(f"  Page {page + 1}: Fetched {len(events)} events")
+            
+            # Events are newest first: if 80%+ of this page is older than the
+            # window, later pages are too
+            if filtered > len(events) * 0.8:
+                print(f"  Most events on page {page + 1} are older than {months_back} months, stopping after it...")
+                crawler.stop_after(page)
+            yield page, recent
+        
+        print(f"Fetched {crawler.stats['pages']} pages of events with {crawler.stats['requests']} requests")
+    
+    def event_market_items(self, events: List[Dict]) -> List[tuple]:
+        """
+        Parse sub-markets from events.
         
-        print(f"Fetching active markets from Gamma API created in the last {months_back} months (since {date_threshold_str})...")
-        
-        all_categorized_markets = []
-        offset = 0
-        limit = 100
-        max_pages = 200  # Reduced from 500 - only need last 3 months
-        page = 0
+        Returns:
+            (sub_market, categorization context) pairs; the context is the
+            event description, or its title if there is none
+        """
+        items = []
+        for event in events:
+            context = event.get('description', '') or event.get('title', '')
+            for sub_market in self._event_markets(event):
+                items.append((sub_market, context))
+        return items
+    
+    def categorize_market_items(self, items: List[tuple]) -> List[Dict]:
+        """Categorize (sub_market, context) pairs in one batch and return the markets"""
+        categories = get_categorizer().categorize_many(
+            (sub_market.get('question', ''), context) for sub_market, context in items
+        )
+        markets = []
+        for (sub_market, _), category in zip(items, categories):
+            sub_market['category'] = category
+            sub_market['best_bid'] = 0.0
+            sub_market['best_ask'] = 0.0
+            sub_market['spread'] = 0.0
+            markets.append(sub_market)
+        return markets
+    
+    async def fetch_all_markets_categorized(self, months_back: int = 3) -> List[Dict]:
+        """
+        Fetch active markets from Polymarket created in the last N months and categorize them.
+        Uses Gamma API /events endpoint to fetch active events, then categorizes each market.
+        This is more reliable than relying on tags, as recommended in Polymarket docs.
         
-        print(f"Fetching active events from Gamma API (up to {max_pages * limit} events)...")
+        Collects every market in memory; fetch_and_save_all_markets streams the
+        same stages into the database instead (services.ingest_pipeline).
         
-        while page < max_pages:
-            try:
-                # Use events endpoint to get all active events (as recommended in docs)
-                url = f"{GAMMA_API_BASE}/events"
-                params = {
-                    'closed': 'false',
-                    'limit': limit,
-                    'offset': offset,
-                    'order': 'id',
-                    'ascending': 'false'
-                }
-                
-                # Apply rate limiting for GAMMA events endpoint (100 requests / 10s)
-                rate_limiter = get_rate_limiter()
-                rate_limiter.wait_if_needed_sync('gamma_events')
-                response = requests.get(url, params=params, timeout=30)
-                rate_limiter.record_request('gamma_events')
-                
-                if response.status_code != 200:
-                    print(f"  Error fetching events (page {page + 1}): {response.status_code}")
-                    if response.status_code == 404 or response.status_code >= 500:
-                        break
-                    # Try next page
-                    offset += limit
-                    page += 1
-                    continue
-                
-                events_data = response.json()
-                if isinstance(events_data, dict):
-                    events = events_data.get('data', events_data.get('results', events_data.get('events', [])))
-                    total_count = events_data.get('count', events_data.get('total', None))
-                    has_more = events_data.get('hasMore', events_data.get('has_more', None))
-                elif isinstance(events_data, list):
-                    events = events_data
-                    total_count = None
-                    has_more = None
-                else:
-                    events = []
-                    total_count = None
-                    has_more = None
-                
-                if not events:
-                    # No more events
-                    break
-                
-                # Debug: Print first event structure
-                if page == 0 and events:
-                    print(f"  Sample event structure: {list(events[0].keys())}")
-                    if 'markets' in events[0]:
-                        print(f"  Event has {len(events[0].get('markets', []))} markets")
-                    if total_count:
-                        print(f"  Total events available: {total_count}")
-                
-                # Parse markets from events and categorize them
-                events_processed = 0
-                events_filtered_by_date = 0
-                for event in events:
-                    # Filter by creation date (only include events from last N months)
-                    creation_date_str = event.get('creationDate') or event.get('createdAt') or event.get('startDate')
-                    if creation_date_str:
-                        try:
-                            # Parse various date formats
-                            if isinstance(creation_date_str, str):
-                                # Try ISO format first
-                                if 'T' in creation_date_str:
-                                    event_date = datetime.fromisoformat(creation_date_str.replace('Z', '+00:00'))
-                                else:
-                                    event_date = datetime.strptime(creation_date_str, '%Y-%m-%d')
-                                
-                                # Convert to UTC if timezone-aware
-                                if event_date.tzinfo:
-                                    event_date = event_date.replace(tzinfo=None)
-                                
-                                # Skip events older than threshold
-                                if event_date < date_threshold:
-                                    events_filtered_by_date += 1
-                                    continue
-                        except (ValueError, TypeError) as e:
-                            # If date parsing fails, include the event anyway
-                            pass
-                    
-                    # Get event description for better categorization
-                    event_description = event.get('description', '')
-                    event_title = event.get('title', '')
-                    
-                    # Parse sub-markets from event
-                    sub_markets = self.parse_sub_markets(event)
-                    if not sub_markets:
-                        # If no sub-markets found, try to use event itself as a market
-                        if event.get('condition_id') or event.get('question') or event.get('title'):
-                            sub_markets = [{
-                                'condition_id': event.get('condition_id', ''),
-                                'question': event.get('question') or event.get('title', ''),
-                                'answer1': 'YES',
-                                'answer2': 'NO',
-                                'token1': '',
-                                'token2': '',
-                                'market_slug': event.get('slug', event.get('market_slug', '')),
-                                'neg_risk': event.get('neg_risk', event.get('negRisk', 'FALSE')),
-                                'parent_market': None
-                            }]
-                    
-                    if sub_markets:
-                        events_processed += 1
-                        for sub_market in sub_markets:
-                            # Categorize each market
-                            market_question = sub_market.get('question', '')
-                            category = self.categorize_market(market_question, event_description or event_title)
-                            
-                            sub_market['category'] = category
-                            sub_market['best_bid'] = 0.0
-                            sub_market['best_ask'] = 0.0
-                            sub_market['spread'] = 0.0
-                            all_categorized_markets.append(sub_market)
-                
-                if events_filtered_by_date > 0:
-                    print(f"  Page {page + 1}: Fetched {len(events)} events ({events_filtered_by_date} filtered by date, {events_processed} with markets), {len(all_categorized_markets)} total markets so far...")
-                else:
-                    print(f"  Page {page + 1}: Fetched {len(events)} events ({events_processed} with markets), {len(all_categorized_markets)} total markets so far...")
-                
-                # If we filtered many events by date, we might be past the 3-month window
-                # Check if we should stop early
-                if events_filtered_by_date > len(events) * 0.8:  # If 80%+ are filtered, we're probably past the date range
-                    print(f"  Most events are older than {months_back} months, stopping fetch...")
-                    break
-                
-                # Check if there are more pages
-                if len(events) < limit:
-                    # Got fewer results than limit, we're done
-                    break
-                
-                # Check has_more flag if available
-                if has_more is False:
-                    break
-                
-                # Move to next page
-                offset += limit
-                page += 1
-                
-            except Exception as e:
-                print(f"  Error fetching events (page {page + 1}): {e}")
-                import traceback
-                traceback.print_exc()
-                # Try next page anyway
-                offset += limit
-                page += 1
-                if page >= max_pages:
-                    break
+        Args:
+            months_back: Number of months to look back (default: 3 months)
+        """
+        all_categorized_markets = []
+        async for _, events in self.iter_recent_event_pages(months_back):
+            items = self.event_market_items(events)
+            all_categorized_markets.extend(self.categorize_market_items(items))
         
         # Count by category
         category_counts = {}
@@ -1066,7 +813,6 @@ class MarketService:
         print(f"\n=== Summary ===")
         print(f"Total categorized markets: {len(all_categorized_markets)}")
         print(f"Category breakdown: {category_counts}")
-        print(f"Fetched from {page + 1} pages of events")
         
         return all_categorized_markets
     
@@ -10,7 +10,15 @@ warnings.filterwarnings("ignore")
 # Add parent directory to path for importing poly_data modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from poly_data.rate_limiter import get_rate_limiter
+from data_updater.reward_engine import tick_grids, best_rewards
+from data_updater.price_history import get_price_history_store
 
+CLOB_BOOKS_URL = 'https://clob.polymarket.com/books'
+CLOB_BOOK_URL = 'https://clob.polymarket.com/book'
+# Order books requested per POST /books call
+BOOKS_CHUNK_SIZE = 100
+# Reward rates are read for USDC (Polygon)
+USDC_ADDRESS = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'
 
 if not os.path.exists('data'):
     os.makedirs('data')
@@ -117,7 +125,117 @@ def add_formula_params(curr_df, midpoint, v, daily_reward):
     curr_df['reward_per_100'] = (curr_df['Q'] / curr_df['Q'].sum()) * daily_reward / 2 / curr_df['size'] * curr_df['100']
     return curr_df
 
-def process_single_row(row, client):
+def parse_book_side(levels):
+    """
+    Parse one side of an order book into float arrays.
+
+    Args:
+        levels: [{'price': '0.45', 'size': '100'}, ...] from /books, or OrderSummary objects
+
+    Returns:
+        (prices, sizes) numpy arrays in book order (best level last)
+    """
+    levels = levels or []
+    prices = np.empty(len(levels))
+    sizes = np.empty(len(levels))
+    for i, level in enumerate(levels):
+        if isinstance(level, dict):
+            prices[i], sizes[i] = float(level['price']), float(level['size'])
+        else:
+            prices[i], sizes[i] = float(level.price), float(level.size)
+    return prices, sizes
+
+def fetch_order_books(token_ids, chunk_size=BOOKS_CHUNK_SIZE, max_workers=4, retries=2):
+    """
+    Fetch order books for many tokens with batched POST /books requests.
+    Tokens of a chunk that keeps failing are fetched one at a time from /book.
+
+    Args:
+        token_ids: Token IDs to fetch
+        chunk_size: Tokens per request
+        max_workers: Requests in flight at once (all share the clob_books rate limit)
+        retries: Extra attempts per chunk on failure
+
+    Returns:
+        {token_id: {'bids': (prices, sizes), 'asks': (prices, sizes)}}. Tokens
+        without a book (or that could not be fetched, which is logged) are missing.
+    """
+    token_ids = list(dict.fromkeys(str(token) for token in token_ids))
+    chunks = [token_ids[i:i + chunk_size] for i in range(0, len(token_ids), chunk_size)]
+    rate_limiter = get_rate_limiter()
+
+    def fetch_chunk(chunk):
+        for attempt in range(retries + 1):
+            try:
+                # Reserve a slot of the CLOB Books budget (80 requests / 10s) shared by all workers
+                rate_limiter.acquire_sync('clob_books')
+                res = requests.post(CLOB_BOOKS_URL, json=[{'token_id': token} for token in chunk], timeout=30)
+                res.raise_for_status()
+                return res.json()
+            except Exception as e:
+                if attempt == retries:
+                    print(f"Error fetching {len(chunk)} order books: {e}, falling back to single-book requests")
+                    return None
+                time.sleep(2 ** attempt)
+
+    def fetch_single(token):
+        try:
+            rate_limiter.acquire_sync('clob_book')
+            res = requests.get(CLOB_BOOK_URL, params={'token_id': token}, timeout=30)
+            if res.status_code == 404:
+                # No order book for this token
+                return token, None
+            res.raise_for_status()
+            return token, res.json()
+        except Exception as e:
+            print(f"Error fetching order book for {token}: {e}")
+            return token, False
+
+    books = {}
+    failed_chunks = []
+
+    def add(book):
+        books[str(book['asset_id'])] = {
+            'bids': parse_book_side(book.get('bids')),
+            'asks': parse_book_side(book.get('asks')),
+        }
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk, chunk_books in zip(chunks, executor.map(fetch_chunk, chunks)):
+            if chunk_books is None:
+                failed_chunks.append(chunk)
+                continue
+            for book in chunk_books:
+                add(book)
+
+        dropped = []
+        if failed_chunks:
+            retry_tokens = [token for chunk in failed_chunks for token in chunk]
+            for token, book in executor.map(fetch_single, retry_tokens):
+                if book is False:
+                    dropped.append(token)
+                elif book:
+                    add(book)
+
+    print(f'Fetched {len(books)} of {len(token_ids)} order books in {len(chunks)} batched requests'
+          + (f' and {len(retry_tokens)} single-book requests' if failed_chunks else ''))
+    if dropped:
+        print(f"⚠️  {len(dropped)} order books could not be fetched, their markets are left out of this scan: "
+              f"{', '.join(dropped)}")
+    return books
+
+def _market_fields(row, book):
+    """
+    Market and book fields of a reward stats row, shared by process_single_row
+    and estimate_rewards.
+
+    Args:
+        row: Sampling market
+        book: {'bids': (prices, sizes), 'asks': (prices, sizes)}, best level last
+
+    Returns:
+        (ret, rate): the stats dict so far and the daily USDC reward rate
+    """
     ret = {}
     ret['question'] = row['question']
     ret['neg_risk'] = row['neg_risk']
@@ -128,46 +246,50 @@ def process_single_row(row, client):
     ret['min_size'] = row['rewards']['min_size']
     ret['max_spread'] = row['rewards']['max_spread']
 
-    token1 = row['tokens'][0]['token_id']
-    token2 = row['tokens'][1]['token_id']
-
     rate = 0
     for rate_info in row['rewards']['rates']:
-        if rate_info['asset_address'].lower() == '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'.lower():
+        if rate_info['asset_address'].lower() == USDC_ADDRESS.lower():
             rate = rate_info['rewards_daily_rate']
             break
-
     ret['rewards_daily_rate'] = rate
-    book = client.get_order_book(token1)
-    
-    bids = pd.DataFrame()
-    asks = pd.DataFrame()
 
-    try:
-        bids = pd.DataFrame(book.bids).astype(float)
-    except:
-        pass
+    bid_prices, _ = book['bids']
+    ask_prices, _ = book['asks']
 
-    try:
-        asks = pd.DataFrame(book.asks).astype(float)
-    except:
-        pass
+    # Best levels are last in the book
+    ret['best_bid'] = bid_prices[-1] if len(bid_prices) else 0
+    ret['best_ask'] = ask_prices[-1] if len(ask_prices) else 0
 
+    ret['midpoint'] = (ret['best_bid'] + ret['best_ask']) / 2
+    ret['tick_size'] = row['minimum_tick_size']
+    return ret, rate
+
+def process_single_row(row, client, book=None):
+    """
+    Reward stats for one sampling market.
+
+    Args:
+        row: Sampling market
+        client: CLOB client, used to fetch the book when none is passed
+        book: Pre-fetched book from fetch_order_books
+    """
+    token1 = row['tokens'][0]['token_id']
+    token2 = row['tokens'][1]['token_id']
 
-    try:
-        ret['best_bid'] = bids.iloc[-1]['price']
-    except:
-        ret['best_bid'] = 0
+    if book is None:
+        order_book = client.get_order_book(token1)
+        book = {'bids': parse_book_side(order_book.bids), 'asks': parse_book_side(order_book.asks)}
 
-    try:
-        ret['best_ask'] = asks.iloc[-1]['price']
-    except:
-        ret['best_ask'] = 0
+    ret, rate = _market_fields(row, book)
 
-    ret['midpoint'] = (ret['best_bid'] + ret['best_ask']) / 2
-    
-    TICK_SIZE = row['minimum_tick_size']
-    ret['tick_size'] = TICK_SIZE
+    bid_prices, bid_sizes = book['bids']
+    ask_prices, ask_sizes = book['asks']
+
+    # Empty sides stay column-less so the merges below fall back to no reward, as before
+    bids = pd.DataFrame({'price': bid_prices, 'size': bid_sizes}) if len(bid_prices) else pd.DataFrame()
+    asks = pd.DataFrame({'price': ask_prices, 'size': ask_sizes}) if len(ask_prices) else pd.DataFrame()
+
+    TICK_SIZE = ret['tick_size']
 
     bid_from, bid_to, ask_from, ask_to = get_bid_ask_range(ret, TICK_SIZE)
     v = round((ret['max_spread'] / 100), 2)
@@ -221,28 +343,128 @@ def process_single_row(row, client):
     return ret
 
 
-def get_all_results(all_df, client, max_workers=5):
-    all_results = []
+def grid_start(start, end, TICK_SIZE):
+    """
+    Where generate_numbers' grid starts, in the integer form tick_grids expects.
 
-    def process_with_progress(args):
-        idx, row = args
+    Returns:
+        (rounded_start, first_tick, step, scale): the first price as generate_numbers
+        computes it, the second price and the tick size in units of 1 / scale
+    """
+    rounded_start = (int(start * 100) + 1) / 100 if start * 100 % 1 != 0 else start + TICK_SIZE
+    decimals = len(str(TICK_SIZE).split('.')[1])
+    scale = 10 ** decimals
+    first_tick = int(round(round(rounded_start + TICK_SIZE, decimals) * scale))
+    step = int(round(TICK_SIZE * scale))
+    return rounded_start, first_tick, step, scale
+
+def estimate_rewards(rows, books):
+    """
+    Reward stats for many sampling markets at once. Gives the same results as
+    process_single_row, but the candidate price grids, book joins and Q-scores
+    of all markets are computed together by reward_engine.
+
+    Args:
+        rows: Sampling markets
+        books: {token_id: book} from fetch_order_books
+
+    Returns:
+        (results, missing): one stats dict per market with a book, in row order,
+        and the number of markets skipped without an order book
+    """
+    markets = []
+    sides = {'bids': [], 'asks': []}
+    missing = 0
+
+    for row in rows:
         try:
-            return process_single_row(row, client)
-        except:
-            print("error fetching market")
-            return None
+            token1 = row['tokens'][0]['token_id']
+            book = books.get(str(token1))
+            if book is None:
+                missing += 1
+                continue
+
+            token2 = row['tokens'][1]['token_id']
+            ret, rate = _market_fields(row, book)
+            TICK_SIZE = ret['tick_size']
+
+            bid_from, bid_to, ask_from, ask_to = get_bid_ask_range(ret, TICK_SIZE)
+            side_grids = {
+                'bids': grid_start(bid_from, bid_to, TICK_SIZE) + (bid_to,),
+                'asks': grid_start(ask_from, ask_to, TICK_SIZE) + (ask_to,),
+            }
+            params = (float(ret['midpoint']), float(round((ret['max_spread'] / 100), 2)), float(rate))
+        except (KeyError, IndexError, TypeError) as e:
+            print(f"Error estimating rewards for market {row.get('condition_id', 'unknown')}: {e}")
+            continue
+
+        tail = {
+            'end_date_iso': row['end_date_iso'],
+            'market_slug': row['market_slug'],
+            'token1': token1,
+            'token2': token2,
+            'condition_id': row['condition_id'],
+        }
+        markets.append((ret, tail, params))
+        for side in sides:
+            sides[side].append((side_grids[side], book[side]))
+
+    if not markets:
+        return [], missing
+
+    midpoints, spreads, rates = (np.array(column) for column in zip(*[params for _, _, params in markets]))
+
+    best = {}
+    for side, entries in sides.items():
+        first_prices, first_ticks, steps, scales, ends = zip(*[grid for grid, _ in entries])
+        market_index, prices = tick_grids(first_prices, first_ticks, steps, scales, ends)
+
+        levels = [len(prices_sizes[0]) for _, prices_sizes in entries]
+        book_index = np.repeat(np.arange(len(entries)), levels)
+        book_prices = np.concatenate([prices_sizes[0] for _, prices_sizes in entries])
+        book_sizes = np.concatenate([prices_sizes[1] for _, prices_sizes in entries])
+        has_book = np.array(levels) > 0
+
+        rewards = best_rewards(market_index, prices, book_index, book_prices, book_sizes,
+                               midpoints, spreads, rates, has_book)
+        # Sides without levels score 0 (an int, as process_single_row returns)
+        best[side] = [reward if present else 0 for reward, present in zip(rewards, has_book)]
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(process_with_progress, (idx, row)) for idx, row in all_df.iterrows()]
-        
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result is not None:
-                all_results.append(result)
+    results = []
+    for (ret, tail, _), best_bid_reward, best_ask_reward in zip(markets, best['bids'], best['asks']):
+        ret['bid_reward_per_100'] = best_bid_reward
+        ret['ask_reward_per_100'] = best_ask_reward
+        ret['sm_reward_per_100'] = round((best_bid_reward + best_ask_reward) / 2, 2)
+        ret['gm_reward_per_100'] = round((best_bid_reward * best_ask_reward) ** 0.5, 2)
+        ret.update(tail)
+        results.append(ret)
+
+    return results, missing
+
+
+def get_all_results(all_df, client, max_workers=5, chunk_size=BOOKS_CHUNK_SIZE):
+    """
+    Reward stats for every sampling market. Order books are fetched up front
+    in batches of chunk_size tokens, so a scan takes len(all_df) / chunk_size
+    requests instead of one per market, and rewards are then estimated for
+    all markets in one vectorized pass.
+    """
+    rows = [row for _, row in all_df.iterrows()]
+
+    token_ids = []
+    for row in rows:
+        try:
+            token_ids.append(row['tokens'][0]['token_id'])
+        except (KeyError, IndexError, TypeError):
+            pass
+    books = fetch_order_books(token_ids, chunk_size=chunk_size, max_workers=max_workers)
 
-            if len(all_results) % (max_workers * 2) == 0:
-                print(f'{len(all_results)} of {len(all_df)}')
+    start = time.time()
+    all_results, missing = estimate_rewards(rows, books)
+    print(f'Estimated rewards for {len(all_results)} of {len(all_df)} markets in {time.time() - start:.2f}s')
 
+    if missing:
+        print(f'{missing} markets skipped without an order book')
     return all_results
 
 def get_combined_markets(new_df, new_markets, sel_df):
@@ -268,62 +490,47 @@ def calculate_annualized_volatility(df, hours):
     annualized_volatility = volatility * np.sqrt(60 * 24 * 252)
     return round(annualized_volatility, 2)
 
-def add_volatility(row):
-    # Apply rate limiting for CLOB Price History endpoint (100 requests / 10s)
-    rate_limiter = get_rate_limiter()
-    rate_limiter.wait_if_needed_sync('clob_price_history')
-    res = requests.get(f'https://clob.polymarket.com/prices-history?interval=1m&market={row["token1"]}&fidelity=10')
-    rate_limiter.record_request('clob_price_history')
-    price_df = pd.DataFrame(res.json()['history'])
-    price_df['t'] = pd.to_datetime(price_df['t'], unit='s')
-    price_df['p'] = price_df['p'].round(2)
-
-    price_df.to_csv(f'data/{row["token1"]}.csv', index=False)
-    
-    price_df['log_return'] = np.log(price_df['p'] / price_df['p'].shift(1))
+def add_volatility(row, store=None):
+    """
+    Add volatility columns to a market row from the stored price history of
+    its first token (refreshed beforehand by add_volatility_to_df).
+    """
+    store = store or get_price_history_store()
+    stats = store.volatility_stats(row['token1'])
+    if stats is None:
+        raise ValueError(f"No price history for {row['token1']}")
 
     row_dict = row.copy()
-
-    stats = {
-        '1_hour': calculate_annualized_volatility(price_df, 1),
-        '3_hour': calculate_annualized_volatility(price_df, 3),
-        '6_hour': calculate_annualized_volatility(price_df, 6),
-        '12_hour': calculate_annualized_volatility(price_df, 12),
-        '24_hour': calculate_annualized_volatility(price_df, 24),
-        '7_day': calculate_annualized_volatility(price_df, 24 * 7),
-        '14_day': calculate_annualized_volatility(price_df, 24 * 14),
-        '30_day': calculate_annualized_volatility(price_df, 24 * 30),
-        'volatility_price': price_df['p'].iloc[-1]
-    }
-
     new_dict = {**row_dict, **stats}
     return new_dict
 
-def add_volatility_to_df(df, max_workers=2):
-    
+def add_volatility_to_df(df, max_workers=8):
+    """
+    Add volatility columns to every market. Only price points newer than the
+    local store's last point are downloaded, max_workers tokens at a time
+    within the clob_price_history rate limit. Markets whose history could not
+    be refreshed are left out, as when their download failed before.
+    """
     results = []
     df = df.reset_index(drop=True)
-
-    def process_volatility_with_progress(args):
-        idx, row = args
+    store = get_price_history_store()
+
+    start = time.time()
+    fetched = store.refresh(df['token1'], max_workers=max_workers)
+    failed = {token for token, points in fetched.items() if points is None}
+    print(f'Fetched {sum(points or 0 for points in fetched.values())} new price points for {len(fetched)} tokens '
+          f'in {time.time() - start:.1f}s ({len(failed)} failed)')
+
+    for _, row in df.iterrows():
+        if str(row['token1']) in failed:
+            # Stored history would be stale; don't report volatility from it
+            print(f"Skipping volatility for {row['token1']}: price history refresh failed")
+            continue
         try:
-            ret = add_volatility(row.to_dict())
-            return ret
+            results.append(add_volatility(row.to_dict(), store))
         except:
             print("Error fetching volatility")
-            return None
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(process_volatility_with_progress, (idx, row)) for idx, row in df.iterrows()]
-        
-        for future in concurrent.futures.as_completed(futures):
-            result = future.result()
-            if result is not None:
-                results.append(result)
-                
-            if len(results) % (max_workers * 2) == 0:
-                print(f'{len(results)} of {len(df)}')
-            
     return pd.DataFrame(results)
 
     
@@ -0,0 +1,265 @@
+"""
+Incremental price-history store for the volatility scan
+
+Keeps each token's CLOB prices-history (10-minute fidelity) in a small
+SQLite file, so the hourly scan only downloads points newer than what it
+already has instead of the full month for every market.
+
+- refresh() fetches new points for many tokens concurrently; all workers
+  share the clob_price_history rate budget.
+- The first fetch of a token takes the last month (interval=1m, as before);
+  later fetches ask for startTs = last stored timestamp, which also
+  refreshes the still-forming last point.
+- Points older than RETENTION_DAYS are pruned, for the appended token on
+  every write and for all tokens (including ones that left the scan) on
+  every refresh(), so the store stays bounded.
+- annualized_volatilities() computes every volatility window of a series
+  in one vectorized pass over cumulative sums.
+"""
+import os
+import sqlite3
+import sys
+import time
+import concurrent.futures
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from poly_data.rate_limiter import get_rate_limiter
+
+PRICE_HISTORY_PATH = os.getenv(
+    'PRICE_HISTORY_PATH',
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'price_history.db')
+)
+PRICES_HISTORY_URL = 'https://clob.polymarket.com/prices-history'
+
+# Minutes between history points
+FIDELITY = 10
+# Days of history kept per token (the longest volatility window is 30 days)
+RETENTION_DAYS = 31
+
+# Volatility column -> window length in hours
+VOLATILITY_WINDOWS = {
+    '1_hour': 1,
+    '3_hour': 3,
+    '6_hour': 6,
+    '12_hour': 12,
+    '24_hour': 24,
+    '7_day': 24 * 7,
+    '14_day': 24 * 14,
+    '30_day': 24 * 30,
+}
+ANNUALIZATION = np.sqrt(60 * 24 * 252)
+
+
+def annualized_volatilities(t, p, windows: Dict[str, float] = VOLATILITY_WINDOWS) -> Dict[str, float]:
+    """
+    Annualized volatility of log returns over trailing windows, as
+    calculate_annualized_volatility computes them, for all windows at once.
+
+    Args:
+        t: Point timestamps in epoch seconds, ascending
+        p: Prices (rounded to cents before computing returns, as before)
+        windows: {name: hours}; each window holds the points at or after
+            the last timestamp minus its length
+
+    Returns:
+        {name: volatility rounded to 2 decimals}; NaN when a window holds fewer than two returns
+    """
+    t = np.asarray(t, dtype=np.int64)
+    p = np.round(np.asarray(p, dtype=float), 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.concatenate([[np.nan], np.log(p[1:] / p[:-1])])
+    valid = np.isfinite(returns)
+    # Infinite returns (a zero price) make their windows NaN, as pandas std does
+    infinite = np.isinf(returns)
+
+    # Centre the returns before the running sums to keep the variance accurate
+    centred = np.where(valid, returns - (returns[valid].mean() if valid.any() else 0.0), 0.0)
+    sums = np.concatenate([[0.0], np.cumsum(centred)])
+    squares = np.concatenate([[0.0], np.cumsum(centred * centred)])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+    infinites = np.concatenate([[0], np.cumsum(infinite)])
+
+    hours = np.array(list(windows.values()), dtype=float)
+    starts = np.searchsorted(t, t[-1] - hours * 3600, side='left')
+
+    n = counts[-1] - counts[starts]
+    total = sums[-1] - sums[starts]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = ((squares[-1] - squares[starts]) - total * total / n) / (n - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    std = np.where((n >= 2) & (infinites[-1] == infinites[starts]), std, np.nan)
+
+    volatility = np.round(std * ANNUALIZATION, 2)
+    return dict(zip(windows, volatility))
+
+
+class PriceHistoryStore:
+    """
+    SQLite store of per-token price history, refreshed incrementally.
+    """
+
+    def __init__(self, path: str = PRICE_HISTORY_PATH, url: str = PRICES_HISTORY_URL,
+                 fidelity: int = FIDELITY, retention_days: float = RETENTION_DAYS):
+        """
+        Args:
+            path: SQLite file holding the history
+            url: CLOB prices-history endpoint
+            fidelity: Minutes between points
+            retention_days: Days of history kept per token
+        """
+        self.path = path
+        self.url = url
+        self.fidelity = fidelity
+        self.retention_days = retention_days
+        self.stats = {'requests': 0, 'points': 0, 'failures': 0}
+        self._stats_lock = Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prices ("
+                " token TEXT NOT NULL, t INTEGER NOT NULL, p REAL NOT NULL,"
+                " PRIMARY KEY (token, t)) WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def last_timestamp(self, token: str) -> Optional[int]:
+        """Timestamp of the newest stored point of a token, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT MAX(t) FROM prices WHERE token = ?", (str(token),)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def append(self, token: str, points: Iterable[Dict]) -> int:
+        """
+        Store points ({'t': epoch seconds, 'p': price}), replacing any with the
+        same timestamp, and prune points older than the retention period.
+
+        Returns:
+            Number of points written
+        """
+        rows = [(str(token), int(point['t']), float(point['p'])) for point in points]
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO prices (token, t, p) VALUES (?, ?, ?)", rows)
+            conn.execute("DELETE FROM prices WHERE token = ? AND t < ?",
+                         (str(token), int(time.time() - self.retention_days * 86400)))
+        return len(rows)
+
+    def prune(self) -> int:
+        """
+        Delete points of every token older than the retention period.
+
+        Returns:
+            Number of points deleted
+        """
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM prices WHERE t < ?",
+                                   (int(time.time() - self.retention_days * 86400),)).rowcount
+        return deleted
+
+    def load(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, prices) of a token, ascending"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT t, p FROM prices WHERE token = ? ORDER BY t", (str(token),)).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        t, p = zip(*rows)
+        return np.array(t, dtype=np.int64), np.array(p, dtype=float)
+
+    def fetch_new(self, token: str) -> int:
+        """
+        Download and store the points of a token newer than its last stored one.
+
+        Returns:
+            Number of points received
+        """
+        last = self.last_timestamp(token)
+        params = {'market': str(token), 'fidelity': self.fidelity}
+        if last is None:
+            params['interval'] = '1m'
+        else:
+            params['startTs'] = last
+            params['endTs'] = int(time.time())
+
+        # Apply rate limiting for CLOB Price History endpoint (100 requests / 10s)
+        get_rate_limiter().acquire_sync('clob_price_history')
+        res = requests.get(self.url, params=params, timeout=30)
+        res.raise_for_status()
+        points = res.json().get('history') or []
+        self.append(token, points)
+
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats['points'] += len(points)
+        return len(points)
+
+    def refresh(self, tokens: Iterable[str], max_workers: int = 8) -> Dict[str, Optional[int]]:
+        """
+        Fetch new points for many tokens concurrently, then prune expired
+        points of all tokens.
+
+        Returns:
+            {token: points received}, None for tokens whose fetch failed
+        """
+        tokens = list(dict.fromkeys(str(token) for token in tokens))
+
+        def fetch(token):
+            try:
+                return self.fetch_new(token)
+            except Exception as e:
+                with self._stats_lock:
+                    self.stats['failures'] += 1
+                print(f"Error fetching price history for {token}: {e}")
+                return None
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fetched = dict(zip(tokens, executor.map(fetch, tokens)))
+        self.prune()
+        return fetched
+
+    def volatility_stats(self, token: str) -> Optional[Dict[str, float]]:
+        """
+        Volatility columns for a token from its stored history.
+
+        Returns:
+            {window: volatility, ..., 'volatility_price': last price}, or None without history
+        """
+        t, p = self.load(token)
+        if len(t) == 0:
+            return None
+        stats = annualized_volatilities(t, p)
+        stats['volatility_price'] = round(p[-1], 2)
+        return stats
+
+
+_price_history_instance: Optional[PriceHistoryStore] = None
+_price_history_lock = Lock()
+
+
+def get_price_history_store() -> PriceHistoryStore:
+    """
+    Get the shared price-history store (singleton).
+
+    Returns:
+        PriceHistoryStore instance
+    """
+    global _price_history_instance
+    if _price_history_instance is None:
+        with _price_history_lock:
+            if _price_history_instance is None:
+                _price_history_instance = PriceHistoryStore()
+    return _price_history_instance
@@ -0,0 +1,126 @@
+"""
+Vectorized liquidity-reward estimation.
+
+Computes the same numbers as process_single_row's generate_numbers ->
+merge -> add_formula_params -> max path, for every market at once:
+
+- Candidate price grids are integer tick counts: after its first price, a
+  market's grid is k1, k1 + t, k1 + 2t, ... (in units of 10^-decimals),
+  flattened into one array for all markets.
+- Book sizes are joined onto all grids with a single merge on
+  (market, price).
+- The Q-score and reward_per_100 are elementwise NumPy operations; the
+  per-market sums are taken over markets stacked by grid length so each
+  market is summed exactly as a pandas Series of that length would be.
+
+Inputs are per-market arrays; the per-market scalar set-up (bid/ask ranges,
+first grid price) stays in find_markets, where it uses Python's round() the
+way the original code does.
+"""
+import numpy as np
+import pandas as pd
+
+
+def tick_grids(first_prices, first_ticks, steps, scales, ends):
+    """
+    Candidate prices for every market, as generate_numbers would produce them.
+
+    For market i the grid is first_prices[i], then first_ticks[i] / scales[i],
+    (first_ticks[i] + steps[i]) / scales[i], ... while the price is below ends[i].
+
+    Args:
+        first_prices: First candidate price of each market (kept as the exact float)
+        first_ticks: Integer tick count of the second price (round(first + tick, decimals) * scale)
+        steps: Tick size in units of 1 / scale
+        scales: 10 ** decimals of the tick size
+        ends: Exclusive upper bound of each grid
+
+    Returns:
+        (market_index, prices): flattened grids, grouped by market in order
+    """
+    first_prices = np.asarray(first_prices, dtype=float)
+    first_ticks = np.asarray(first_ticks, dtype=np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    scales = np.asarray(scales, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+
+    # Number of tick prices below the end: estimate, then fix off-by-one
+    # errors with the same float comparison the while loop makes
+    counts = np.floor((ends * scales - first_ticks) / steps).astype(np.int64) + 1
+    counts = np.maximum(counts, 0)
+    counts += ((first_ticks + counts * steps) / scales < ends)
+    counts -= (counts > 0) & ((first_ticks + (counts - 1) * steps) / scales >= ends)
+    counts = np.where(first_prices < ends, counts + 1, 0)
+
+    total = int(counts.sum())
+    market_index = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    position = np.arange(total) - np.repeat(starts, counts)
+
+    tick_prices = (first_ticks[market_index] + (position - 1) * steps[market_index]) / scales[market_index]
+    prices = np.where(position == 0, first_prices[market_index], tick_prices)
+    return market_index, prices
+
+
+def _grouped_sums(values, market_index, n_markets):
+    """Per-market sums of values (NaN counted as 0), grouped by segment length"""
+    lengths = np.bincount(market_index, minlength=n_markets)
+    offsets = np.cumsum(lengths) - lengths
+    values = np.where(np.isnan(values), 0.0, values)
+    sums = np.zeros(n_markets)
+    for length in np.unique(lengths[lengths > 0]):
+        markets = np.flatnonzero(lengths == length)
+        rows = offsets[markets][:, None] + np.arange(length)
+        sums[markets] = values[rows].sum(axis=1)
+    return sums
+
+
+def best_rewards(market_index, prices, book_index, book_prices, book_sizes,
+                 midpoints, spreads, daily_rates, has_book):
+    """
+    Best reward_per_100 of each market (one side of the book).
+
+    Args:
+        market_index, prices: Candidate grids from tick_grids
+        book_index, book_prices, book_sizes: Book levels of every market, flattened
+        midpoints: Book midpoint per market
+        spreads: Max incentive spread v per market (round(max_spread / 100, 2))
+        daily_rates: Daily reward rate per market
+        has_book: Whether the market has any levels on this side
+
+    Returns:
+        float array: round(max reward_per_100, 2); NaN for an empty grid,
+        0 for a market without levels on this side
+    """
+    n_markets = len(midpoints)
+    midpoints = np.asarray(midpoints, dtype=float)
+    spreads = np.asarray(spreads, dtype=float)
+    daily_rates = np.asarray(daily_rates, dtype=float)
+
+    grid = pd.DataFrame({'market': market_index, 'price': prices})
+    book = pd.DataFrame({'market': book_index, 'price': book_prices, 'size': book_sizes})
+    # Left merge keeps grid order (markets stay contiguous and in order)
+    joined = grid.merge(book, on=['market', 'price'], how='left').fillna(0)
+    market = joined['market'].to_numpy()
+    price = joined['price'].to_numpy()
+    size = joined['size'].to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = spreads[market]
+        s = np.abs(price - midpoints[market])
+        S = ((v - s) / v) ** 2
+        per_100 = 1 / price * 100
+        size = size + per_100
+        Q = S * size
+        Q_sum = _grouped_sums(Q, market, n_markets)
+        reward = (Q / Q_sum[market]) * daily_rates[market] / 2 / size * per_100
+
+    best = np.full(n_markets, np.nan)
+    lengths = np.bincount(market, minlength=n_markets)
+    present = np.flatnonzero(lengths > 0)
+    if len(present):
+        offsets = np.cumsum(lengths) - lengths
+        # fmax skips NaN like Series.max(); all-NaN groups stay NaN
+        best[present] = np.fmax.reduceat(reward, offsets[present])
+    best = np.round(best, 2)
+    return np.where(np.asarray(has_book, dtype=bool), best, 0.0)
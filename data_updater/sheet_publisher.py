@@ -0,0 +1,255 @@
+"""
+Diff-based publishing of the market scan to the database and Google Sheets
+
+update_markets.py used to read every cell of each worksheet with
+get_all_values() and rewrite the whole padded frame every hour. Now:
+
+- save_scan() stores a frame in the market_scan_rows table, one row per
+  sheet row (position 0 is the header), as the cell values the sheet gets.
+  Only rows whose cells changed are written.
+- publish() compares those cells with what was last published to the sheet
+  (kept in the same table) and sends only the changed rows, narrowed to
+  their changed columns, as ranges of one batched values update.
+- The first publish of a sheet (nothing recorded yet) reads the sheet once
+  to learn how far to clear it, then writes everything, as before.
+"""
+import json
+import math
+import os
+import sys
+from datetime import datetime
+from numbers import Real
+from typing import Dict, List
+
+import pandas as pd
+from sqlalchemy import bindparam, delete, insert, select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from database import SessionLocal, MarketScanRow, engine
+
+# Ranges sent per values:batchUpdate request
+RANGES_PER_REQUEST = 500
+
+_scan_rows = MarketScanRow.__table__
+_table_ready = False
+
+
+def _ensure_table():
+    """Create market_scan_rows when the scanner runs before the backend has"""
+    global _table_ready
+    if not _table_ready:
+        _scan_rows.create(bind=engine, checkfirst=True)
+        _table_ready = True
+
+
+def cell_value(value):
+    """
+    The value set_with_dataframe would send for a frame cell: blanks for
+    missing values, numbers as numbers, everything else as text (a leading
+    apostrophe is escaped).
+    """
+    if value is None or (not isinstance(value, str) and pd.isnull(value) is True):
+        return ""
+    if isinstance(value, Real):
+        value = value.item() if hasattr(value, 'item') else value
+        # JSON has no NaN/Infinity; the sheet would not accept them either
+        return value if not isinstance(value, float) or math.isfinite(value) else str(value)
+    value = str(value)
+    return "'" + value if value.startswith("'") else value
+
+
+def frame_rows(df: pd.DataFrame) -> List[List]:
+    """Header row followed by one list of cell values per frame row"""
+    rows = [[cell_value(column) for column in df.columns]]
+    rows.extend([cell_value(value) for value in row] for row in df.itertuples(index=False, name=None))
+    return rows
+
+
+def column_letter(col: int) -> str:
+    """A1 column letters for a 1-based column number"""
+    letters = ''
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def save_scan(sheet: str, df: pd.DataFrame, db=None) -> int:
+    """
+    Store a scan frame as the latest cells of a sheet.
+
+    Args:
+        sheet: Worksheet title
+        df: Frame as it should appear in the sheet
+        db: Optional session (committed here)
+
+    Returns:
+        Number of rows inserted, changed or removed
+    """
+    _ensure_table()
+    rows = frame_rows(df)
+    condition_ids = [None] + (list(df['condition_id'].astype(str)) if 'condition_id' in df.columns
+                              else [None] * len(df))
+    encoded = [json.dumps(row) for row in rows]
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        existing = {
+            position: (row_id, cells)
+            for row_id, position, cells in db.execute(
+                select(MarketScanRow.id, MarketScanRow.position, MarketScanRow.cells)
+                .where(MarketScanRow.sheet == sheet)
+            )
+        }
+        now = datetime.utcnow()
+
+        inserts, updates = [], []
+        for position, cells in enumerate(encoded):
+            if position not in existing:
+                inserts.append({'sheet': sheet, 'position': position, 'condition_id': condition_ids[position],
+                                'cells': cells, 'updated_at': now})
+            elif existing[position][1] != cells:
+                updates.append({'row_id': existing[position][0], 'condition_id': condition_ids[position],
+                                'cells': cells})
+
+        # Rows past the end of the new frame are blanked (cleared from the sheet on publish)
+        removed = [{'row_id': row_id, 'condition_id': None, 'cells': None}
+                   for position, (row_id, cells) in existing.items()
+                   if position >= len(encoded) and cells is not None]
+
+        if inserts:
+            db.execute(insert(MarketScanRow), inserts)
+        if updates or removed:
+            db.execute(
+                _scan_rows.update()
+                .where(_scan_rows.c.id == bindparam('row_id'))
+                .values(condition_id=bindparam('condition_id'), cells=bindparam('cells'), updated_at=now),
+                updates + removed,
+            )
+        db.commit()
+        return len(inserts) + len(updates) + len(removed)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+def _changed_ranges(changes: Dict[int, tuple]) -> List[Dict]:
+    """
+    Group changed rows into A1 ranges: consecutive positions form one block,
+    narrowed to the columns that changed anywhere in it.
+
+    Args:
+        changes: {position: (new cells, previously published cells)}
+    """
+    ranges = []
+    block: List[int] = []
+
+    def flush():
+        width = max(max(len(changes[p][0]), len(changes[p][1])) for p in block)
+        padded = {}
+        changed_cols = []
+        for position in block:
+            new, old = changes[position]
+            new = list(new) + [""] * (width - len(new))
+            old = list(old) + [""] * (width - len(old))
+            padded[position] = new
+            changed_cols.extend(col for col in range(width) if new[col] != old[col])
+        if not changed_cols:
+            return
+        first_col, last_col = min(changed_cols), max(changed_cols)
+        ranges.append({
+            'range': f"{column_letter(first_col + 1)}{block[0] + 1}:{column_letter(last_col + 1)}{block[-1] + 1}",
+            'values': [padded[position][first_col:last_col + 1] for position in block],
+        })
+
+    for position in sorted(changes):
+        if block and position != block[-1] + 1:
+            flush()
+            block = []
+        block.append(position)
+    if block:
+        flush()
+    return ranges
+
+
+def publish(sheet: str, worksheet, db=None, force: bool = False) -> Dict:
+    """
+    Write the rows of a sheet that changed since they were last published.
+
+    Args:
+        sheet: Worksheet title the scan was saved under
+        worksheet: gspread Worksheet to write to
+        db: Optional session (committed here)
+        force: Rewrite every row (and clear the rest of the sheet), as on a first publish
+
+    Returns:
+        {'rows': rows written, 'ranges': ranges sent, 'requests': API requests}
+    """
+    _ensure_table()
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        rows = db.execute(
+            select(MarketScanRow.id, MarketScanRow.position, MarketScanRow.cells, MarketScanRow.published)
+            .where(MarketScanRow.sheet == sheet)
+            .order_by(MarketScanRow.position)
+        ).all()
+        stats = {'rows': 0, 'ranges': 0, 'requests': 0}
+
+        first_publish = force or all(published is None for _, _, _, published in rows)
+        changes = {}
+        if first_publish:
+            # The sheet's content is unknown: overwrite it all and clear what lies beyond
+            existing = worksheet.get_all_values()
+            stats['requests'] += 1
+            width = max([len(values) for values in existing] + [1])
+            extent = max(len(existing), len(rows))
+            by_position = {position: json.loads(cells) if cells else [] for _, position, cells, _ in rows}
+            for position in range(extent):
+                cells = by_position.get(position, [])
+                # A cell that differs from None is always rewritten
+                changes[position] = (cells, [None] * max(width, len(cells)))
+        else:
+            for _, position, cells, published in rows:
+                if cells != published:
+                    changes[position] = (json.loads(cells) if cells else [],
+                                         json.loads(published) if published else [])
+
+        ranges = _changed_ranges(changes)
+        if ranges:
+            needed_rows = max(position for position in changes) + 1
+            needed_cols = max(len(new) for new, _ in changes.values())
+            if needed_rows > worksheet.row_count or needed_cols > worksheet.col_count:
+                worksheet.resize(rows=max(needed_rows, worksheet.row_count),
+                                 cols=max(needed_cols, worksheet.col_count))
+                stats['requests'] += 1
+
+            for start in range(0, len(ranges), RANGES_PER_REQUEST):
+                worksheet.batch_update(ranges[start:start + RANGES_PER_REQUEST], value_input_option='USER_ENTERED')
+                stats['requests'] += 1
+            stats['rows'] = sum(len(r['values']) for r in ranges)
+            stats['ranges'] = len(ranges)
+
+        # The sheet now matches the latest cells
+        published_rows = [{'row_id': row_id, 'published': cells}
+                          for row_id, _, cells, published in rows if cells != published]
+        if published_rows:
+            db.execute(
+                _scan_rows.update()
+                .where(_scan_rows.c.id == bindparam('row_id'))
+                .values(published=bindparam('published')),
+                published_rows,
+            )
+        db.execute(delete(MarketScanRow).where(MarketScanRow.sheet == sheet, MarketScanRow.cells.is_(None)))
+        db.commit()
+        return stats
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
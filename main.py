@@ -2,22 +2,29 @@ import gc                      # Garbage collection
 import time                    # Time functions
 import asyncio                 # Asynchronous I/O
 import traceback               # Exception handling
-import threading               # Thread management
 import pandas as pd            # Data processing
 
 from poly_data.polymarket_client import PolymarketClient
 from poly_data.data_utils import update_positions, update_orders
-from poly_data.websocket_handlers import connect_market_websocket, connect_user_websocket
+from poly_data.websocket_handlers import connect_market_websocket, connect_user_websocket, update_market_subscription
 import poly_data.global_state as global_state
 from poly_data.data_processing import remove_from_performing
+from poly_data.sync_scheduler import PeriodicSyncScheduler, add_default_jobs, spawn
+from poly_data.market_loader import IncrementalMarketLoader
+from poly_data.history_store import get_history_store
+from trading import perform_trade
 from dotenv import load_dotenv
 
 # Import database models
 import os
-from backend.database import SessionLocal, Market, init_db
+import sys
+from backend.database import init_db
 
 load_dotenv()
 
+# Backend services (order validation, market cache) import from the backend package root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
 # Change to backend directory to access correct database
 os.chdir(os.path.join(os.path.dirname(__file__), 'backend'))
 
@@ -26,132 +33,75 @@ print("🔧 Initializing database...")
 init_db()
 print("✅ Database initialized\n")
 
+# Incremental loader: only markets/params whose updated_at moved are re-read
+market_loader = IncrementalMarketLoader()
+
+
+def start_market_cache():
+    """
+    Warm the token -> market cache used by order validation, then keep it
+    fresh in the background (incremental reloads, periodic full swaps).
+    """
+    from services.market_cache_service import get_market_cache_service
+
+    market_cache = get_market_cache_service()
+    market_cache.refresh_cache()
+    market_cache.start_periodic_refresh()
+    return market_cache
+
+def read_markets_from_db():
+    """
+    Read market configuration changed since the last load.
+    Does not touch global_state, so it is safe to run in a worker thread.
+    """
+    return market_loader.read()
+
+def apply_markets(result):
+    """
+    Apply market configuration returned by read_markets_from_db to global_state,
+    then update websocket subscriptions and requote the affected markets.
+    """
+    delta = market_loader.apply(result)
+
+    if delta['added'] or delta['changed'] or delta['removed']:
+        print(f"🔄 Market config: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+              f"{len(delta['removed'])} removed ({len(global_state.df)} active)")
+
+    if delta['subscribe'] or delta['unsubscribe']:
+        spawn(update_market_subscription(delta['subscribe'], delta['unsubscribe']), "update market subscriptions")
+
+    for market in delta['added'] + delta['changed']:
+        spawn(perform_trade(market), f"requote {market}")
+
+    return delta
+
+def read_market_changes(subscriber):
+    """
+    Poll the API's market change log. If markets or their params were edited,
+    drop them from the order validation cache and read the changed config.
+    Runs in a worker thread; returns None when nothing changed.
+    """
+    changes = subscriber.poll()
+    if not changes:
+        return None
+
+    from services.market_cache_service import get_market_cache_service
+    get_market_cache_service().invalidate_markets(changes)
+    return read_markets_from_db()
+
 def load_markets_from_db():
     """
     Load market configuration from database (replaces Google Sheets)
     """
-    db = SessionLocal()
     try:
-        # Fetch active markets from database
-        markets = db.query(Market).filter(Market.is_active == True).all()
-        
-        # Convert to DataFrame format that the existing code expects
-        market_data = []
-        for market in markets:
-            if not market.trading_params:
-                continue
-            
-            params = market.trading_params
-            
-            market_data.append({
-                'condition_id': market.condition_id,
-                'question': market.question,
-                'answer1': market.answer1,
-                'answer2': market.answer2,
-                'token1': market.token1,
-                'token2': market.token2,
-                'market_slug': market.market_slug or '',
-                'neg_risk': market.neg_risk,
-                'side_to_trade': market.side_to_trade,
-                'trading_mode': market.trading_mode,
-                'target_position': market.target_position,
-                'best_bid': market.best_bid,
-                'best_ask': market.best_ask,
-                'spread': market.spread,
-                # Trading params
-                'trade_size': params.trade_size,
-                'max_size': params.max_size,
-                'min_size': params.min_size,
-                'max_spread': params.max_spread,
-                'tick_size': params.tick_size,
-                'multiplier': params.multiplier if params.multiplier else '',
-                'param_type': params.param_type,
-                # Risk management
-                'stop_loss_threshold': params.stop_loss_threshold,
-                'take_profit_threshold': params.take_profit_threshold,
-                'volatility_threshold': params.volatility_threshold,
-                'spread_threshold': params.spread_threshold,
-                'sleep_period': params.sleep_period,
-                # Competitive bot params
-                'order_front_running': params.order_front_running,
-                'tick_improvement': params.tick_improvement,
-                'quick_cancel_threshold': params.quick_cancel_threshold,
-                'position_patience': params.position_patience,
-                # Add volatility columns with default values
-                '1_hour': 0.0,
-                '3_hour': 0.0,
-                '6_hour': 0.0,
-                '12_hour': 0.0,
-                '24_hour': 0.0,
-                '7_day': 0.0,
-                '14_day': 0.0,
-                '30_day': 0.0,
-            })
-        
-        if not market_data:
-            global_state.df = pd.DataFrame()
-            global_state.params = {}
-            print("⚠️  WARNING: No active markets found in database!")
-            return
-        
-        global_state.df = pd.DataFrame(market_data)
-        
-        # Group parameters by param_type
-        global_state.params = {}
-        for market in markets:
-            if not market.trading_params:
-                continue
-            
-            param_type = market.trading_params.param_type
-            if param_type not in global_state.params:
-                params = market.trading_params
-                global_state.params[param_type] = {
-                    'stop_loss_threshold': params.stop_loss_threshold,
-                    'take_profit_threshold': params.take_profit_threshold,
-                    'volatility_threshold': params.volatility_threshold,
-                    'spread_threshold': params.spread_threshold,
-                    'sleep_period': params.sleep_period,
-                }
-        
-        # Set up token tracking
-        global_state.all_tokens = []
-        global_state.REVERSE_TOKENS = {}
-        
-        for _, row in global_state.df.iterrows():
-            token1 = str(row['token1']) if row['token1'] else None
-            token2 = str(row['token2']) if row['token2'] else None
-            
-            # Skip if tokens are missing or invalid
-            if not token1 or token1 == 'None' or token1 == 'nan' or not token1.strip():
-                print(f"⚠️  Warning: Market '{row['question']}' has invalid token1: {token1}")
-                continue
-            if not token2 or token2 == 'None' or token2 == 'nan' or not token2.strip():
-                print(f"⚠️  Warning: Market '{row['question']}' has invalid token2: {token2}")
-                continue
-            
-            if token1 not in global_state.all_tokens:
-                global_state.all_tokens.append(token1)
-            if token2 not in global_state.all_tokens:
-                global_state.all_tokens.append(token2)
-            
-            global_state.REVERSE_TOKENS[token1] = token2
-            global_state.REVERSE_TOKENS[token2] = token1
-            
-            # Initialize performing tracking
-            for col in [f"{token1}_buy", f"{token1}_sell", f"{token2}_buy", f"{token2}_sell"]:
-                if col not in global_state.performing:
-                    global_state.performing[col] = set()
-        
+        market_loader.apply(market_loader.read())
         print(f"✅ Loaded {len(global_state.df)} active markets from database")
         print(f"✅ Subscribing to {len(global_state.all_tokens)} tokens")
-        
     except Exception as e:
         print(f"❌ Error loading markets from database: {e}")
         print(traceback.format_exc())
-        global_state.df = pd.DataFrame()
-        global_state.params = {}
-    finally:
-        db.close()
+        market_loader.reset()
+        global_state.publish(df=pd.DataFrame(), market_index={}, params={})
 
 def update_once():
     """
@@ -186,35 +136,41 @@ def remove_from_pending():
         print("Error in remove_from_pending")
         print(traceback.format_exc())
 
-def update_periodically():
+def build_sync_scheduler(change_subscriber=None):
     """
-    Background thread function that periodically updates market data, positions and orders.
-    - Positions and orders are updated every 5 seconds
-    - Market data is updated every 30 seconds (every 6 cycles)
-    - Stale pending trades are removed each cycle
+    Create the periodic state synchronizer that replaces the old update thread.
+    - Stale pending trades are removed every 5 seconds
+    - Positions and orders are updated every 5 seconds (fetched concurrently)
+    - Market data is updated every 30 seconds
+    - Market edits made through the API are picked up from the change log every 0.5 seconds
+    - Top-of-book snapshots are recorded to the history store every 60 seconds
+    All results are applied on the event loop thread.
     """
-    i = 1
-    while True:
-        time.sleep(5)  # Update every 5 seconds
-        
-        try:
-            # Clean up stale trades
-            remove_from_pending()
-            
-            # Update positions and orders every cycle
-            update_positions(avgOnly=True)  # Only update average price, not position size
-            update_orders()
-
-            # Update market data every 6th cycle (30 seconds)
-            if i % 6 == 0:
-                load_markets_from_db()
-                i = 1
-                    
-            gc.collect()  # Force garbage collection to free memory
-            i += 1
-        except:
-            print("Error in update_periodically")
-            print(traceback.format_exc())
+    scheduler = PeriodicSyncScheduler()
+    add_default_jobs(
+        scheduler,
+        load_markets=read_markets_from_db,
+        apply_markets=apply_markets,
+        remove_stale=remove_from_pending,
+    )
+
+    if change_subscriber is not None:
+        async def market_changes():
+            return await asyncio.to_thread(read_market_changes, change_subscriber)
+
+        def apply_market_changes(result):
+            if result is not None:
+                apply_markets(result)
+
+        scheduler.add_job('market_changes', 0.5, market_changes, apply_market_changes, jitter=0.0)
+
+    history = get_history_store()
+    if history.enabled:
+        async def record_books():
+            # Runs on the loop thread, so the books are read consistently
+            return history.snapshot_books(global_state.all_data)
+        scheduler.add_job('book_history', 60.0, record_books)
+    return scheduler
             
 async def main():
     """
@@ -222,18 +178,24 @@ async def main():
     """
     # Initialize client
     global_state.client = PolymarketClient()
+
+    # Warm the market cache so the first order is validated without a DB round trip
+    start_market_cache()
+
+    # Subscribe before the initial load so no API edit falls in between
+    from services.change_bus import MarketChangeSubscriber
+    change_subscriber = MarketChangeSubscriber()
     
     # Initialize state and fetch initial data
-    global_state.all_tokens = []
     update_once()
     print("After initial updates: ", global_state.orders, global_state.positions)
 
     print("\n")
     print(f'There are {len(global_state.df)} market, {len(global_state.positions)} positions and {len(global_state.orders)} orders. Starting positions: {global_state.positions}')
 
-    # Start background update thread
-    update_thread = threading.Thread(target=update_periodically, daemon=True)
-    update_thread.start()
+    # Start periodic sync jobs on this event loop
+    sync_scheduler = build_sync_scheduler(change_subscriber)
+    sync_scheduler.start()
     
     # Main loop - maintain websocket connections
     while True:
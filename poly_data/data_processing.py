@@ -7,6 +7,7 @@ from trading import perform_trade
 import time 
 import asyncio
 from poly_data.data_utils import set_position, set_order, update_positions
+from poly_data.history_store import get_history_store
 
 def process_book_data(asset, json_data):
     global_state.all_data[asset] = {
@@ -199,19 +200,21 @@ def process_data(json_datas, trade=True):
         # pretty_print(f'Received book update for {asset}:', global_state.all_data[asset])
 
 def add_to_performing(col, id):
-    if col not in global_state.performing:
-        global_state.performing[col] = set()
-    
     if col not in global_state.performing_timestamps:
         global_state.performing_timestamps[col] = {}
 
     # Add the trade ID and track its timestamp
-    global_state.performing[col].add(id)
+    performing = dict(global_state.snapshot().performing)
+    performing[col] = performing.get(col, frozenset()) | {id}
+    global_state.publish(performing=performing)
     global_state.performing_timestamps[col][id] = time.time()
 
 def remove_from_performing(col, id):
-    if col in global_state.performing:
-        global_state.performing[col].discard(id)
+    performing = global_state.snapshot().performing
+    if id in performing.get(col, ()):
+        performing = dict(performing)
+        performing[col] = performing[col] - {id}
+        global_state.publish(performing=performing)
 
     if col in global_state.performing_timestamps:
         global_state.performing_timestamps[col].pop(id, None)
@@ -305,6 +308,8 @@ def process_user_data(rows):
                     print("User is taker")
 
                 print("TRADE EVENT FOR: ", row['market'], "ID: ", row['id'], "STATUS: ", row['status'], " SIDE: ", row['side'], "  MAKER OUTCOME: ", maker_outcome, " TAKER OUTCOME: ", taker_outcome, " PROCESSED SIDE: ", side, " SIZE: ", size) 
+                get_history_store().append_fill(market, row['id'], token, side, price, size,
+                                                row['status'], is_maker=is_user_maker)
 
 
                 if row['status'] == 'CONFIRMED' or row['status'] == 'FAILED' :
@@ -314,7 +319,7 @@ def process_user_data(rows):
                         update_positions()
                     else:
                         remove_from_performing(col, row['id'])
-                        print("Confirmed. Performing is ", len(global_state.performing[col]))
+                        print("Confirmed. Performing is ", len(global_state.performing.get(col, ())))
                         print("Last trade update is ", global_state.last_trade_update)
                         print("Performing is ", global_state.performing)
                         print("Performing timestamps is ", global_state.performing_timestamps)
@@ -372,8 +377,11 @@ def process_user_data(rows):
             
             print(f"📋 ORDER EVENT: market={row['market']}, type={order_type}, status={row.get('status', 'N/A')}, side={side}, size={original_size}, matched={size_matched}")
             
+            get_history_store().append_order_event(market, row['id'], token, order_type, side, price,
+                                                   original_size, size_matched)
+
             if token in global_state.REVERSE_TOKENS:
-                set_order(token, side, original_size - size_matched, price)
+                set_order(token, side, original_size - size_matched, price, order_id=row['id'], order_type=order_type)
                 asyncio.create_task(perform_trade(market))
             else:
                 print(f"⚠️  User data received for {market} but token {token} is not in REVERSE_TOKENS")
@@ -1,50 +1,20 @@
 import poly_data.global_state as global_state
+from poly_data.position_sync import get_position_sync_engine
 import time
 
-#sth here seems to be removing the position
 def update_positions(avgOnly=False):
-    pos_df = global_state.client.get_all_positions()
-
-    for idx, row in pos_df.iterrows():
-        asset = str(row['asset'])
-
-        if asset in  global_state.positions:
-            position = global_state.positions[asset].copy()
-        else:
-            position = {'size': 0, 'avgPrice': 0}
-
-        position['avgPrice'] = row['avgPrice']
-
-        if not avgOnly:
-            position['size'] = row['size']
-        else:
-            
-            for col in [f"{asset}_sell", f"{asset}_buy"]:
-                #need to review this
-                if col not in global_state.performing or not isinstance(global_state.performing[col], set) or len(global_state.performing[col]) == 0:
-                    try:
-                        old_size = position['size']
-                    except:
-                        old_size = 0
-
-                    if asset in  global_state.last_trade_update:
-                        if time.time() - global_state.last_trade_update[asset] < 5:
-                            print(f"Skipping update for {asset} because last trade update was less than 5 seconds ago")
-                            continue
-
-                    if old_size != row['size']:
-                        print(f"No trades are pending. Updating position from {old_size} to {row['size']} and avgPrice to {row['avgPrice']} using API")
-    
-                    position['size'] = row['size']
-                else:
-                    print(f"ALERT: Skipping update for {asset} because there are trades pending for {col} looking like {global_state.performing[col]}")
-    
-        global_state.positions[asset] = position
+    """
+    Sync positions from the Data API, writing only assets that changed.
+    A full update (avgOnly=False) is always applied, even if the response is unchanged.
+    """
+    engine = get_position_sync_engine()
+    return engine.sync(engine.fetch_pages(), avgOnly=avgOnly, force=not avgOnly)
 
 def get_position(token):
     token = str(token)
-    if token in global_state.positions:
-        return global_state.positions[token]
+    positions = global_state.snapshot().positions
+    if token in positions:
+        return positions[token]
     else:
         return {'size': 0, 'avgPrice': 0}
 
@@ -58,10 +28,12 @@ def set_position(token, side, size, price, source='websocket'):
     if side.lower() == 'sell':
         size *= -1
 
-    if token in global_state.positions:
+    positions = dict(global_state.snapshot().positions)
+
+    if token in positions:
         
-        prev_price = global_state.positions[token]['avgPrice']
-        prev_size = global_state.positions[token]['size']
+        prev_price = positions[token]['avgPrice']
+        prev_size = positions[token]['size']
 
 
         if size > 0:
@@ -79,67 +51,57 @@ def set_position(token, side, size, price, source='websocket'):
             avgPrice_new = prev_price
 
 
-        global_state.positions[token]['size'] += size
-        global_state.positions[token]['avgPrice'] = avgPrice_new
+        positions[token] = {'size': prev_size + size, 'avgPrice': avgPrice_new}
     else:
-        global_state.positions[token] = {'size': size, 'avgPrice': price}
+        positions[token] = {'size': size, 'avgPrice': price}
 
-    print(f"Updated position from {source}, set to ", global_state.positions[token])
+    global_state.publish(positions=positions)
+    print(f"Updated position from {source}, set to ", positions[token])
 
 def update_orders():
-    all_orders = global_state.client.get_all_orders()
-
-    orders = {}
+    open_orders = global_state.client.get_open_orders()
 
-    if len(all_orders) > 0:
-            for token in all_orders['asset_id'].unique():
-                
-                if token not in orders:
-                    orders[str(token)] = {'buy': {'price': 0, 'size': 0}, 'sell': {'price': 0, 'size': 0}}
+    for token in apply_orders(open_orders):
+        global_state.client.cancel_all_asset(token)
 
-                curr_orders = all_orders[all_orders['asset_id'] == str(token)]
-                
-                if len(curr_orders) > 0:
-                    sel_orders = {}
-                    sel_orders['buy'] = curr_orders[curr_orders['side'] == 'BUY']
-                    sel_orders['sell'] = curr_orders[curr_orders['side'] == 'SELL']
+def apply_orders(open_orders):
+    """
+    Reconcile global_state.orders with an open orders snapshot (as returned by
+    get_open_orders) in a single pass.
 
-                    for type in ['buy', 'sell']:
-                        curr = sel_orders[type]
+    Does no I/O. Tokens with more than one order on a side are dropped locally
+    and returned so the caller can cancel them on the exchange.
+    """
+    result = global_state.orders.apply_snapshot(open_orders)
 
-                        if len(curr) > 1:
-                            print("Multiple orders found, cancelling")
-                            global_state.client.cancel_all_asset(token)
-                            orders[str(token)] = {'buy': {'price': 0, 'size': 0}, 'sell': {'price': 0, 'size': 0}}
-                        elif len(curr) == 1:
-                            orders[str(token)][type]['price'] = float(curr.iloc[0]['price'])
-                            orders[str(token)][type]['size'] = float(curr.iloc[0]['original_size'] - curr.iloc[0]['size_matched'])
+    duplicated = sorted(result['duplicated'])
+    for token in duplicated:
+        print(f"Multiple orders found for {token}, cancelling")
+        global_state.orders.clear_token(token)
 
-    global_state.orders = orders
+    return duplicated
 
 def get_order(token):
-    token = str(token)
-    if token in global_state.orders:
-
-        if 'buy' not in global_state.orders[token]:
-            global_state.orders[token]['buy'] = {'price': 0, 'size': 0}
-
-        if 'sell' not in global_state.orders[token]:
-            global_state.orders[token]['sell'] = {'price': 0, 'size': 0}
-
-        return global_state.orders[token]
-    else:
-        return {'buy': {'price': 0, 'size': 0}, 'sell': {'price': 0, 'size': 0}}
+    return global_state.orders.get(token)
     
-def set_order(token, side, size, price):
-    curr = {}
-    curr = {side: {'price': 0, 'size': 0}}
-
-    curr[side]['size'] = float(size)
-    curr[side]['price'] = float(price)
+def set_order(token, side, size, price, order_id=None, order_type='UPDATE'):
+    """
+    Update a single order from the user channel.
 
-    global_state.orders[str(token)] = curr
-    print("Updated order, set to ", curr)
+    Without an order_id the whole side is replaced, which is how orders were
+    tracked before they were keyed by id.
+    """
+    side = side.lower()
+    if order_id is None:
+        for oid in global_state.orders.get_order_ids(token, side):
+            global_state.orders.remove(oid)
+        order_id = f"{token}_{side}"
+
+    if order_type == 'CANCELLATION':
+        global_state.orders.remove(order_id)
+    else:
+        global_state.orders.upsert(order_id, token, side, price, size)
+    print("Updated order, set to ", global_state.orders.get(token))
 
     
 
@@ -6,7 +6,8 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
 
 from sqlalchemy.orm import Session
-from database import SessionLocal, Market, TradingParams, Position, Order
+from database import SessionLocal, Market, TradingParams
+from poly_data.db_writer import get_db_writer
 import pandas as pd
 from typing import Optional, Dict, List
 
@@ -99,56 +100,22 @@ def get_trading_params() -> Dict:
 
 def update_position_in_db(token_id: str, size: float, avg_price: float, 
                           side: Optional[str] = None, market_id: Optional[int] = None):
-    """Update position in database"""
-    db = get_db_session()
-    try:
-        position = db.query(Position).filter(Position.token_id == token_id).first()
-        
-        if position:
-            position.size = size
-            position.avg_price = avg_price
-            if side:
-                position.side = side
-        else:
-            # Create new position
-            position = Position(
-                token_id=token_id,
-                size=size,
-                avg_price=avg_price,
-                side=side,
-                market_id=market_id or 0
-            )
-            db.add(position)
-        
-        db.commit()
-    finally:
-        db.close()
+    """
+    Update position in database.
+    The write is queued and committed with the next write-behind batch.
+    """
+    get_db_writer().queue_position(token_id, size, avg_price, side=side, market_id=market_id)
 
 def update_order_in_db(order_id: str, token_id: str, side_type: str, 
                        price: float, size: float, status: str = 'PENDING',
                        market_id: Optional[int] = None):
-    """Update order in database"""
-    db = get_db_session()
-    try:
-        order = db.query(Order).filter(Order.order_id == order_id).first()
-        
-        if order:
-            order.status = status
-            order.filled_size = size
-        else:
-            # Create new order
-            order = Order(
-                order_id=order_id,
-                token_id=token_id,
-                side_type=side_type,
-                price=price,
-                size=size,
-                status=status,
-                market_id=market_id or 0
-            )
-            db.add(order)
-        
-        db.commit()
-    finally:
-        db.close()
+    """
+    Update order in database.
+    The write is queued and committed with the next write-behind batch.
+    """
+    get_db_writer().queue_order(order_id, token_id, side_type, price, size,
+                                status=status, market_id=market_id)
 
+def flush_db_writes() -> int:
+    """Commit all queued position/order writes now. Returns the number of rows written."""
+    return get_db_writer().flush()
@@ -0,0 +1,228 @@
+"""
+Write-behind database writer for the bot
+
+Position and order updates from the trading loop are queued in memory and
+written in one transaction per flush instead of one session and commit per
+row. Writes to the same position (token_id) or order (order_id) are
+coalesced, so only the latest state of each row reaches the database.
+
+A daemon thread flushes every `flush_interval` seconds, or as soon as
+`max_batch` rows are pending. flush() can be called directly to force a
+write (e.g. on shutdown or in tests).
+"""
+import sys
+import os
+import atexit
+from threading import Condition, Lock, Thread
+from typing import Dict, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
+
+from database import SessionLocal, Position, Order
+
+
+class WriteBehindWriter:
+    """
+    Batches position and order writes into periodic transactions.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_batch: int = 500):
+        """
+        Args:
+            flush_interval: Seconds between background flushes
+            max_batch: Pending row count that triggers an early flush
+        """
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._cond = Condition()
+        # Serializes flushes so batches commit in the order they were taken
+        self._flush_lock = Lock()
+        # token_id -> latest position values
+        self._positions: Dict[str, Dict] = {}
+        # order_id -> latest order values
+        self._orders: Dict[str, Dict] = {}
+        self._thread: Optional[Thread] = None
+        self._stopped = False
+        self.stats = {'enqueued': 0, 'written': 0, 'flushes': 0, 'errors': 0}
+
+    # ============ Queueing ============
+
+    def queue_position(self, token_id: str, size: float, avg_price: float,
+                       side: Optional[str] = None, market_id: Optional[int] = None):
+        """Queue a position upsert. Later writes for the same token replace earlier ones."""
+        with self._cond:
+            previous = self._positions.get(token_id, {})
+            self._positions[token_id] = {
+                'size': size,
+                'avg_price': avg_price,
+                'side': side or previous.get('side'),
+                'market_id': market_id or previous.get('market_id'),
+            }
+            self._enqueued()
+
+    def queue_order(self, order_id: str, token_id: str, side_type: str, price: float,
+                    size: float, status: str = 'PENDING', market_id: Optional[int] = None):
+        """Queue an order upsert. Later writes for the same order replace earlier ones."""
+        with self._cond:
+            self._orders[order_id] = {
+                'token_id': token_id,
+                'side_type': side_type,
+                'price': price,
+                'size': size,
+                'status': status,
+                'market_id': market_id,
+            }
+            self._enqueued()
+
+    def pending(self) -> int:
+        """Number of rows waiting to be written"""
+        with self._cond:
+            return len(self._positions) + len(self._orders)
+
+    def _enqueued(self):
+        # Caller holds self._cond
+        self.stats['enqueued'] += 1
+        self._ensure_started()
+        if len(self._positions) + len(self._orders) >= self.max_batch:
+            self._cond.notify()
+
+    # ============ Flushing ============
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far in a single transaction.
+
+        Returns:
+            Number of rows written
+        """
+        with self._flush_lock:
+            with self._cond:
+                positions, self._positions = self._positions, {}
+                orders, self._orders = self._orders, {}
+            if not positions and not orders:
+                return 0
+
+            db = SessionLocal()
+            try:
+                self._write_positions(db, positions)
+                self._write_orders(db, orders)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.stats['errors'] += 1
+                print(f"❌ Error writing batch to database: {e}")
+                # Put the batch back unless newer values arrived meanwhile
+                with self._cond:
+                    for key, value in positions.items():
+                        self._positions.setdefault(key, value)
+                    for key, value in orders.items():
+                        self._orders.setdefault(key, value)
+                return 0
+            finally:
+                db.close()
+
+            written = len(positions) + len(orders)
+            self.stats['written'] += written
+            self.stats['flushes'] += 1
+            return written
+
+    @staticmethod
+    def _write_positions(db, positions: Dict[str, Dict]):
+        if not positions:
+            return
+        existing = {
+            p.token_id: p for p in db.query(Position).filter(Position.token_id.in_(list(positions)))
+        }
+        for token_id, values in positions.items():
+            position = existing.get(token_id)
+            if position:
+                position.size = values['size']
+                position.avg_price = values['avg_price']
+                if values['side']:
+                    position.side = values['side']
+            else:
+                db.add(Position(
+                    token_id=token_id,
+                    size=values['size'],
+                    avg_price=values['avg_price'],
+                    side=values['side'],
+                    market_id=values['market_id'] or 0,
+                ))
+
+    @staticmethod
+    def _write_orders(db, orders: Dict[str, Dict]):
+        if not orders:
+            return
+        existing = {
+            o.order_id: o for o in db.query(Order).filter(Order.order_id.in_(list(orders)))
+        }
+        for order_id, values in orders.items():
+            order = existing.get(order_id)
+            if order:
+                order.status = values['status']
+                order.filled_size = values['size']
+            else:
+                db.add(Order(
+                    order_id=order_id,
+                    token_id=values['token_id'],
+                    side_type=values['side_type'],
+                    price=values['price'],
+                    size=values['size'],
+                    status=values['status'],
+                    market_id=values['market_id'] or 0,
+                ))
+
+    # ============ Background thread ============
+
+    def _ensure_started(self):
+        # Caller holds self._cond
+        if self._thread is None and not self._stopped:
+            self._thread = Thread(target=self._run, name='db-write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._positions) + len(self._orders) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending writes and stop the background thread"""
+        with self._cond:
+            self._stopped = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'pending': self.pending()}
+
+
+# Global singleton instance
+_writer_instance: Optional[WriteBehindWriter] = None
+_writer_lock = Lock()
+
+
+def get_db_writer() -> WriteBehindWriter:
+    """
+    Get the global WriteBehindWriter instance (singleton pattern).
+    Pending writes are flushed at interpreter exit.
+
+    Returns:
+        WriteBehindWriter instance
+    """
+    global _writer_instance
+
+    if _writer_instance is None:
+        with _writer_lock:
+            if _writer_instance is None:
+                _writer_instance = WriteBehindWriter()
+                atexit.register(_writer_instance.stop)
+
+    return _writer_instance
@@ -1,26 +1,125 @@
 import threading
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
 import pandas as pd
 
+from poly_data.order_store import OrderStore
+
+# ============ Versioned State ============
+#
+# Market config, positions, orders and pending trades are published as
+# immutable snapshots. Writers build a new object for the component they
+# change and call publish(); readers call snapshot() once and get a
+# consistent view without taking a lock. Published objects are never
+# mutated afterwards, so the legacy module globals below (df, positions,
+# REVERSE_TOKENS, ...) always point at the latest published objects too.
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """Immutable view of the bot state at one version"""
+    version: int = 0
+    # Market configuration (one row per active market)
+    df: pd.DataFrame = field(default_factory=pd.DataFrame)
+    # condition_id -> positional index into df
+    market_index: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    params: Mapping[str, Mapping] = field(default_factory=lambda: MappingProxyType({}))
+    all_tokens: Tuple[str, ...] = ()
+    reverse_tokens: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    # token -> {'size', 'avgPrice'}
+    positions: Mapping[str, Mapping] = field(default_factory=lambda: MappingProxyType({}))
+    # token -> {'buy': (price, size), 'sell': (price, size)}
+    orders: Mapping[str, Mapping] = field(default_factory=lambda: MappingProxyType({}))
+    # "token_side" -> frozenset of trade ids
+    performing: Mapping[str, frozenset] = field(default_factory=lambda: MappingProxyType({}))
+    # component name -> version at which it last changed
+    component_versions: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+
+    def market_row(self, condition_id: str) -> Optional[pd.Series]:
+        """Configuration row for a market, or None if it isn't loaded"""
+        index = self.market_index.get(condition_id)
+        if index is None:
+            return None
+        return self.df.iloc[index]
+
+    def changed_since(self, version: int, *components: str) -> bool:
+        """True if any of the given components changed after `version`"""
+        return any(self.component_versions.get(name, 0) > version for name in components)
+
+
+# Module globals kept in sync with the latest snapshot for existing readers
+_LEGACY_NAMES = {
+    'df': 'df',
+    'params': 'params',
+    'all_tokens': 'all_tokens',
+    'reverse_tokens': 'REVERSE_TOKENS',
+    'positions': 'positions',
+    'performing': 'performing',
+}
+
+_publish_lock = threading.Lock()
+_snapshot = StateSnapshot()
+
+
+def snapshot() -> StateSnapshot:
+    """Latest published state. Reading it takes no lock."""
+    return _snapshot
+
+
+def publish(**components: Any) -> StateSnapshot:
+    """
+    Atomically publish new values for one or more snapshot components.
+
+    Callers must pass freshly built objects and not mutate them afterwards.
+    Dicts are wrapped read-only in the snapshot.
+
+    Returns:
+        The new snapshot
+    """
+    global _snapshot
+    frozen = {}
+    for name, value in components.items():
+        if isinstance(value, dict):
+            value = MappingProxyType(value)
+        elif name == 'all_tokens':
+            value = tuple(value)
+        frozen[name] = value
+
+    with _publish_lock:
+        version = _snapshot.version + 1
+        component_versions = dict(_snapshot.component_versions)
+        component_versions.update({name: version for name in frozen})
+        _snapshot = replace(_snapshot, version=version,
+                            component_versions=MappingProxyType(component_versions), **frozen)
+
+        legacy = globals()
+        for name, value in frozen.items():
+            if name in _LEGACY_NAMES:
+                legacy[_LEGACY_NAMES[name]] = list(value) if name == 'all_tokens' else value
+    return _snapshot
+
+
 # ============ Market Data ============
 
-# List of all tokens being tracked
+# List of all tokens being tracked (read-only, see publish())
 all_tokens = []
 
-# Mapping between tokens in the same market (YES->NO, NO->YES)
-REVERSE_TOKENS = {}  
+# Mapping between tokens in the same market (YES->NO, NO->YES) (read-only, see publish())
+REVERSE_TOKENS = {}
 
 # Order book data for all markets
-all_data = {}  
+all_data = {}
 
-# Market configuration data from Google Sheets
-df = None  
+# Market configuration data from the database (read-only, see publish())
+df = _snapshot.df
 
 # ============ Client & Parameters ============
 
 # Polymarket client instance
 client = None
 
-# Trading parameters from Google Sheets
+# Trading parameters by param_type (read-only, see publish())
 params = {}
 
 # Lock for thread-safe trading operations
@@ -28,7 +127,7 @@ lock = threading.Lock()
 
 # ============ Trading State ============
 
-# Tracks trades that have been matched but not yet mined
+# Tracks trades that have been matched but not yet mined (read-only, see publish())
 # Format: {"token_side": {trade_id1, trade_id2, ...}}
 performing = {}
 
@@ -39,11 +138,12 @@ performing_timestamps = {}
 # Timestamps for when positions were last updated
 last_trade_update = {}
 
-# Current open orders for each token
-# Format: {token_id: {'buy': {price, size}, 'sell': {price, size}}}
-orders = {}
+# Current open orders, keyed by order id with a per-token/side index
+# orders.get(token) -> {'buy': {price, size}, 'sell': {price, size}}
+# Every change publishes the aggregated view as snapshot().orders
+orders = OrderStore(on_change=lambda view: publish(orders=view))
 
-# Current positions for each token
+# Current positions for each token (read-only, see publish())
 # Format: {token_id: {'size': float, 'avgPrice': float}}
 positions = {}
 
@@ -51,4 +151,3 @@ positions = {}
 
 # Account restriction flags
 account_in_closed_only_mode = False  # Set to True when API returns "closed only mode" error
-
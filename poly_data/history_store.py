@@ -0,0 +1,382 @@
+"""
+Append-only trading history in partitioned Parquet files
+
+Fills, order events and periodic top-N order book snapshots are buffered in
+memory and appended as new Parquet part files under
+
+    <root>/<stream>/date=YYYY-MM-DD/market=<condition_id>/part-*.parquet
+
+Part files are never modified, so readers (analytics, backtests) can scan
+the history at any time without touching the live SQLite database. query()
+uses the date/market partitions to skip files outside the requested range.
+
+Each flush adds one part per partition, so a day of 30s flushes leaves
+thousands of small files per market. Once a day is over, compact() merges
+its parts into a single compacted-*.parquet file per market; the writer
+thread runs it every compact_interval seconds.
+
+pyarrow is an optional dependency (`pip install poly-maker[history]`). When
+it is not installed the store accepts appends but drops them, after printing
+a single warning.
+"""
+import os
+import atexit
+import time
+import uuid
+from datetime import datetime, timezone
+from threading import Condition, Lock, Thread
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+HISTORY_DIR = os.getenv('HISTORY_DIR', os.path.join(os.path.dirname(__file__), '..', 'data', 'history'))
+
+STREAMS = ('fills', 'order_events', 'book_snapshots')
+
+if pa is not None:
+    _float_list = pa.list_(pa.float64())
+    SCHEMAS = {
+        'fills': pa.schema([
+            ('ts', pa.timestamp('ms', tz='UTC')),
+            ('trade_id', pa.string()),
+            ('asset_id', pa.string()),
+            ('side', pa.string()),
+            ('price', pa.float64()),
+            ('size', pa.float64()),
+            ('status', pa.string()),
+            ('is_maker', pa.bool_()),
+        ]),
+        'order_events': pa.schema([
+            ('ts', pa.timestamp('ms', tz='UTC')),
+            ('order_id', pa.string()),
+            ('asset_id', pa.string()),
+            ('event_type', pa.string()),
+            ('side', pa.string()),
+            ('price', pa.float64()),
+            ('original_size', pa.float64()),
+            ('size_matched', pa.float64()),
+        ]),
+        'book_snapshots': pa.schema([
+            ('ts', pa.timestamp('ms', tz='UTC')),
+            ('asset_id', pa.string()),
+            ('bid_prices', _float_list),
+            ('bid_sizes', _float_list),
+            ('ask_prices', _float_list),
+            ('ask_sizes', _float_list),
+        ]),
+    }
+else:
+    SCHEMAS = {}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class HistoryStore:
+    """
+    Buffered, append-only writer and reader for the history streams.
+    """
+
+    def __init__(self, root: str = HISTORY_DIR, flush_rows: int = 5000,
+                 flush_interval: float = 30.0, book_depth: int = 10,
+                 compact_interval: float = 3600.0):
+        """
+        Args:
+            root: Directory holding one sub-directory per stream
+            flush_rows: Buffered row count that triggers an early flush
+            flush_interval: Seconds between background flushes
+            book_depth: Price levels per side kept in book snapshots
+            compact_interval: Seconds between background compactions of finished days
+        """
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.book_depth = book_depth
+        self.compact_interval = compact_interval
+        self._last_compact = 0.0
+        self._cond = Condition()
+        self._flush_lock = Lock()
+        # stream -> list of (market, row)
+        self._buffers: Dict[str, List[tuple]] = {stream: [] for stream in STREAMS}
+        self._buffered = 0
+        self._thread: Optional[Thread] = None
+        self._stopped = False
+        self._warned = False
+        self.stats = {'appended': 0, 'written': 0, 'files': 0, 'compacted': 0, 'errors': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return pa is not None
+
+    # ============ Appending ============
+
+    def append_fill(self, market: str, trade_id: str, asset_id: str, side: str, price: float,
+                    size: float, status: str, is_maker: bool = False, ts: Optional[datetime] = None):
+        """Record a trade event from the user channel"""
+        self._append('fills', market, {
+            'ts': ts or _utcnow(), 'trade_id': str(trade_id), 'asset_id': str(asset_id),
+            'side': side, 'price': float(price), 'size': float(size), 'status': status,
+            'is_maker': bool(is_maker),
+        })
+
+    def append_order_event(self, market: str, order_id: str, asset_id: str, event_type: str,
+                           side: str, price: float, original_size: float, size_matched: float,
+                           ts: Optional[datetime] = None):
+        """Record an order PLACEMENT / UPDATE / CANCELLATION"""
+        self._append('order_events', market, {
+            'ts': ts or _utcnow(), 'order_id': str(order_id), 'asset_id': str(asset_id),
+            'event_type': event_type, 'side': side, 'price': float(price),
+            'original_size': float(original_size), 'size_matched': float(size_matched),
+        })
+
+    def append_book_snapshot(self, market: str, asset_id: str, bids, asks,
+                             ts: Optional[datetime] = None):
+        """
+        Record the top `book_depth` levels of an order book.
+
+        Args:
+            bids, asks: Price -> size mappings sorted by ascending price
+                (the SortedDicts kept in global_state.all_data)
+        """
+        top_bids = list(reversed(bids.items()[-self.book_depth:])) if bids else []
+        top_asks = list(asks.items()[:self.book_depth]) if asks else []
+        self._append('book_snapshots', market, {
+            'ts': ts or _utcnow(), 'asset_id': str(asset_id),
+            'bid_prices': [float(p) for p, _ in top_bids],
+            'bid_sizes': [float(s) for _, s in top_bids],
+            'ask_prices': [float(p) for p, _ in top_asks],
+            'ask_sizes': [float(s) for _, s in top_asks],
+        })
+
+    def snapshot_books(self, all_data: Dict) -> int:
+        """Record a snapshot of every book in global_state.all_data. Returns the count."""
+        ts = _utcnow()
+        count = 0
+        for market, book in list(all_data.items()):
+            self.append_book_snapshot(market, book.get('asset_id', ''), book.get('bids'),
+                                      book.get('asks'), ts=ts)
+            count += 1
+        return count
+
+    def _append(self, stream: str, market: str, row: Dict):
+        if not self.enabled:
+            if not self._warned:
+                self._warned = True
+                print("⚠️  pyarrow is not installed, trading history will not be recorded")
+            return
+        with self._cond:
+            self._buffers[stream].append((str(market), row))
+            self._buffered += 1
+            self.stats['appended'] += 1
+            if self._thread is None and not self._stopped:
+                self._thread = Thread(target=self._run, name='history-writer', daemon=True)
+                self._thread.start()
+            if self._buffered >= self.flush_rows:
+                self._cond.notify()
+
+    # ============ Flushing ============
+
+    def flush(self) -> int:
+        """
+        Write all buffered rows as new part files, one per (stream, day, market).
+
+        Returns:
+            Number of rows written
+        """
+        if not self.enabled:
+            return 0
+        with self._flush_lock:
+            with self._cond:
+                buffers = self._buffers
+                self._buffers = {stream: [] for stream in STREAMS}
+                self._buffered = 0
+
+            written = 0
+            for stream, entries in buffers.items():
+                partitions: Dict[tuple, List[Dict]] = {}
+                for market, row in entries:
+                    day = row['ts'].strftime('%Y-%m-%d')
+                    partitions.setdefault((day, market), []).append(row)
+
+                for (day, market), rows in partitions.items():
+                    try:
+                        self._write_part(stream, day, market, rows)
+                        written += len(rows)
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        print(f"❌ Error writing {stream} history for {market}: {e}")
+
+            self.stats['written'] += written
+            return written
+
+    def _write_part(self, stream: str, day: str, market: str, rows: List[Dict]):
+        directory = os.path.join(self.root, stream, f"date={day}", f"market={market}")
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pylist(rows, schema=SCHEMAS[stream])
+        self._write_file(directory, 'part', table)
+        self.stats['files'] += 1
+
+    def _write_file(self, directory: str, prefix: str, table) -> str:
+        name = f"{prefix}-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet"
+        # Write to a temp name first so readers never see a partial file
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(directory, name))
+        return name
+
+    # ============ Compaction ============
+
+    def compact(self, before: Optional[str] = None) -> int:
+        """
+        Merge the part files of each finished (stream, day, market) partition
+        into one file, in ts order.
+
+        Args:
+            before: Only days strictly before this 'YYYY-MM-DD' (default: today, UTC)
+
+        Returns:
+            Number of partitions compacted
+        """
+        if not self.enabled:
+            return 0
+        before = before or _utcnow().strftime('%Y-%m-%d')
+        compacted = 0
+        # Hold the flush lock so no part lands in a partition while it is merged
+        with self._flush_lock:
+            for stream in STREAMS:
+                stream_dir = os.path.join(self.root, stream)
+                if not os.path.isdir(stream_dir):
+                    continue
+                for day_dir in sorted(os.listdir(stream_dir)):
+                    if not day_dir.startswith('date=') or day_dir[len('date='):] >= before:
+                        continue
+                    for market_dir in sorted(os.listdir(os.path.join(stream_dir, day_dir))):
+                        directory = os.path.join(stream_dir, day_dir, market_dir)
+                        try:
+                            if self._compact_partition(stream, directory):
+                                compacted += 1
+                        except Exception as e:
+                            self.stats['errors'] += 1
+                            print(f"❌ Error compacting {stream} history in {directory}: {e}")
+        self.stats['compacted'] += compacted
+        return compacted
+
+    def _compact_partition(self, stream: str, directory: str) -> bool:
+        files = sorted(name for name in os.listdir(directory)
+                       if name.endswith('.parquet') and not name.startswith('.'))
+        if len(files) < 2:
+            return False
+        tables = [pq.read_table(os.path.join(directory, name), schema=SCHEMAS[stream]) for name in files]
+        table = pa.concat_tables(tables)
+        table = table.take(pa.compute.sort_indices(table, sort_keys=[('ts', 'ascending')]))
+        self._write_file(directory, 'compacted', table)
+        for name in files:
+            os.remove(os.path.join(directory, name))
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and self._buffered < self.flush_rows:
+                    self._cond.wait(self.flush_interval)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+            if time.time() - self._last_compact >= self.compact_interval:
+                self._last_compact = time.time()
+                self.compact()
+
+    def stop(self, timeout: float = 10.0):
+        """Flush buffered rows and stop the background thread"""
+        with self._cond:
+            self._stopped = True
+            thread = self._thread
+            self._cond.notify()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    # ============ Querying ============
+
+    def query(self, stream: str, start: Optional[str] = None, end: Optional[str] = None,
+              markets: Optional[Iterable[str]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Scan a history stream into a DataFrame.
+
+        Only partitions matching the day range and markets are read.
+
+        Args:
+            stream: 'fills', 'order_events' or 'book_snapshots'
+            start, end: Inclusive day bounds as 'YYYY-MM-DD'
+            markets: Condition ids to include (default: all)
+            columns: Columns to read (default: all, plus 'date' and 'market')
+
+        Returns:
+            DataFrame sorted by ts (empty if nothing matches)
+        """
+        if not self.enabled:
+            raise RuntimeError("pyarrow is required to query trading history")
+        if stream not in STREAMS:
+            raise ValueError(f"Unknown history stream: {stream}")
+
+        path = os.path.join(self.root, stream)
+        if not os.path.isdir(path):
+            return pd.DataFrame(columns=columns or SCHEMAS[stream].names)
+
+        partitioning = ds.partitioning(pa.schema([('date', pa.string()), ('market', pa.string())]),
+                                       flavor='hive')
+        dataset = ds.dataset(path, format='parquet', partitioning=partitioning,
+                             schema=SCHEMAS[stream].append(pa.field('date', pa.string()))
+                                                   .append(pa.field('market', pa.string())),
+                             exclude_invalid_files=True)
+
+        expression = None
+        conditions = []
+        if start:
+            conditions.append(ds.field('date') >= start)
+        if end:
+            conditions.append(ds.field('date') <= end)
+        if markets is not None:
+            conditions.append(ds.field('market').isin([str(m) for m in markets]))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        table = dataset.to_table(columns=columns, filter=expression)
+        df = table.to_pandas()
+        if 'ts' in df.columns:
+            df = df.sort_values('ts', kind='stable').reset_index(drop=True)
+        return df
+
+
+# Global singleton instance
+_history_instance: Optional[HistoryStore] = None
+_history_lock = Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """
+    Get the global HistoryStore instance (singleton pattern).
+    Buffered rows are flushed at interpreter exit.
+
+    Returns:
+        HistoryStore instance
+    """
+    global _history_instance
+
+    if _history_instance is None:
+        with _history_lock:
+            if _history_instance is None:
+                _history_instance = HistoryStore()
+                atexit.register(_history_instance.stop)
+
+    return _history_instance
@@ -0,0 +1,303 @@
+"""
+Incremental market configuration loader for the bot
+
+Keeps the bot's market config (global_state.df, params, all_tokens,
+REVERSE_TOKENS) in sync with the database without re-reading every market.
+
+Each reload:
+- selects only markets/params whose updated_at is at or after the last
+  watermark (less INCREMENTAL_OVERLAP), with params loaded in the same join
+  (no N+1 on trading_params)
+- reads the set of active condition ids to detect removed markets
+- patches its own market rows and token maps, publishes new copies of
+  df/params/all_tokens/REVERSE_TOKENS as one global_state snapshot and
+  reports which markets were added, changed or removed
+
+read() only touches the database and can run in a worker thread; apply()
+publishes to global_state and should run on the event loop thread.
+"""
+import sys
+import os
+import itertools
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import or_
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
+
+from database import SessionLocal, Market, TradingParams
+import poly_data.global_state as global_state
+
+# Volatility columns expected by the trading logic, not stored in the DB
+VOLATILITY_COLUMNS = ['1_hour', '3_hour', '6_hour', '12_hour', '24_hour', '7_day', '14_day', '30_day']
+
+# Reloads re-read this far behind the watermark, so rows whose updated_at was
+# set just before a slow commit are not missed (re-read rows are no-ops in apply())
+INCREMENTAL_OVERLAP = timedelta(seconds=5)
+
+
+def market_row(market: Market, params: TradingParams) -> Dict:
+    """Flatten a market and its trading params into the row format used by perform_trade"""
+    row = {
+        'condition_id': market.condition_id,
+        'question': market.question,
+        'answer1': market.answer1,
+        'answer2': market.answer2,
+        'token1': market.token1,
+        'token2': market.token2,
+        'market_slug': market.market_slug or '',
+        'neg_risk': market.neg_risk,
+        'side_to_trade': market.side_to_trade,
+        'trading_mode': market.trading_mode,
+        'target_position': market.target_position,
+        'best_bid': market.best_bid,
+        'best_ask': market.best_ask,
+        'spread': market.spread,
+        # Trading params
+        'trade_size': params.trade_size,
+        'max_size': params.max_size,
+        'min_size': params.min_size,
+        'max_spread': params.max_spread,
+        'tick_size': params.tick_size,
+        'multiplier': params.multiplier if params.multiplier else '',
+        'param_type': params.param_type,
+        # Risk management
+        'stop_loss_threshold': params.stop_loss_threshold,
+        'take_profit_threshold': params.take_profit_threshold,
+        'volatility_threshold': params.volatility_threshold,
+        'spread_threshold': params.spread_threshold,
+        'sleep_period': params.sleep_period,
+        # Competitive bot params
+        'order_front_running': params.order_front_running,
+        'tick_improvement': params.tick_improvement,
+        'quick_cancel_threshold': params.quick_cancel_threshold,
+        'position_patience': params.position_patience,
+    }
+    # Add volatility columns with default values
+    for col in VOLATILITY_COLUMNS:
+        row[col] = 0.0
+    return row
+
+
+def _valid_token(token) -> Optional[str]:
+    token = str(token) if token else None
+    if not token or token == 'None' or token == 'nan' or not token.strip():
+        return None
+    return token
+
+
+class IncrementalMarketLoader:
+    """
+    Loads active market configuration incrementally using updated_at watermarks.
+    """
+
+    def __init__(self):
+        # condition_id -> market row, in load order
+        self.rows: Dict[str, Dict] = {}
+        # condition_id -> (token1, token2) registered for that market
+        self._market_tokens: Dict[str, tuple] = {}
+        # token -> number of markets using it
+        self._token_refs: Dict[str, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._loaded = False
+        # read() may run concurrently in worker threads (periodic poll and
+        # change-log triggered reloads); results older than the last applied
+        # one are discarded
+        self._read_seq = itertools.count(1)
+        self._applied_seq = 0
+        # Working copies for the apply() in progress
+        self._reverse_tokens: Dict[str, str] = {}
+        self._performing: Dict[str, frozenset] = {}
+
+    def reset(self):
+        """Forget everything so the next read() is a full load"""
+        self.rows = {}
+        self._market_tokens = {}
+        self._token_refs = {}
+        self._watermark = None
+        self._loaded = False
+        self._applied_seq = 0
+
+    def read(self) -> Dict:
+        """
+        Read markets changed since the last applied watermark.
+
+        Returns:
+            dict with 'rows' (condition_id -> row for new or updated active
+            markets), 'active' (all active condition ids), 'watermark' and
+            'seq' (read order, used by apply() to drop out-of-order results)
+        """
+        seq = next(self._read_seq)
+        watermark = self._watermark
+        db = SessionLocal()
+        try:
+            query = db.query(Market, TradingParams).join(
+                TradingParams, TradingParams.market_id == Market.id
+            ).filter(Market.is_active == True)
+
+            if watermark is not None:
+                since = watermark - INCREMENTAL_OVERLAP
+                query = query.filter(or_(
+                    Market.updated_at >= since,
+                    TradingParams.updated_at >= since,
+                ))
+
+            rows = {}
+            new_watermark = watermark
+            for market, params in query.order_by(Market.id).all():
+                rows[market.condition_id] = market_row(market, params)
+                for ts in (market.updated_at, params.updated_at):
+                    if ts is not None and (new_watermark is None or ts > new_watermark):
+                        new_watermark = ts
+
+            active = {
+                condition_id for (condition_id,) in db.query(Market.condition_id).join(
+                    TradingParams, TradingParams.market_id == Market.id
+                ).filter(Market.is_active == True)
+            }
+
+            return {'rows': rows, 'active': active, 'watermark': new_watermark, 'seq': seq}
+        finally:
+            db.close()
+
+    def apply(self, result: Dict) -> Dict[str, List[str]]:
+        """
+        Patch global_state with the result of read().
+
+        Returns:
+            dict with 'added', 'changed' and 'removed' condition ids, and
+            'subscribe' / 'unsubscribe' token lists
+        """
+        seq = result.get('seq', 0)
+        if seq and seq < self._applied_seq:
+            # A newer read was applied already
+            return {'added': [], 'changed': [], 'removed': [], 'subscribe': [], 'unsubscribe': []}
+        self._applied_seq = max(self._applied_seq, seq)
+
+        initial = not self._loaded
+        current = global_state.snapshot()
+        # Copies that become the next published versions
+        all_tokens = [] if initial else list(current.all_tokens)
+        self._reverse_tokens = {} if initial else dict(current.reverse_tokens)
+        self._performing = dict(current.performing)
+
+        added, changed, removed = [], [], []
+        subscribe, unsubscribe = [], []
+
+        for condition_id in [cid for cid in self.rows if cid not in result['active']]:
+            del self.rows[condition_id]
+            unsubscribe.extend(self._unregister_tokens(condition_id))
+            removed.append(condition_id)
+
+        for condition_id, row in result['rows'].items():
+            if condition_id not in result['active']:
+                continue
+            previous = self.rows.get(condition_id)
+            if previous == row:
+                continue
+
+            self.rows[condition_id] = row
+            if previous is None:
+                added.append(condition_id)
+            else:
+                changed.append(condition_id)
+
+            if previous is None or (previous['token1'], previous['token2']) != (row['token1'], row['token2']):
+                unsubscribe.extend(self._unregister_tokens(condition_id))
+                subscribe.extend(self._register_tokens(condition_id, row))
+
+        subscribe = [token for token in subscribe if token not in unsubscribe]
+        unsubscribe = [token for token in unsubscribe if token not in self._token_refs]
+
+        if unsubscribe:
+            dropped = set(unsubscribe)
+            all_tokens = [token for token in all_tokens if token not in dropped]
+        all_tokens.extend(subscribe)
+
+        self._watermark = result['watermark']
+        self._loaded = True
+
+        if initial or added or changed or removed:
+            self._publish(all_tokens)
+
+        return {
+            'added': added,
+            'changed': changed,
+            'removed': removed,
+            'subscribe': subscribe,
+            'unsubscribe': unsubscribe,
+        }
+
+    # ============ Internals ============
+
+    def _register_tokens(self, condition_id: str, row: Dict) -> List[str]:
+        token1 = _valid_token(row['token1'])
+        token2 = _valid_token(row['token2'])
+
+        # Skip if tokens are missing or invalid
+        if not token1:
+            print(f"⚠️  Warning: Market '{row['question']}' has invalid token1: {row['token1']}")
+            return []
+        if not token2:
+            print(f"⚠️  Warning: Market '{row['question']}' has invalid token2: {row['token2']}")
+            return []
+
+        new_tokens = [token for token in (token1, token2) if token not in self._token_refs]
+        self._market_tokens[condition_id] = (token1, token2)
+        for token in (token1, token2):
+            self._token_refs[token] = self._token_refs.get(token, 0) + 1
+
+        self._reverse_tokens[token1] = token2
+        self._reverse_tokens[token2] = token1
+
+        # Initialize performing tracking
+        for col in [f"{token1}_buy", f"{token1}_sell", f"{token2}_buy", f"{token2}_sell"]:
+            if col not in self._performing:
+                self._performing[col] = frozenset()
+
+        return new_tokens
+
+    def _unregister_tokens(self, condition_id: str) -> List[str]:
+        tokens = self._market_tokens.pop(condition_id, None)
+        if not tokens:
+            return []
+
+        dropped = []
+        for token in tokens:
+            self._token_refs[token] -= 1
+            if self._token_refs[token] == 0:
+                del self._token_refs[token]
+                self._reverse_tokens.pop(token, None)
+                dropped.append(token)
+        return dropped
+
+    def _publish(self, all_tokens: List[str]):
+        """Rebuild the derived DataFrame and params and publish them with the token maps"""
+        rows = list(self.rows.values())
+        tokens = {
+            'all_tokens': all_tokens,
+            'reverse_tokens': self._reverse_tokens,
+            'performing': self._performing,
+        }
+        if not rows:
+            global_state.publish(df=pd.DataFrame(), market_index={}, params={}, **tokens)
+            print("⚠️  WARNING: No active markets found in database!")
+            return
+
+        df = pd.DataFrame(rows)
+        market_index = {condition_id: i for i, condition_id in enumerate(self.rows)}
+
+        # Group parameters by param_type (first market of each type wins)
+        params = {}
+        for row in rows:
+            if row['param_type'] not in params:
+                params[row['param_type']] = {
+                    'stop_loss_threshold': row['stop_loss_threshold'],
+                    'take_profit_threshold': row['take_profit_threshold'],
+                    'volatility_threshold': row['volatility_threshold'],
+                    'spread_threshold': row['spread_threshold'],
+                    'sleep_period': row['sleep_period'],
+                }
+        global_state.publish(df=df, market_index=market_index, params=params, **tokens)
@@ -0,0 +1,242 @@
+"""
+Order Store
+
+Tracks the bot's open orders keyed by order id, with a per-token, per-side
+index and cached aggregates so that get() is O(1).
+
+Updates come from two places:
+- the user websocket channel (apply_event) - one order at a time
+- periodic REST snapshots (apply_snapshot) - a single-pass diff against the
+  current contents
+"""
+from threading import Lock
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+SIDES = ('buy', 'sell')
+
+
+class OrderStore:
+    """
+    Open orders indexed by order id and by (token, side).
+
+    Each (token, side) keeps an aggregate of live size and size-weighted
+    price, recomputed only when one of its orders changes. The aggregates
+    are exposed as an immutable view that is replaced (copy-on-write) after
+    every change and passed to on_change.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[Dict[str, Mapping]], None]] = None):
+        """
+        Args:
+            on_change: Called with the new aggregate view after each change,
+                while the store lock is held so views are delivered in order
+        """
+        self._lock = Lock()
+        self._on_change = on_change
+        # order_id -> {'token', 'side', 'price', 'size'}
+        self._orders: Dict[str, Dict] = {}
+        # token -> side -> set of order ids
+        self._by_token: Dict[str, Dict[str, Set[str]]] = {}
+        # token -> side -> (price, size)
+        self._aggregates: Dict[str, Dict[str, tuple]] = {}
+        # Published copy of _aggregates, never mutated after it is built
+        self._view: Dict[str, Mapping] = {}
+        self._dirty: Set[str] = set()
+
+    # ============ Reads ============
+
+    def get(self, token) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregated live orders for a token.
+
+        Returns:
+            {'buy': {'price', 'size'}, 'sell': {'price', 'size'}} - zeros for empty sides
+        """
+        aggregates = self._view.get(str(token), {})
+        result = {}
+        for side in SIDES:
+            price, size = aggregates.get(side, (0, 0))
+            result[side] = {'price': price, 'size': size}
+        return result
+
+    def get_order_ids(self, token, side: Optional[str] = None) -> List[str]:
+        """Order ids resting on a token (optionally one side only)"""
+        with self._lock:
+            sides = self._by_token.get(str(token), {})
+            if side is not None:
+                return list(sides.get(side.lower(), ()))
+            return [oid for ids in sides.values() for oid in ids]
+
+    def tokens(self) -> List[str]:
+        """Tokens that currently have at least one live order"""
+        return list(self._view.keys())
+
+    def view(self) -> Mapping[str, Mapping]:
+        """Immutable token -> side -> (price, size) view of the aggregates"""
+        return MappingProxyType(self._view)
+
+    def __contains__(self, token) -> bool:
+        return str(token) in self._view
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __repr__(self) -> str:
+        return f"OrderStore({ {token: self.get(token) for token in self._view} })"
+
+    # ============ Writes ============
+
+    def upsert(self, order_id: str, token, side: str, price: float, size: float) -> bool:
+        """
+        Insert or update a single order. Orders with no remaining size are removed.
+
+        Returns:
+            True if the store changed
+        """
+        with self._lock:
+            changed = self._upsert(str(order_id), str(token), side.lower(), float(price), float(size))
+            self._flush()
+            return changed
+
+    def remove(self, order_id: str) -> bool:
+        """Remove an order by id. Returns True if it was present."""
+        with self._lock:
+            changed = self._remove(str(order_id))
+            self._flush()
+            return changed
+
+    def clear_token(self, token):
+        """Drop every order resting on a token"""
+        token = str(token)
+        with self._lock:
+            for side in SIDES:
+                for oid in list(self._by_token.get(token, {}).get(side, ())):
+                    self._remove(oid)
+            self._flush()
+
+    def clear(self):
+        with self._lock:
+            self._dirty.update(self._aggregates)
+            self._orders.clear()
+            self._by_token.clear()
+            self._aggregates.clear()
+            self._flush()
+
+    def apply_event(self, order_id: str, token, side: str, order_type: str,
+                    price: float, original_size: float, size_matched: float) -> bool:
+        """
+        Apply a user channel order event (PLACEMENT, UPDATE or CANCELLATION).
+
+        Returns:
+            True if the store changed
+        """
+        if order_type == 'CANCELLATION':
+            return self.remove(order_id)
+        return self.upsert(order_id, token, side, price, float(original_size) - float(size_matched))
+
+    def apply_snapshot(self, open_orders: Iterable[Dict]) -> Dict[str, Set[str]]:
+        """
+        Reconcile against a full list of open orders from the REST API.
+
+        Orders present in the snapshot are upserted, orders missing from it are
+        removed. Runs in a single pass over the snapshot plus the current store.
+
+        Args:
+            open_orders: Raw order dicts with id, asset_id, side, price,
+                original_size and size_matched
+
+        Returns:
+            {'changed': tokens whose aggregates changed,
+             'duplicated': tokens with more than one live order on a side}
+        """
+        changed: Set[str] = set()
+        with self._lock:
+            seen: Set[str] = set()
+            for row in open_orders:
+                oid = str(row['id'])
+                token = str(row['asset_id'])
+                seen.add(oid)
+                size = float(row['original_size']) - float(row['size_matched'])
+                if self._upsert(oid, token, str(row['side']).lower(), float(row['price']), size):
+                    changed.add(token)
+
+            for oid in [oid for oid in self._orders if oid not in seen]:
+                changed.add(self._orders[oid]['token'])
+                self._remove(oid)
+
+            duplicated = {
+                token for token, sides in self._by_token.items()
+                if any(len(ids) > 1 for ids in sides.values())
+            }
+            self._flush()
+
+        return {'changed': changed, 'duplicated': duplicated}
+
+    # ============ Internals (caller holds the lock) ============
+
+    def _upsert(self, oid: str, token: str, side: str, price: float, size: float) -> bool:
+        if size <= 0:
+            return self._remove(oid)
+
+        existing = self._orders.get(oid)
+        if existing is not None:
+            if (existing['token'], existing['side'], existing['price'], existing['size']) == (token, side, price, size):
+                return False
+            if existing['token'] != token or existing['side'] != side:
+                self._remove(oid)
+
+        self._orders[oid] = {'token': token, 'side': side, 'price': price, 'size': size}
+        self._by_token.setdefault(token, {}).setdefault(side, set()).add(oid)
+        self._recompute(token, side)
+        return True
+
+    def _remove(self, oid: str) -> bool:
+        order = self._orders.pop(oid, None)
+        if order is None:
+            return False
+
+        token, side = order['token'], order['side']
+        ids = self._by_token.get(token, {}).get(side)
+        if ids is not None:
+            ids.discard(oid)
+            if not ids:
+                del self._by_token[token][side]
+            if not self._by_token[token]:
+                del self._by_token[token]
+        self._recompute(token, side)
+        return True
+
+    def _flush(self):
+        """Publish a new aggregate view if anything changed"""
+        if not self._dirty:
+            return
+        view = dict(self._view)
+        for token in self._dirty:
+            if token in self._aggregates:
+                view[token] = MappingProxyType(dict(self._aggregates[token]))
+            else:
+                view.pop(token, None)
+        self._dirty = set()
+        self._view = view
+        if self._on_change is not None:
+            self._on_change(view)
+
+    def _recompute(self, token: str, side: str):
+        self._dirty.add(token)
+        ids = self._by_token.get(token, {}).get(side)
+        if not ids:
+            sides = self._aggregates.get(token)
+            if sides is not None:
+                sides.pop(side, None)
+                if not sides:
+                    del self._aggregates[token]
+            return
+
+        total_size = 0.0
+        notional = 0.0
+        for oid in ids:
+            order = self._orders[oid]
+            total_size += order['size']
+            notional += order['price'] * order['size']
+        self._aggregates.setdefault(token, {})[side] = (notional / total_size, total_size)
@@ -740,20 +740,31 @@ class PolymarketClient:
 
         return raw_position, shares
     
-    def get_all_orders(self) -> pd.DataFrame:
+    def get_open_orders(self) -> List[Dict[str, Any]]:
         """
-        Get all open orders for the connected wallet.
+        Get all open orders for the connected wallet as raw dicts.
         
         Returns:
-            DataFrame: All open orders with their details
+            list: Open orders as returned by the CLOB API (numeric fields are strings)
         """
         # Apply rate limiting for CLOB Ledger /orders endpoint (300 requests / 10s)
         rate_limiter = get_rate_limiter()
         rate_limiter.wait_if_needed_sync('clob_ledger')
         
-        orders_df = pd.DataFrame(self.client.get_orders())
+        orders = self.client.get_orders()
         rate_limiter.record_request('clob_ledger')
 
+        return orders
+
+    def get_all_orders(self) -> pd.DataFrame:
+        """
+        Get all open orders for the connected wallet.
+        
+        Returns:
+            DataFrame: All open orders with their details
+        """
+        orders_df = pd.DataFrame(self.get_open_orders())
+
         # Convert numeric columns to float
         for col in ['original_size', 'size_matched', 'price']:
             if col in orders_df.columns:
@@ -0,0 +1,206 @@
+"""
+Position Sync Engine
+
+Reconciles global_state.positions with the Data API /positions endpoint.
+
+Instead of rebuilding every position from a DataFrame each cycle, the engine:
+- pages through the wallet's positions (concurrently in the async path)
+- hashes the raw response and skips the cycle when nothing changed
+- diffs each asset against local state and only writes the ones that moved
+- records which assets changed so only their markets need requoting
+"""
+import asyncio
+import hashlib
+import json
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Set
+
+import requests
+
+import poly_data.global_state as global_state
+from poly_data.api_constants import DATA_API_ENDPOINT
+from poly_data.rate_limiter import get_rate_limiter
+
+# Skip size updates for assets traded locally within this many seconds,
+# the Data API lags behind the user websocket
+RECENT_TRADE_SECONDS = 5
+
+
+class PositionSyncEngine:
+    """
+    Delta-based position synchronization against the Data API.
+
+    Fetching and applying are separate so the async synchronizer can fetch
+    off the loop and apply on it.
+    """
+
+    def __init__(self, page_size: int = 500, max_concurrency: int = 4, max_pages: int = 50):
+        """
+        Args:
+            page_size: Positions per request (Data API maximum is 500)
+            max_concurrency: Pages fetched at once when a wallet spans several pages
+            max_pages: Hard cap on pages per sync
+        """
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.max_pages = max_pages
+        self._lock = Lock()
+        self._http = requests.Session()
+        self._last_digest: Optional[str] = None
+        self._last_sync = 0.0
+        # Assets whose size update was held back by pending trades
+        self._deferred: Set[str] = set()
+        # asset -> condition_id for assets changed by the last sync
+        self.last_changed: Dict[str, str] = {}
+        self.stats = {'syncs': 0, 'skipped': 0, 'changed_assets': 0}
+
+    # ============ Fetching ============
+
+    def _params(self, page: int) -> Dict:
+        return {
+            'user': global_state.client.browser_wallet,
+            'limit': self.page_size,
+            'offset': page * self.page_size,
+        }
+
+    def fetch_pages(self) -> List[bytes]:
+        """Fetch every page of positions with blocking requests"""
+        rate_limiter = get_rate_limiter()
+        pages = []
+        for page in range(self.max_pages):
+            rate_limiter.wait_if_needed_sync('data_api_general')
+            res = self._http.get(f'{DATA_API_ENDPOINT}/positions', params=self._params(page), timeout=10)
+            rate_limiter.record_request('data_api_general')
+            res.raise_for_status()
+            pages.append(res.content)
+            if len(json.loads(res.content)) < self.page_size:
+                break
+        return pages
+
+    async def fetch_pages_async(self, session) -> List[bytes]:
+        """
+        Fetch every page of positions over an aiohttp session.
+
+        The first page is fetched alone. If it is full, following pages are
+        fetched max_concurrency at a time until a short page comes back.
+        """
+        rate_limiter = get_rate_limiter()
+
+        async def fetch(page: int) -> bytes:
+            await rate_limiter.wait_if_needed('data_api_general')
+            async with session.get(f'{DATA_API_ENDPOINT}/positions', params=self._params(page)) as res:
+                rate_limiter.record_request('data_api_general')
+                res.raise_for_status()
+                return await res.read()
+
+        pages = [await fetch(0)]
+        next_page = 1
+        while len(json.loads(pages[-1])) >= self.page_size and next_page < self.max_pages:
+            batch = range(next_page, min(next_page + self.max_concurrency, self.max_pages))
+            results = await asyncio.gather(*(fetch(page) for page in batch))
+            for body in results:
+                pages.append(body)
+                if len(json.loads(body)) < self.page_size:
+                    return pages
+            next_page = batch.stop
+        return pages
+
+    # ============ Applying ============
+
+    def sync(self, pages: List[bytes], avgOnly: bool = False, force: bool = False) -> Dict[str, str]:
+        """
+        Apply fetched pages and publish the new positions to global_state.
+
+        Args:
+            pages: Raw response bodies from fetch_pages / fetch_pages_async
+            avgOnly: Don't overwrite sizes of assets with pending or very recent trades
+            force: Apply even if the response is identical to the previous one
+
+        Returns:
+            dict: asset -> condition_id for every asset whose position changed
+        """
+        digest = hashlib.blake2b(b''.join(pages), digest_size=16).hexdigest()
+
+        with self._lock:
+            self.stats['syncs'] += 1
+            now = time.time()
+            locally_touched = any(ts >= self._last_sync for ts in global_state.last_trade_update.values())
+
+            if not force and digest == self._last_digest and not self._deferred and not locally_touched:
+                self.stats['skipped'] += 1
+                self.last_changed = {}
+                return {}
+
+            rows = {}
+            for body in pages:
+                for row in json.loads(body):
+                    rows[str(row['asset'])] = row
+
+            deferred: Set[str] = set()
+            changed: Dict[str, str] = {}
+            state = global_state.snapshot()
+            positions = dict(state.positions)
+
+            # Only assets in the response are applied: the Data API leaves out dust
+            # positions and can lag behind fills, so a missing asset is not a closed one
+            for asset, row in rows.items():
+                if self._apply_asset(positions, state.performing, asset, float(row['size']),
+                                     float(row['avgPrice']), avgOnly, now, deferred):
+                    changed[asset] = row.get('conditionId', '')
+
+            if changed:
+                global_state.publish(positions=positions)
+
+            self._deferred = deferred
+            self._last_digest = digest
+            self._last_sync = now
+            self.last_changed = changed
+            self.stats['changed_assets'] += len(changed)
+            return changed
+
+    def _apply_asset(self, positions: Dict[str, Dict], performing, asset: str, size: float,
+                     avg_price: float, avgOnly: bool, now: float, deferred: Set[str]) -> bool:
+        current = positions.get(asset)
+        position = dict(current) if current else {'size': 0, 'avgPrice': 0}
+        position['avgPrice'] = avg_price
+
+        if not avgOnly:
+            position['size'] = size
+        elif position['size'] != size:
+            pending = [col for col in (f"{asset}_sell", f"{asset}_buy")
+                       if performing.get(col)]
+            if pending:
+                print(f"ALERT: Skipping update for {asset} because there are trades pending for {pending}")
+                deferred.add(asset)
+            elif now - global_state.last_trade_update.get(asset, 0) < RECENT_TRADE_SECONDS:
+                print(f"Skipping update for {asset} because last trade update was less than {RECENT_TRADE_SECONDS} seconds ago")
+                deferred.add(asset)
+            else:
+                print(f"No trades are pending. Updating position from {position['size']} to {size} and avgPrice to {avg_price} using API")
+                position['size'] = size
+
+        if position == current:
+            return False
+        positions[asset] = position
+        return True
+
+
+# Global singleton instance
+_engine_instance: Optional[PositionSyncEngine] = None
+_engine_lock = Lock()
+
+
+def get_position_sync_engine() -> PositionSyncEngine:
+    """
+    Get the global PositionSyncEngine instance (singleton pattern).
+
+    Returns:
+        PositionSyncEngine instance
+    """
+    global _engine_instance
+    if _engine_instance is None:
+        with _engine_lock:
+            if _engine_instance is None:
+                _engine_instance = PositionSyncEngine()
+    return _engine_instance
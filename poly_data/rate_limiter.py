@@ -168,6 +168,58 @@ class RateLimiter:
             logger.debug(f"Rate limit: waiting {wait_time:.2f}s for {endpoint}")
             time.sleep(wait_time)
     
+    def _try_reserve(self, endpoint: str) -> Optional[float]:
+        """
+        Record a request now if the window has room.
+        Returns None when reserved, otherwise the seconds to wait before retrying.
+        """
+        limit_config = self._rate_limits.get(endpoint)
+        if limit_config is None:
+            return None
+
+        self._clean_old_requests(endpoint, limit_config['window_seconds'])
+        with self._locks[endpoint]:
+            request_times = self._request_times[endpoint]
+            if len(request_times) < limit_config['requests']:
+                request_times.append(time.time())
+                return None
+            wait_time = (request_times[0] + limit_config['window_seconds']) - time.time()
+            return max(0.01, wait_time + 0.1)
+
+    async def acquire(self, endpoint: str):
+        """
+        Wait for and reserve one request slot without blocking the event loop.
+
+        Unlike wait_if_needed() + record_request(), the check and the record
+        happen under one lock, so many concurrent tasks cannot all see the
+        same free slot and burst past the limit. Do not call record_request()
+        afterwards.
+
+        Args:
+            endpoint: The endpoint identifier (e.g., 'gamma_events')
+        """
+        while True:
+            wait_time = self._try_reserve(endpoint)
+            if wait_time is None:
+                return
+            logger.debug(f"Rate limit: waiting {wait_time:.2f}s for {endpoint}")
+            await asyncio.sleep(wait_time)
+
+    def acquire_sync(self, endpoint: str):
+        """
+        Synchronous version of acquire(), for worker threads sharing one budget.
+        Do not call record_request() afterwards.
+
+        Args:
+            endpoint: The endpoint identifier (e.g., 'clob_price_history')
+        """
+        while True:
+            wait_time = self._try_reserve(endpoint)
+            if wait_time is None:
+                return
+            logger.debug(f"Rate limit: waiting {wait_time:.2f}s for {endpoint}")
+            time.sleep(wait_time)
+
     def record_request(self, endpoint: str):
         """
         Record that a request was made to the given endpoint.
@@ -0,0 +1,236 @@
+"""
+Periodic State Synchronizer
+
+Runs the bot's periodic sync jobs (positions, orders, market config, stale
+trade cleanup) as asyncio tasks on the main event loop instead of a
+background thread.
+
+Each job has its own jittered interval and is split into two halves:
+- fetch: does the I/O (pooled aiohttp session, or a worker thread for
+  blocking SDK/DB calls) and returns the raw result
+- apply: mutates global_state with that result
+
+Apply always runs on the loop thread, so websocket handlers and
+perform_trade never observe a half-updated positions or orders dict.
+"""
+import asyncio
+import random
+import traceback
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import aiohttp
+
+import poly_data.global_state as global_state
+from poly_data.data_utils import apply_orders
+from poly_data.position_sync import get_position_sync_engine
+
+# Fire-and-forget tasks started by apply steps. The loop only keeps weak
+# references to tasks, so they are held here until they finish.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def spawn(coro: Awaitable, description: str) -> asyncio.Task:
+    """
+    Start a background task on the running loop, keep a reference to it until
+    it finishes and log it if it fails.
+
+    Args:
+        coro: Coroutine (or awaitable) to run
+        description: What the task does, for the error message
+    """
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+
+    def done(finished: asyncio.Task):
+        _background_tasks.discard(finished)
+        if finished.cancelled():
+            return
+        error = finished.exception()
+        if error is not None:
+            print(f"Error in background task ({description}): {error!r}")
+            print(''.join(traceback.format_exception(type(error), error, error.__traceback__)))
+
+    task.add_done_callback(done)
+    return task
+
+
+class SyncJob:
+    """A periodic fetch/apply pair with its own interval"""
+
+    def __init__(self, name: str, interval: float,
+                 fetch: Callable[[], Awaitable[Any]],
+                 apply: Optional[Callable[[Any], Any]] = None,
+                 jitter: float = 0.1):
+        self.name = name
+        self.interval = interval
+        self.fetch = fetch
+        self.apply = apply
+        self.jitter = jitter
+        self.runs = 0
+        self.errors = 0
+        self.last_duration: Optional[float] = None
+
+    def next_delay(self) -> float:
+        """Interval with +/- jitter so jobs don't hit the APIs in lockstep"""
+        spread = self.interval * self.jitter
+        return max(0.0, self.interval + random.uniform(-spread, spread))
+
+
+class PeriodicSyncScheduler:
+    """
+    Runs SyncJobs concurrently on the current event loop.
+
+    Jobs are independent: a slow orders fetch does not delay the positions
+    sync, and an exception in one job is logged without stopping the others.
+    """
+
+    def __init__(self, max_connections: int = 10, request_timeout: float = 10.0):
+        self._jobs: List[SyncJob] = []
+        self._tasks: List[asyncio.Task] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._max_connections = max_connections
+        self._request_timeout = request_timeout
+
+    def add_job(self, name: str, interval: float,
+                fetch: Callable[[], Awaitable[Any]],
+                apply: Optional[Callable[[Any], Any]] = None,
+                jitter: float = 0.1) -> SyncJob:
+        """Register a job. Must be called before start()."""
+        job = SyncJob(name, interval, fetch, apply, jitter)
+        self._jobs.append(job)
+        return job
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive HTTP session used by all jobs"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_connections, keepalive_timeout=60)
+            timeout = aiohttp.ClientTimeout(total=self._request_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def start(self):
+        """Start one task per job on the running loop"""
+        if self._tasks:
+            return
+        for job in self._jobs:
+            self._tasks.append(asyncio.create_task(self._run_job(job), name=f"sync:{job.name}"))
+        print("✅ Sync scheduler started: " + ", ".join(f"{j.name}={j.interval}s" for j in self._jobs))
+
+    async def stop(self):
+        """Cancel all job tasks and close the HTTP session"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def run_once(self, name: str):
+        """Run a single job immediately (used for the initial sync)"""
+        for job in self._jobs:
+            if job.name == name:
+                await self._execute(job)
+                return
+        raise KeyError(name)
+
+    async def _execute(self, job: SyncJob):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await job.fetch()
+        # Back on the loop thread: safe to mutate global_state
+        if job.apply is not None:
+            job.apply(result)
+        job.runs += 1
+        job.last_duration = loop.time() - started
+
+    async def _run_job(self, job: SyncJob):
+        while True:
+            await asyncio.sleep(job.next_delay())
+            try:
+                await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                job.errors += 1
+                print(f"Error in sync job {job.name}")
+                print(traceback.format_exc())
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-job run counters for diagnostics"""
+        return {
+            job.name: {
+                'interval': job.interval,
+                'runs': job.runs,
+                'errors': job.errors,
+                'last_duration': job.last_duration,
+            }
+            for job in self._jobs
+        }
+
+
+async def fetch_positions(scheduler: PeriodicSyncScheduler) -> List[bytes]:
+    """Fetch all position pages from the Data API over the scheduler's pooled session"""
+    session = await scheduler.get_session()
+    return await get_position_sync_engine().fetch_pages_async(session)
+
+
+def apply_positions_and_requote(pages: List[bytes]):
+    """
+    Apply position pages and requote only the markets whose positions changed.
+    Sizes with pending or very recent trades are left alone, as the old thread did.
+    """
+    changed = get_position_sync_engine().sync(pages, avgOnly=True)
+    markets = {condition_id for asset, condition_id in changed.items()
+               if condition_id and asset in global_state.REVERSE_TOKENS}
+    if not markets:
+        return
+
+    # Imported lazily: trading pulls in the full bot configuration
+    from trading import perform_trade
+    for market in markets:
+        spawn(perform_trade(market), f"requote {market}")
+
+
+async def fetch_orders() -> List[Dict]:
+    """Fetch open orders (the CLOB SDK is blocking, so run it in a worker thread)"""
+    return await asyncio.to_thread(global_state.client.get_open_orders)
+
+
+def add_default_jobs(scheduler: PeriodicSyncScheduler,
+                     load_markets: Callable[[], Any],
+                     apply_markets: Callable[[Any], Any],
+                     remove_stale: Callable[[], Any],
+                     positions_interval: float = 5.0,
+                     orders_interval: float = 5.0,
+                     markets_interval: float = 30.0,
+                     pending_interval: float = 5.0):
+    """
+    Register the standard bot sync jobs.
+
+    Args:
+        load_markets: Blocking DB read returning market state (runs in a worker thread)
+        apply_markets: Applies the result of load_markets to global_state
+        remove_stale: Clears stale entries from global_state.performing
+    """
+    async def positions():
+        return await fetch_positions(scheduler)
+
+    async def orders():
+        return await fetch_orders()
+
+    def apply_orders_and_cancel(all_orders):
+        for token in apply_orders(all_orders):
+            spawn(asyncio.to_thread(global_state.client.cancel_all_asset, token), f"cancel orders for {token}")
+
+    async def markets():
+        return await asyncio.to_thread(load_markets)
+
+    async def pending():
+        return None
+
+    scheduler.add_job('pending', pending_interval, pending, lambda _: remove_stale())
+    scheduler.add_job('positions', positions_interval, positions, apply_positions_and_requote)
+    scheduler.add_job('orders', orders_interval, orders, apply_orders_and_cancel)
+    scheduler.add_job('markets', markets_interval, markets, apply_markets)
+    return scheduler
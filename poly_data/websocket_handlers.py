@@ -6,6 +6,35 @@ import traceback                   # Exception handling
 from poly_data.data_processing import process_data, process_user_data
 import poly_data.global_state as global_state
 
+# Currently open market websocket, used to change subscriptions without reconnecting
+_market_websocket = None
+
+async def update_market_subscription(subscribe, unsubscribe):
+    """
+    Subscribe/unsubscribe tokens on the open market websocket.
+
+    If no market websocket is connected the change is picked up on the next
+    connect, which always subscribes to the current global_state.all_tokens.
+
+    Args:
+        subscribe (list): Token IDs to start receiving updates for
+        unsubscribe (list): Token IDs to stop receiving updates for
+    """
+    websocket = _market_websocket
+    if websocket is None:
+        return
+
+    try:
+        # Market channel dynamic subscription format: {"assets_ids": [...], "operation": "subscribe" | "unsubscribe"}
+        if subscribe:
+            await websocket.send(json.dumps({"assets_ids": list(subscribe), "operation": "subscribe"}))
+            print(f"✅ Subscribed to {len(subscribe)} new tokens")
+        if unsubscribe:
+            await websocket.send(json.dumps({"assets_ids": list(unsubscribe), "operation": "unsubscribe"}))
+            print(f"✅ Unsubscribed from {len(unsubscribe)} tokens")
+    except Exception as e:
+        print(f"⚠️  Error updating market subscription: {e}")
+
 async def connect_market_websocket(chunk):
     """
     Connect to Polymarket's market WebSocket API and process market updates.
@@ -22,6 +51,7 @@ async def connect_market_websocket(chunk):
         If the connection is lost, the function will exit and the main loop will
         attempt to reconnect after a short delay.
     """
+    global _market_websocket
     from poly_data.api_constants import WSS_MARKET_ENDPOINT
     uri = WSS_MARKET_ENDPOINT
     async with websockets.connect(
@@ -63,6 +93,7 @@ async def connect_market_websocket(chunk):
                     break
         
         ping_task_handle = asyncio.create_task(ping_task())
+        _market_websocket = websocket
 
         try:
             # Process incoming market data indefinitely
@@ -112,6 +143,7 @@ async def connect_market_websocket(chunk):
             print(f"Exception in market websocket: {e}")
             print(traceback.format_exc())
         finally:
+            _market_websocket = None
             # Cancel ping task
             ping_task_handle.cancel()
             try:
@@ -0,0 +1,98 @@
+"""
+Tests for the wallet balance cache (TTL, single flight, stale-while-revalidate).
+"""
+import asyncio
+import sys
+import os
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.balance_cache import BalanceCache, get_wallet_balances
+
+
+class FakeClient:
+    """Blocking balance reads that count upstream calls"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = {'usdc': 0, 'positions': 0}
+        self.usdc = 100.0
+        self.fail = False
+
+    def get_usdc_balance(self):
+        self.calls['usdc'] += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("RPC node unavailable")
+        return self.usdc
+
+    def get_pos_balance(self):
+        self.calls['positions'] += 1
+        time.sleep(self.delay)
+        return 25.0
+
+
+def test_concurrent_requests_share_one_upstream_call():
+    client = FakeClient()
+    cache = BalanceCache(ttl=10, max_stale=60)
+
+    async def run():
+        first = await asyncio.gather(*[get_wallet_balances(client, cache) for _ in range(10)])
+        second = await get_wallet_balances(client, cache)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert client.calls == {'usdc': 1, 'positions': 1}
+    assert all(result['usdc_balance'] == 100.0 and result['positions_value'] == 25.0 for result in first)
+    assert second['stale'] is False and second['cache_age'] < 10
+    assert cache.stats['misses'] == 20 and cache.stats['fetches'] == 2
+
+
+def test_stale_value_is_served_while_refreshing():
+    client = FakeClient(delay=0.3)
+    cache = BalanceCache(ttl=1.0, max_stale=60)
+
+    async def run():
+        await cache.get('usdc_balance', client.get_usdc_balance)
+        await asyncio.sleep(1.05)
+        client.usdc = 200.0
+
+        # Expired: the old value comes back at once, one refresh runs behind it
+        start = time.time()
+        stale = await asyncio.gather(*[cache.get('usdc_balance', client.get_usdc_balance) for _ in range(5)])
+        served_in = time.time() - start
+        await asyncio.sleep(client.delay * 1.5)
+        fresh = await cache.get('usdc_balance', client.get_usdc_balance)
+        return stale, served_in, fresh
+
+    stale, served_in, fresh = asyncio.run(run())
+    assert all(entry.stale and entry.value == 100.0 and entry.age >= 1.0 for entry in stale)
+    assert served_in < client.delay
+    assert fresh.value == 200.0 and not fresh.stale
+    assert client.calls['usdc'] == 2
+
+
+def test_failed_refresh_falls_back_to_recent_value():
+    client = FakeClient(delay=0)
+    cache = BalanceCache(ttl=0, max_stale=60)
+
+    async def run():
+        await cache.get('usdc_balance', client.get_usdc_balance)
+        client.fail = True
+        await asyncio.sleep(0.01)
+        # The background refresh fails; the last value keeps being served
+        first = await cache.get('usdc_balance', client.get_usdc_balance)
+        await asyncio.sleep(0.01)
+        return first, await cache.get('usdc_balance', client.get_usdc_balance)
+
+    first, second = asyncio.run(run())
+    assert first.value == second.value == 100.0 and second.stale
+    assert cache.stats['errors'] >= 1
+
+    # Nothing recent to fall back to: the error reaches the caller
+    with pytest.raises(ConnectionError):
+        asyncio.run(BalanceCache(ttl=0, max_stale=0).get('usdc_balance', client.get_usdc_balance))
@@ -0,0 +1,97 @@
+"""
+Tests for the set-based bulk update and delete market endpoints.
+"""
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import (SessionLocal, AsyncSessionLocal, async_engine, Market, TradingParams,
+                      Position, Order, init_db)
+from schemas import BulkMarketUpdate, BulkMarketDelete
+from api.markets import bulk_update_markets, bulk_delete_markets
+from services.market_mapping_service import get_market_mapper
+
+PREFIX = "bulk_test_"
+
+
+def _call(endpoint, **kwargs):
+    """Run an async endpoint with its own async session"""
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await endpoint(db=db, **kwargs)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def market_ids():
+    """Two markets, each with trading params, a position and an order"""
+    init_db()
+    db = SessionLocal()
+    ids = []
+    for n in range(2):
+        market = Market(condition_id=f"{PREFIX}{n}", question="Bulk?", answer1='YES', answer2='NO',
+                        token1=f"77700{n}1", token2=f"77700{n}2")
+        market.trading_params = TradingParams()
+        db.add(market)
+        db.flush()
+        db.add(Position(market_id=market.id, token_id=market.token1, size=5.0, avg_price=0.5))
+        db.add(Order(market_id=market.id, order_id=f"{PREFIX}order{n}", token_id=market.token1,
+                     side_type='BUY', price=0.4, size=5.0))
+        ids.append(market.id)
+    db.commit()
+    try:
+        yield ids
+    finally:
+        for model in (Position, Order, TradingParams):
+            db.query(model).filter(model.market_id.in_(ids)).delete(synchronize_session=False)
+        db.query(Market).filter(Market.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+class TestBulkMarketEndpoints:
+    """Tests for /bulk/update and /bulk/delete"""
+
+    def test_bulk_update(self, market_ids):
+        mapper = get_market_mapper()
+        assert mapper.get_market_by_condition_id(f"{PREFIX}0").is_active
+
+        result = _call(bulk_update_markets, bulk_update=BulkMarketUpdate(
+            market_ids=market_ids + [-1], is_active=False, side_to_trade='YES'))
+
+        assert result['updated_count'] == 2
+        db = SessionLocal()
+        try:
+            markets = db.query(Market).filter(Market.id.in_(market_ids)).all()
+            assert all(not m.is_active and m.side_to_trade == 'YES' for m in markets)
+        finally:
+            db.close()
+        # The cached lookup was invalidated, not served stale
+        assert not mapper.get_market_by_condition_id(f"{PREFIX}0").is_active
+
+    def test_bulk_delete_removes_children(self, market_ids):
+        result = _call(bulk_delete_markets, bulk_delete=BulkMarketDelete(market_ids=market_ids))
+
+        assert result['deleted_count'] == 2
+        db = SessionLocal()
+        try:
+            assert db.query(Market).filter(Market.id.in_(market_ids)).count() == 0
+            for model in (TradingParams, Position, Order):
+                assert db.query(model).filter(model.market_id.in_(market_ids)).count() == 0
+        finally:
+            db.close()
+        assert get_market_mapper().get_market_by_token_id("777001") is None
+
+    def test_unknown_ids_return_404(self):
+        init_db()
+        with pytest.raises(Exception) as exc_info:
+            _call(bulk_delete_markets, bulk_delete=BulkMarketDelete(market_ids=[-1, -2]))
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,78 @@
+"""
+Tests for the market change log shared by the backend API and the bot.
+"""
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal, Market, TradingParams, MarketChange, init_db
+from schemas import TradingParamsUpdate
+from api.markets import update_market_config, delete_market
+from services.change_bus import MarketChangeSubscriber, record_market_changes
+
+
+@pytest.fixture
+def market():
+    init_db()
+    db = SessionLocal()
+    market = Market(condition_id="change_bus_test", question="Bus?", answer1='YES', answer2='NO',
+                    token1="4440001", token2="4440002")
+    market.trading_params = TradingParams()
+    db.add(market)
+    db.commit()
+    market_id = market.id
+    db.close()
+    yield market_id
+    db = SessionLocal()
+    db.query(TradingParams).filter(TradingParams.market_id == market_id).delete()
+    db.query(Market).filter(Market.id == market_id).delete()
+    db.query(MarketChange).filter(MarketChange.market_id == market_id).delete()
+    db.commit()
+    db.close()
+
+
+def _call(endpoint, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return asyncio.run(endpoint(*args, db=db, **kwargs))
+    finally:
+        db.close()
+
+
+class TestMarketChangeBus:
+    """Tests for change events recorded by the markets API"""
+
+    def test_config_update_is_published(self, market):
+        subscriber = MarketChangeSubscriber()
+
+        _call(update_market_config, market, TradingParamsUpdate(trade_size=12.0))
+
+        changes = subscriber.poll()
+        assert [(c.market_id, c.kind, c.token1, c.token2) for c in changes] == \
+            [(market, 'config', '4440001', '4440002')]
+        assert subscriber.poll() == []
+
+    def test_delete_is_published(self, market):
+        subscriber = MarketChangeSubscriber()
+
+        _call(delete_market, market)
+
+        changes = subscriber.poll()
+        assert [(c.condition_id, c.kind) for c in changes] == [("change_bus_test", 'deleted')]
+
+    def test_events_roll_back_with_the_edit(self, market):
+        """Events are written in the caller's transaction"""
+        subscriber = MarketChangeSubscriber()
+        db = SessionLocal()
+        try:
+            record_market_changes(db, [db.get(Market, market)])
+            db.rollback()
+        finally:
+            db.close()
+
+        assert subscriber.poll() == []
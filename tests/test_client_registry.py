@@ -0,0 +1,103 @@
+"""
+Tests for the shared, lazily initialized Polymarket client registry.
+"""
+import asyncio
+import sys
+import os
+import time
+from threading import Event, Thread
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.client_registry import ClientRegistry, ClientInitializing
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("PK", "0x" + "1" * 64)
+    monkeypatch.setenv("BROWSER_ADDRESS", "0x" + "2" * 40)
+
+
+class SlowFactory:
+    """Counts constructions; each one blocks until released"""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.release = Event()
+        self.fail = fail
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise ValueError("Failed to set up API credentials: timeout")
+        return object()
+
+
+def test_concurrent_requests_share_one_initialization():
+    factory = SlowFactory()
+    registry = ClientRegistry(factory=factory)
+    assert registry.status()['state'] == 'idle'
+
+    registry.start()
+    assert registry.status()['state'] == 'initializing'
+
+    results = []
+    threads = [Thread(target=lambda: results.append(registry.get(timeout=5))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    factory.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert factory.calls == 1
+    assert len(results) == 8 and len({id(client) for client in results}) == 1
+    assert asyncio.run(registry.get_async()) is results[0]
+
+    status = registry.status()
+    assert status['state'] == 'ready' and status['ready'] and status['attempts'] == 1
+
+
+def test_requests_do_not_wait_past_timeout():
+    factory = SlowFactory()
+    registry = ClientRegistry(factory=factory)
+    with pytest.raises(ClientInitializing):
+        registry.get(timeout=0)
+    factory.release.set()
+    assert registry.get(timeout=5) is not None
+    assert factory.calls == 1
+
+
+def test_failed_initialization_is_retried_after_interval():
+    factory = SlowFactory(fail=True)
+    factory.release.set()
+    registry = ClientRegistry(factory=factory, retry_interval=0.2)
+
+    with pytest.raises(ValueError, match="API credentials"):
+        registry.get(timeout=5)
+    # Within the retry interval the cached error is returned without a new attempt
+    with pytest.raises(ValueError, match="API credentials"):
+        registry.get(timeout=5)
+    assert factory.calls == 1
+    assert registry.status()['state'] == 'failed'
+
+    time.sleep(0.25)
+    factory.fail = False
+    assert registry.get(timeout=5) is not None
+    assert factory.calls == 2
+
+
+def test_missing_credentials(monkeypatch):
+    monkeypatch.setenv("PK", "your_private_key_here")
+    factory = SlowFactory()
+    registry = ClientRegistry(factory=factory)
+
+    assert registry.start() is None
+    with pytest.raises(ValueError, match="PK"):
+        registry.get()
+    assert factory.calls == 0
+    assert registry.status()['state'] == 'unconfigured'
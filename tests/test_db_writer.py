@@ -0,0 +1,80 @@
+"""
+Tests for the SQLite engine profile and the write-behind batch writer.
+"""
+import sys
+import os
+
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal, Position, Order, engine, init_db
+from poly_data.db_writer import WriteBehindWriter
+
+TOKEN = "writer_test_token"
+ORDER_ID = "writer_test_order"
+
+
+@pytest.fixture
+def db_session():
+    """Database session that removes the rows written by these tests"""
+    init_db()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.query(Position).filter(Position.token_id == TOKEN).delete()
+        db.query(Order).filter(Order.order_id == ORDER_ID).delete()
+        db.commit()
+        db.close()
+
+
+def test_sqlite_pragmas_applied():
+    """Pooled connections use WAL and NORMAL sync"""
+    if engine.dialect.name != 'sqlite':
+        pytest.skip("SQLite only")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == 'wal'
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+
+class TestWriteBehindWriter:
+    """Tests for WriteBehindWriter"""
+
+    def test_writes_are_coalesced(self, db_session):
+        """Several updates to one position become a single row write"""
+        writer = WriteBehindWriter(flush_interval=60)
+        writer.queue_position(TOKEN, 1.0, 0.5, side='YES')
+        writer.queue_position(TOKEN, 3.0, 0.45)
+
+        assert writer.pending() == 1
+        assert writer.flush() == 1
+
+        position = db_session.query(Position).filter(Position.token_id == TOKEN).one()
+        assert (position.size, position.avg_price, position.side) == (3.0, 0.45, 'YES')
+        writer.stop()
+
+    def test_order_update_keeps_original_fields(self, db_session):
+        """An existing order only has its status and filled size updated"""
+        writer = WriteBehindWriter(flush_interval=60)
+        writer.queue_order(ORDER_ID, TOKEN, 'BUY', 0.4, 10.0)
+        writer.flush()
+
+        writer.queue_order(ORDER_ID, TOKEN, 'BUY', 0.9, 4.0, status='FILLED')
+        writer.flush()
+
+        order = db_session.query(Order).filter(Order.order_id == ORDER_ID).one()
+        assert (order.price, order.size, order.filled_size, order.status) == (0.4, 10.0, 4.0, 'FILLED')
+        writer.stop()
+
+    def test_stop_flushes_pending(self, db_session):
+        """Stopping the writer commits whatever is still queued"""
+        writer = WriteBehindWriter(flush_interval=60)
+        writer.queue_position(TOKEN, 2.0, 0.3)
+
+        writer.stop()
+
+        assert writer.pending() == 0
+        assert db_session.query(Position).filter(Position.token_id == TOKEN).count() == 1
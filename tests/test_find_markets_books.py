@@ -0,0 +1,140 @@
+"""
+Tests for the batched /books order book fetch in the reward scan.
+"""
+import sys
+import os
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from data_updater import find_markets
+
+USDC = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'
+
+
+@dataclass
+class OrderSummary:
+    """Shape of py_clob_client's book levels"""
+    price: str
+    size: str
+
+
+def _book(rng, token_id):
+    """A CLOB-style book: bids ascending and asks descending, best level last"""
+    mid = rng.randint(20, 80) / 100
+    bids = [{'price': f"{mid - i / 100:.2f}", 'size': str(rng.randint(1, 500))} for i in range(8, 0, -1)]
+    asks = [{'price': f"{mid + i / 100:.2f}", 'size': str(rng.randint(1, 500))} for i in range(8, 0, -1)]
+    if token_id.endswith('7'):
+        asks = []
+    return {'asset_id': token_id, 'bids': bids, 'asks': asks}
+
+
+def _markets(count, rng):
+    rows = []
+    for i in range(count):
+        rows.append({
+            'question': f"Market {i}?",
+            'neg_risk': False,
+            'tokens': [{'token_id': f"{1000 + i}", 'outcome': 'Yes'}, {'token_id': f"{5000 + i}", 'outcome': 'No'}],
+            'rewards': {'min_size': 50, 'max_spread': rng.choice([3, 3.5, 4.5]),
+                        'rates': [{'asset_address': USDC, 'rewards_daily_rate': rng.choice([10, 25, 100])}]},
+            'minimum_tick_size': 0.01,
+            'end_date_iso': '2026-01-01',
+            'market_slug': f"market-{i}",
+            'condition_id': f"0x{i:04x}",
+        })
+    return pd.DataFrame(rows)
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def test_batched_scan_matches_per_market_books(monkeypatch):
+    rng = random.Random(3)
+    all_df = _markets(250, rng)
+    books = {str(1000 + i): _book(rng, str(1000 + i)) for i in range(250)}
+    # One market has no order book at all
+    del books['1100']
+
+    posts = []
+
+    def fake_post(url, json=None, timeout=None):
+        assert url == find_markets.CLOB_BOOKS_URL
+        posts.append(len(json))
+        return FakeResponse([books[item['token_id']] for item in json if item['token_id'] in books])
+
+    monkeypatch.setattr(find_markets.requests, 'post', fake_post)
+
+    class Client:
+        """Per-market order book lookups, as the scan did before"""
+        def get_order_book(self, token_id):
+            book = books[token_id]
+            return SimpleNamespace(
+                bids=[OrderSummary(**level) for level in book['bids']],
+                asks=[OrderSummary(**level) for level in book['asks']],
+            )
+
+    client = Client()
+    results = find_markets.get_all_results(all_df, client, chunk_size=100)
+
+    assert sorted(posts) == [50, 100, 100]
+    assert len(results) == 249
+
+    by_token = {result['token1']: result for result in results}
+    for _, row in all_df.iterrows():
+        token = row['tokens'][0]['token_id']
+        if token not in books:
+            continue
+        assert by_token[token] == find_markets.process_single_row(row, client)
+
+
+def test_parse_book_side():
+    prices, sizes = find_markets.parse_book_side([{'price': '0.45', 'size': '10'}, {'price': '0.46', 'size': '2.5'}])
+    assert list(prices) == [0.45, 0.46] and list(sizes) == [10.0, 2.5]
+    prices, sizes = find_markets.parse_book_side(None)
+    assert len(prices) == 0 and len(sizes) == 0
+
+
+def test_failed_chunk_falls_back_to_single_books(monkeypatch):
+    rng = random.Random(5)
+    tokens = [str(1000 + i) for i in range(30)]
+    books = {token: _book(rng, token) for token in tokens[:-1]}
+
+    def fake_post(url, json=None, timeout=None):
+        if any(item['token_id'] == '1012' for item in json):
+            raise ConnectionError("reset by peer")
+        return FakeResponse([books[item['token_id']] for item in json if item['token_id'] in books])
+
+    singles = []
+
+    def fake_get(url, params=None, timeout=None):
+        assert url == find_markets.CLOB_BOOK_URL
+        singles.append(params['token_id'])
+        if params['token_id'] == '1015':
+            raise ConnectionError("timeout")
+        if params['token_id'] not in books:
+            return SimpleNamespace(status_code=404)
+        return SimpleNamespace(status_code=200, raise_for_status=lambda: None,
+                               json=lambda: books[params['token_id']])
+
+    monkeypatch.setattr(find_markets.requests, 'post', fake_post)
+    monkeypatch.setattr(find_markets.requests, 'get', fake_get)
+    monkeypatch.setattr(find_markets.time, 'sleep', lambda seconds: None)
+
+    fetched = find_markets.fetch_order_books(tokens, chunk_size=10)
+
+    # Only the failing chunk is fetched book by book; one of its books still fails
+    assert sorted(singles) == tokens[10:20]
+    assert set(fetched) == set(books) - {'1015'}
@@ -0,0 +1,120 @@
+"""
+Tests for the persistent Gamma API response cache.
+"""
+import sys
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services import gamma_cache as gamma_cache_module
+from services.gamma_cache import GammaCache
+
+URL = "https://gamma-api.polymarket.com/events/slug/test-event"
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+
+class FakeGamma:
+    """Stands in for requests.get and records the calls made"""
+
+    def __init__(self, responses, delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(headers or {})
+        time.sleep(self.delay)
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GammaCache(path=str(tmp_path / "gamma.db"), default_ttl=60)
+
+
+def _install(monkeypatch, fake):
+    monkeypatch.setattr(gamma_cache_module.requests, 'get', fake)
+    return fake
+
+
+class TestGammaCache:
+    """Tests for GammaCache"""
+
+    def test_fresh_entry_is_served_without_request(self, cache, monkeypatch):
+        fake = _install(monkeypatch, FakeGamma([FakeResponse(200, {'title': 'A'})]))
+
+        assert cache.get_json(URL) == (200, {'title': 'A'})
+        assert cache.get_json(URL) == (200, {'title': 'A'})
+
+        assert len(fake.calls) == 1
+        assert cache.stats['hits'] == 1
+
+    def test_stale_entry_is_revalidated(self, cache, monkeypatch):
+        fake = _install(monkeypatch, FakeGamma([
+            FakeResponse(200, {'title': 'A'}, {'ETag': '"v1"'}),
+            FakeResponse(304),
+        ]))
+        cache.get_json(URL)
+
+        assert cache.get_json(URL, ttl=0) == (200, {'title': 'A'})
+        assert fake.calls[1] == {'If-None-Match': '"v1"'}
+        assert cache.stats['revalidated'] == 1
+
+    def test_not_found_is_cached(self, cache, monkeypatch):
+        fake = _install(monkeypatch, FakeGamma([FakeResponse(404)]))
+
+        assert cache.get_json(URL) == (404, None)
+        assert cache.get_json(URL) == (404, None)
+        assert len(fake.calls) == 1
+
+    def test_stale_copy_served_on_error(self, cache, monkeypatch):
+        _install(monkeypatch, FakeGamma([
+            FakeResponse(200, {'title': 'A'}),
+            requests.ConnectionError("down"),
+        ]))
+        cache.get_json(URL)
+
+        assert cache.get_json(URL, ttl=0) == (200, {'title': 'A'})
+        assert cache.stats['stale_served'] == 1
+
+    def test_concurrent_lookups_are_coalesced(self, cache, monkeypatch):
+        fake = _install(monkeypatch, FakeGamma([FakeResponse(200, {'title': 'A'})], delay=0.2))
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get_json(URL))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(fake.calls) == 1
+        assert results == [(200, {'title': 'A'})] * 5
+
+    def test_cache_is_persistent(self, cache, monkeypatch):
+        fake = _install(monkeypatch, FakeGamma([FakeResponse(200, {'title': 'A'})]))
+        cache.get_json(URL)
+        cache.put_value('tag_categories', {'crypto': 21})
+
+        reopened = GammaCache(path=cache.path, default_ttl=60)
+
+        assert reopened.get_json(URL) == (200, {'title': 'A'})
+        assert reopened.get_value('tag_categories', ttl=60) == {'crypto': 21}
+        assert len(fake.calls) == 1
@@ -0,0 +1,132 @@
+"""
+Tests for the concurrent Gamma page crawler and the async rate limiter slot reservation.
+"""
+import asyncio
+import sys
+import os
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from poly_data.rate_limiter import RateLimiter
+from services.gamma_crawler import GammaPageCrawler
+
+TOTAL_EVENTS = 950
+
+
+async def _serve(handler):
+    app = web.Application()
+    app.router.add_get('/events', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/events"
+
+
+def _crawl(crawler_kwargs, stop_at=None, delay=0.05):
+    """Run a crawl against a local fake /events endpoint"""
+    state = {'in_flight': 0, 'max_in_flight': 0, 'offsets': []}
+
+    async def handler(request):
+        offset, limit = int(request.query['offset']), int(request.query['limit'])
+        state['offsets'].append(offset)
+        state['in_flight'] += 1
+        state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        await asyncio.sleep(delay)
+        state['in_flight'] -= 1
+        events = [{'id': i} for i in range(offset, min(offset + limit, TOTAL_EVENTS))]
+        return web.json_response(events)
+
+    async def run():
+        runner, url = await _serve(handler)
+        try:
+            crawler = GammaPageCrawler(url, endpoint='test_unlimited', **crawler_kwargs)
+            pages = {}
+            async for page, events in crawler.pages():
+                pages[page] = events
+                if stop_at is not None and page >= stop_at:
+                    crawler.stop_after(stop_at)
+            return crawler, pages
+        finally:
+            await runner.cleanup()
+
+    crawler, pages = asyncio.run(run())
+    return crawler, pages, state
+
+
+class TestGammaPageCrawler:
+    """Tests for GammaPageCrawler"""
+
+    def test_fetches_all_pages_concurrently(self):
+        crawler, pages, state = _crawl({'page_size': 100, 'concurrency': 4})
+
+        ids = sorted(event['id'] for events in pages.values() for event in events)
+        assert ids == list(range(TOTAL_EVENTS))
+        assert state['max_in_flight'] > 1
+
+    def test_stops_after_short_page(self):
+        """Pages past the short one are not fetched beyond the in-flight window"""
+        crawler, pages, state = _crawl({'page_size': 100, 'concurrency': 4, 'max_pages': 100})
+
+        assert max(pages) == 9 and crawler.reached_end
+        assert len(state['offsets']) <= 10 + 4
+
+    def test_stop_after_drops_later_pages(self):
+        crawler, pages, state = _crawl({'page_size': 100, 'concurrency': 2}, stop_at=3)
+
+        assert set(pages) <= {0, 1, 2, 3}
+        assert {0, 1, 2, 3} <= set(pages)
+
+    def test_persistent_errors_abandon_crawl(self):
+        """A failing endpoint is given up on instead of being asked for every page"""
+        async def run(status):
+            requests = []
+
+            async def handler(request):
+                requests.append(request.query['offset'])
+                return web.Response(status=status)
+
+            runner, url = await _serve(handler)
+            try:
+                crawler = GammaPageCrawler(url, endpoint='test_unlimited', page_size=100,
+                                           concurrency=3, max_pages=500, max_retries=0)
+                pages = [page async for page, _ in crawler.pages()]
+                return crawler, pages, requests
+            finally:
+                await runner.cleanup()
+
+        crawler, pages, requests = asyncio.run(run(500))
+        assert crawler.aborted and not crawler.reached_end and pages == []
+        assert len(requests) <= 2 * 3
+
+        crawler, pages, requests = asyncio.run(run(403))
+        assert crawler.aborted and len(requests) <= 3
+
+
+class TestRateLimiterAcquire:
+    """Tests for RateLimiter.acquire"""
+
+    def test_concurrent_acquires_respect_limit(self):
+        limiter = RateLimiter()
+        limiter._rate_limits['test_endpoint'] = {'requests': 5, 'window_seconds': 1}
+
+        async def run():
+            started = time.monotonic()
+            times = []
+
+            async def one():
+                await limiter.acquire('test_endpoint')
+                times.append(time.monotonic() - started)
+
+            await asyncio.gather(*(one() for _ in range(8)))
+            return sorted(times)
+
+        times = asyncio.run(run())
+
+        assert all(t < 0.5 for t in times[:5])
+        assert all(t >= 0.9 for t in times[5:])
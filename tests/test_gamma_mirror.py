@@ -0,0 +1,195 @@
+"""
+Tests for the incremental Gamma catalog mirror, against a local fake Gamma /events endpoint.
+"""
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.gamma_mirror import GammaMirror
+
+PAGE_SIZE = 20
+CRYPTO_TAG = 21
+
+
+class FakeGamma:
+    """Active/closed event listings ordered by updatedAt, newest first"""
+
+    def __init__(self, count: int = 90):
+        self.events = {}
+        self.clock = 0
+        self.requests = []
+        for i in range(count):
+            self.put(i, closed=False)
+
+    def put(self, event_id: int, closed: bool, title: str = None):
+        self.clock += 1
+        self.events[event_id] = {
+            'id': str(event_id),
+            'slug': f"event-{event_id}",
+            'title': title or f"Event {event_id}",
+            'updatedAt': f"2025-01-01T00:{self.clock // 60:02d}:{self.clock % 60:02d}Z",
+            'createdAt': f"2025-{1 + event_id % 12:02d}-01T00:00:00Z",
+            'closed': closed,
+            'tags': [{'id': CRYPTO_TAG}] if event_id % 3 == 0 else [],
+            'markets': [{'slug': f"market-{event_id}-{k}", 'question': f"Q{event_id}.{k}"} for k in range(2)],
+        }
+
+    async def handler(self, request):
+        query = request.query
+        self.requests.append(dict(query))
+        closed = query['closed'] == 'true'
+        listing = sorted((e for e in self.events.values() if e['closed'] == closed),
+                         key=lambda e: e['updatedAt'], reverse=True)
+        offset, limit = int(query['offset']), int(query['limit'])
+        return web.json_response(listing[offset:offset + limit])
+
+
+async def _with_gamma(gamma: FakeGamma, body):
+    app = web.Application()
+    app.router.add_get('/events', gamma.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await body(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def test_incremental_sync_and_closed_sweep(tmp_path):
+    gamma = FakeGamma()
+
+    async def body(base_url):
+        mirror = GammaMirror(path=str(tmp_path / 'mirror.db'), base_url=base_url,
+                             concurrency=2, page_size=PAGE_SIZE)
+        results = {}
+
+        results['full'] = await mirror.refresh()
+        results['full_requests'] = len(gamma.requests)
+
+        # Nothing changed: only the newest page (plus one in flight) is fetched
+        gamma.requests.clear()
+        results['noop'] = await mirror.sync()
+        results['noop_requests'] = len(gamma.requests)
+
+        # One event edited, one new event, one event closed
+        gamma.put(5, closed=False, title="Edited")
+        gamma.put(500, closed=False)
+        gamma.put(7, closed=True)
+        gamma.requests.clear()
+        results['changed'] = await mirror.refresh(sweep_interval=0)
+        results['changed_requests'] = len(gamma.requests)
+        return mirror, results
+
+    mirror, results = asyncio.run(_with_gamma(gamma, body))
+
+    assert results['full']['full'] and results['full']['changed'] == 90
+    assert results['noop']['changed'] == 0 and results['noop_requests'] <= 2
+    assert results['changed']['changed'] == 2
+    assert results['changed']['closed'] == 1
+    assert results['changed_requests'] < results['full_requests']
+
+    assert mirror.event_by_slug('event-5')['title'] == "Edited"
+    assert mirror.event_by_slug('event-500') is not None
+    assert mirror.event_by_slug('event-7') is None
+    market, event = mirror.market_by_slug('market-12-1')
+    assert market['question'] == 'Q12.1' and event['id'] == '12'
+    assert mirror.market_by_slug('market-7-0') is None
+    assert mirror.is_fresh()
+
+    stats = mirror.get_stats()
+    assert stats['active_events'] == 90 and stats['closed_events'] == 1
+
+
+def test_listing_filters(tmp_path):
+    gamma = FakeGamma()
+
+    async def body(base_url):
+        mirror = GammaMirror(path=str(tmp_path / 'mirror.db'), base_url=base_url,
+                             concurrency=2, page_size=PAGE_SIZE)
+        await mirror.sync()
+        return mirror
+
+    mirror = asyncio.run(_with_gamma(gamma, body))
+
+    batches = list(mirror.iter_events(batch_size=25))
+    assert [len(batch) for batch in batches] == [25, 25, 25, 15]
+
+    tagged = [event for batch in mirror.iter_events(tag_id=CRYPTO_TAG) for event in batch]
+    assert len(tagged) == 30 and all(int(event['id']) % 3 == 0 for event in tagged)
+
+    recent = [event for batch in mirror.iter_events(created_since=datetime(2025, 11, 1)) for event in batch]
+    assert {event['createdAt'][:7] for event in recent} == {'2025-11', '2025-12'}
+    created = [event['createdAt'] for event in recent]
+    assert created == sorted(created, reverse=True)
+
+
+def test_async_reads_and_refresh_from_several_loops(tmp_path):
+    gamma = FakeGamma(count=30)
+    mirror = GammaMirror(path=str(tmp_path / 'mirror.db'), concurrency=2, page_size=PAGE_SIZE)
+
+    async def refresh_twice(base_url):
+        mirror.base_url = base_url
+        results = await asyncio.gather(mirror.refresh(), mirror.refresh())
+        batches = [batch async for batch in mirror.iter_events_async(batch_size=8)]
+        return results, batches
+
+    # Each asyncio.run is a new event loop, sharing the mirror as the singleton would
+    for _ in range(2):
+        results, batches = asyncio.run(_with_gamma(gamma, refresh_twice))
+        assert sum('coalesced' in result for result in results) == 1
+        assert [len(batch) for batch in batches] == [8, 8, 8, 6]
+
+
+def test_sync_cut_off_at_max_pages_is_not_complete(tmp_path):
+    gamma = FakeGamma()
+
+    async def body(base_url):
+        mirror = GammaMirror(path=str(tmp_path / 'mirror.db'), base_url=base_url,
+                             concurrency=2, page_size=PAGE_SIZE)
+        partial = await mirror.sync(max_pages=2)
+        complete_after_partial = mirror._get_meta('complete')
+        rest = await mirror.sync()
+        return partial, complete_after_partial, rest, mirror
+
+    partial, complete_after_partial, rest, mirror = asyncio.run(_with_gamma(gamma, body))
+
+    assert partial['changed'] == 40 and complete_after_partial is None
+    # The next sync is a full one and fills in the events that were cut off
+    assert rest['full'] and rest['changed'] == 50
+    assert mirror._get_meta('complete') == '1'
+
+
+def test_events_served_without_waiting_for_refresh(tmp_path):
+    gamma = FakeGamma(count=60)
+
+    async def body(base_url):
+        mirror = GammaMirror(path=str(tmp_path / 'mirror.db'), base_url=base_url,
+                             concurrency=1, page_size=PAGE_SIZE)
+        # Cold: pages come through as the first sync stores them
+        cold = []
+        async for batch in mirror.events_async(tag_id=CRYPTO_TAG):
+            cold.append((len(batch), mirror.stats['syncs']))
+
+        # Warm: the mirror answers at once and refreshes behind the listing
+        gamma.put(900, closed=False)
+        warm = [event async for batch in mirror.events_async() for event in batch]
+        refreshing = mirror._refresh_task is not None and not mirror._refresh_task.done()
+        await mirror._refresh_task
+        return cold, warm, refreshing, mirror
+
+    cold, warm, refreshing, mirror = asyncio.run(_with_gamma(gamma, body))
+
+    assert sum(count for count, _ in cold) == 20
+    # The first batches arrived before the sync had finished
+    assert cold[0][1] == 0
+    assert len(warm) == 60 and refreshing
+    assert mirror.event_by_slug('event-900') is not None
@@ -0,0 +1,66 @@
+"""
+Tests for versioned copy-on-write state snapshots.
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import poly_data.global_state as global_state
+from poly_data.order_store import OrderStore
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Reset the components touched by these tests"""
+    global_state.publish(positions={}, performing={})
+    yield
+    global_state.publish(positions={}, performing={})
+
+
+class TestStateSnapshot:
+    """Tests for snapshot() / publish()"""
+
+    def test_publish_bumps_version(self):
+        """Each publish creates a new version and records which component changed"""
+        before = global_state.snapshot()
+
+        after = global_state.publish(positions={'1': {'size': 5.0, 'avgPrice': 0.4}})
+
+        assert after.version == before.version + 1
+        assert after.changed_since(before.version, 'positions')
+        assert not after.changed_since(before.version, 'df', 'orders')
+
+    def test_old_snapshot_is_unchanged(self):
+        """Readers holding an older snapshot keep a consistent view"""
+        global_state.publish(positions={'1': {'size': 5.0, 'avgPrice': 0.4}})
+        old = global_state.snapshot()
+
+        global_state.publish(positions={'1': {'size': 7.0, 'avgPrice': 0.4}})
+
+        assert old.positions['1']['size'] == 5.0
+        assert global_state.snapshot().positions['1']['size'] == 7.0
+
+    def test_published_mappings_are_read_only(self):
+        """Snapshot components and their legacy aliases cannot be mutated"""
+        global_state.publish(positions={})
+
+        with pytest.raises(TypeError):
+            global_state.snapshot().positions['1'] = {'size': 1.0, 'avgPrice': 0.5}
+        with pytest.raises(TypeError):
+            global_state.positions['1'] = {'size': 1.0, 'avgPrice': 0.5}
+
+    def test_order_store_publishes_view(self):
+        """Order changes are delivered as new immutable views"""
+        views = []
+        store = OrderStore(on_change=views.append)
+
+        store.upsert('o1', '123', 'buy', 0.5, 10)
+        store.upsert('o1', '123', 'buy', 0.5, 10)  # no change, no publish
+        store.remove('o1')
+
+        assert len(views) == 2
+        assert views[0]['123']['buy'] == (0.5, 10.0)
+        assert '123' not in views[1]
@@ -0,0 +1,90 @@
+"""
+Tests for the append-only Parquet history store.
+"""
+import sys
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip("pyarrow")
+
+from sortedcontainers import SortedDict
+
+from poly_data.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(root=str(tmp_path), flush_interval=60, book_depth=2)
+    yield history
+    history.stop()
+
+
+class TestHistoryStore:
+    """Tests for HistoryStore"""
+
+    def test_flush_writes_day_market_partitions(self, store, tmp_path):
+        """Buffered fills land in one part file per day and market"""
+        day1 = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+        day2 = datetime(2026, 1, 2, 12, tzinfo=timezone.utc)
+        store.append_fill('m1', 't1', '111', 'buy', 0.5, 10, 'MATCHED', ts=day1)
+        store.append_fill('m1', 't2', '111', 'sell', 0.6, 5, 'MATCHED', ts=day2)
+        store.append_fill('m2', 't3', '222', 'buy', 0.4, 1, 'MATCHED', ts=day1)
+
+        assert store.flush() == 3
+        assert os.listdir(tmp_path / 'fills' / 'date=2026-01-01' / 'market=m1')
+        assert os.listdir(tmp_path / 'fills' / 'date=2026-01-02' / 'market=m1')
+
+    def test_query_prunes_by_day_and_market(self, store):
+        """Appends are additive and query filters on partitions"""
+        for day in (1, 2, 3):
+            ts = datetime(2026, 1, day, tzinfo=timezone.utc)
+            store.append_order_event('m1', f'o{day}', '111', 'PLACEMENT', 'buy', 0.5, 10, 0, ts=ts)
+            store.append_order_event('m2', f'x{day}', '222', 'PLACEMENT', 'buy', 0.5, 10, 0, ts=ts)
+            store.flush()
+
+        df = store.query('order_events', start='2026-01-02', end='2026-01-03', markets=['m1'])
+
+        assert df['order_id'].tolist() == ['o2', 'o3']
+        assert set(df['market']) == {'m1'}
+
+    def test_book_snapshot_keeps_top_levels(self, store):
+        """Book snapshots store the best `book_depth` levels per side"""
+        bids = SortedDict({0.45: 10.0, 0.47: 5.0, 0.48: 1.0})
+        asks = SortedDict({0.50: 2.0, 0.51: 3.0, 0.60: 4.0})
+        store.snapshot_books({'m1': {'asset_id': '111', 'bids': bids, 'asks': asks}})
+        store.flush()
+
+        row = store.query('book_snapshots').iloc[0]
+
+        assert list(row['bid_prices']) == [0.48, 0.47]
+        assert list(row['ask_prices']) == [0.50, 0.51]
+
+    def test_query_missing_stream_is_empty(self, store):
+        assert store.query('fills').empty
+
+    def test_compact_merges_finished_days(self, store, tmp_path):
+        """Each flush adds a part file; compaction leaves one per finished day and market"""
+        for minute in range(5):
+            store.append_fill('m1', f't{minute}', '111', 'buy', 0.5, minute + 1, 'MATCHED',
+                              ts=datetime(2026, 1, 1, 12, 4 - minute, tzinfo=timezone.utc))
+            store.append_fill('m1', f'u{minute}', '111', 'buy', 0.5, 1, 'MATCHED',
+                              ts=datetime(2026, 1, 2, 12, minute, tzinfo=timezone.utc))
+            store.flush()
+
+        finished = tmp_path / 'fills' / 'date=2026-01-01' / 'market=m1'
+        current = tmp_path / 'fills' / 'date=2026-01-02' / 'market=m1'
+        assert len(os.listdir(finished)) == 5
+
+        assert store.compact(before='2026-01-02') == 1
+        assert len(os.listdir(finished)) == 1
+        assert len(os.listdir(current)) == 5
+        # Nothing left to merge
+        assert store.compact(before='2026-01-02') == 0
+
+        df = store.query('fills', end='2026-01-01')
+        assert df['trade_id'].tolist() == ['t4', 't3', 't2', 't1', 't0']
+        assert len(store.query('fills')) == 10
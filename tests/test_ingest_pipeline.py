@@ -0,0 +1,105 @@
+"""
+Tests for the streaming crawl -> parse -> categorize -> upsert pipeline.
+"""
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.ingest_pipeline import IngestPipeline
+
+PAGES = 20
+EVENTS_PER_PAGE = 10
+
+
+def _parse(events):
+    return [({'condition_id': f"{event['id']}-{i}", 'question': event['title']}, '')
+            for event in events for i in range(2)]
+
+
+def _categorize(items):
+    for market, _ in items:
+        market['category'] = 'other'
+    return [market for market, _ in items]
+
+
+def test_pipeline_streams_batches_while_crawling():
+    crawled = []
+    saved_batches = []
+    crawled_at_first_save = []
+    snapshots = []
+
+    async def pages():
+        for page in range(PAGES):
+            await asyncio.sleep(0.005)
+            crawled.append(page)
+            yield page, [{'id': page * EVENTS_PER_PAGE + i, 'title': f"Event {page}"}
+                         for i in range(EVENTS_PER_PAGE)]
+
+    def save(batch):
+        if not saved_batches:
+            crawled_at_first_save.append(len(crawled))
+        saved_batches.append(batch)
+        return len(batch), []
+
+    pipeline = IngestPipeline(pages(), _parse, _categorize, save, batch_size=50, queue_size=2,
+                              on_progress=lambda stages: snapshots.append(stages['upsert']['saved']))
+    saved, errors = asyncio.run(pipeline.run())
+
+    total = PAGES * EVENTS_PER_PAGE * 2
+    assert saved == total and errors == []
+    assert [len(batch) for batch in saved_batches] == [50] * (total // 50)
+    # The first batch was written long before the crawl finished
+    assert crawled_at_first_save[0] < PAGES
+    assert snapshots[-1] == total
+    stages = pipeline.stages
+    assert stages['crawl'] == {'pages': PAGES, 'events': PAGES * EVENTS_PER_PAGE, 'done': True}
+    assert stages['upsert']['batches'] == total // 50
+    assert all(stage['done'] for stage in stages.values())
+
+
+def test_slow_database_applies_backpressure_to_crawl():
+    crawled = []
+    max_ahead = []
+
+    async def pages():
+        for page in range(PAGES):
+            crawled.append(page)
+            yield page, [{'id': page, 'title': 'x'}]
+
+    def save(batch):
+        import time
+        # Pages crawled but not yet saved stay bounded by the queue sizes
+        # (one slot per queue plus the item each stage is holding)
+        max_ahead.append(len(crawled) - batch[-1]['page'])
+        time.sleep(0.01)
+        return len(batch), []
+
+    def categorize(items):
+        markets = _categorize(items)
+        for market in markets:
+            market['page'] = int(market['condition_id'].split('-')[0])
+        return markets
+
+    pipeline = IngestPipeline(pages(), _parse, categorize, save, batch_size=2, queue_size=1)
+    asyncio.run(pipeline.run())
+    assert max(max_ahead) <= 8
+
+
+def test_stage_error_cancels_pipeline():
+    async def pages():
+        for page in range(1000):
+            await asyncio.sleep(0)
+            yield page, [{'id': page, 'title': 'x'}]
+
+    def save(batch):
+        raise RuntimeError("database is locked")
+
+    pipeline = IngestPipeline(pages(), _parse, _categorize, save, batch_size=10, queue_size=2)
+    with pytest.raises(RuntimeError, match="database is locked"):
+        asyncio.run(pipeline.run())
+    assert pipeline.stages['crawl']['pages'] < 1000
@@ -0,0 +1,63 @@
+"""
+Tests for the compiled single-pass market categorizer.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.market_categorizer import MarketCategorizer, get_categorizer
+from scripts.benchmark_categorizer import QUESTION_TEMPLATES, make_corpus
+
+CASES = [
+    ("Will Bitcoin reach $100,000 by December 31?", '', 'crypto'),
+    ("Bitcoin price on Friday?", '', 'crypto'),
+    ("Will ETH hit 5k?", '', 'crypto'),
+    ("Will the NFT market recover?", '', 'crypto'),
+    ("Will Trump win the 2028 presidential election?", '', 'politics'),
+    ("Will the Senate pass the bill?", '', 'politics'),
+    ("Who will win the Super Bowl?", '', 'sports'),
+    ("Will the Fed cut rates?", '', 'economics'),
+    ("Will Oppenheimer win 5 Oscars?", '', 'entertainment'),
+    ("Will OpenAI launch a new model?", '', 'technology'),
+    ("Will a hurricane hit Florida?", '', 'science'),
+    ("Will it snow in Paris?", '', 'other'),
+    ('', 'Bitcoin price', 'other'),
+]
+
+
+def test_categorize_cases():
+    categorizer = MarketCategorizer()
+    for question, description, expected in CASES:
+        assert categorizer.categorize(question, description) == expected, question
+
+
+def test_whole_word_matching():
+    categorizer = MarketCategorizer()
+    # 'eth' in 'whether', 'sol' in 'resolve', 'ada' in 'canada' used to count as coins
+    assert not categorizer.is_crypto_related("Whether Canada will resolve the dispute by March")
+    assert categorizer.categorize("Whether Canada will resolve the dispute by March") == 'other'
+    # Inflections of longer keywords still match
+    assert categorizer.categorize("Who wins the elections?") == 'politics'
+    assert categorizer.categorize("Will the minister have resigned?") == 'politics'
+    # Tickers only match as exact words
+    assert categorizer.is_crypto_related("Will SOL close at $300?")
+    assert not categorizer.is_crypto_related("Will sols close at $300?")
+
+
+def test_phrases_and_contained_keywords():
+    categorizer = MarketCategorizer()
+    # 'bitcoin price' is a question pattern and also contains a coin and a price word
+    assert {'coin', 'price', 'crypto_question'} <= categorizer.groups("bitcoin price")
+    assert 'economics' in categorizer.groups("S&P 500 above 6000?")
+
+
+def test_batch_matches_single_and_pool():
+    categorizer = get_categorizer()
+    corpus = make_corpus(3000)
+    expected = [categorizer.categorize(q, d) for q, d in corpus]
+
+    assert categorizer.categorize_many(corpus) == expected
+    assert categorizer.categorize_many(corpus, processes=2, chunksize=500) == expected
+    assert len(set(expected)) >= len(QUESTION_TEMPLATES) // 2
@@ -0,0 +1,141 @@
+"""
+Tests for the incremental market configuration loader.
+"""
+import pytest
+import sys
+import os
+from datetime import timedelta
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal, Market, TradingParams, init_db
+import poly_data.global_state as global_state
+from poly_data.market_loader import IncrementalMarketLoader
+
+
+@pytest.fixture
+def db_session():
+    """Create a database session for testing"""
+    init_db()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def sample_market(db_session):
+    """Create an active market with trading params"""
+    market = Market(
+        condition_id="loader_condition_1",
+        question="Loader Test Market?",
+        answer1="YES",
+        answer2="NO",
+        token1="555000111",
+        token2="555000222",
+        is_active=True,
+    )
+    db_session.add(market)
+    db_session.flush()
+    db_session.add(TradingParams(market_id=market.id))
+    db_session.commit()
+    db_session.refresh(market)
+
+    yield market
+
+    db_session.delete(market)
+    db_session.commit()
+
+
+@pytest.fixture
+def loader():
+    """Fresh loader with clean token state"""
+    global_state.publish(all_tokens=[], reverse_tokens={})
+    return IncrementalMarketLoader()
+
+
+class TestIncrementalMarketLoader:
+    """Tests for IncrementalMarketLoader"""
+
+    def test_initial_load(self, sample_market, loader):
+        """First load registers the market, its tokens and params"""
+        delta = loader.apply(loader.read())
+
+        assert sample_market.condition_id in delta['added']
+        assert {'555000111', '555000222'} <= set(delta['subscribe'])
+        assert global_state.REVERSE_TOKENS['555000111'] == '555000222'
+        assert sample_market.condition_id in global_state.df['condition_id'].tolist()
+        assert 'default' in global_state.params
+
+    def test_unchanged_reload_is_empty(self, sample_market, loader):
+        """A reload with no DB changes reports nothing"""
+        loader.apply(loader.read())
+        tokens_before = list(global_state.all_tokens)
+
+        delta = loader.apply(loader.read())
+
+        assert delta['added'] == [] and delta['changed'] == [] and delta['removed'] == []
+        assert global_state.all_tokens == tokens_before
+
+    def test_params_change_is_picked_up(self, db_session, sample_market, loader):
+        """Editing trading params marks the market as changed"""
+        loader.apply(loader.read())
+
+        sample_market.trading_params.trade_size = 42.0
+        db_session.commit()
+
+        delta = loader.apply(loader.read())
+
+        assert delta['changed'] == [sample_market.condition_id]
+        row = global_state.df[global_state.df['condition_id'] == sample_market.condition_id].iloc[0]
+        assert row['trade_size'] == 42.0
+
+    def test_deactivated_market_is_removed(self, db_session, sample_market, loader):
+        """Deactivating a market drops it and unsubscribes its tokens"""
+        loader.apply(loader.read())
+
+        sample_market.is_active = False
+        db_session.commit()
+
+        delta = loader.apply(loader.read())
+
+        assert delta['removed'] == [sample_market.condition_id]
+        assert set(delta['unsubscribe']) == {'555000111', '555000222'}
+        assert '555000111' not in global_state.all_tokens
+        assert '555000111' not in global_state.REVERSE_TOKENS
+
+    def test_out_of_order_read_is_discarded(self, db_session, sample_market, loader):
+        """A read that started before an already applied one does not roll state back"""
+        loader.apply(loader.read())
+        stale = loader.read()
+
+        sample_market.trading_params.trade_size = 17.0
+        db_session.commit()
+        loader.apply(loader.read())
+
+        delta = loader.apply(stale)
+
+        assert delta['changed'] == []
+        row = global_state.df[global_state.df['condition_id'] == sample_market.condition_id].iloc[0]
+        assert row['trade_size'] == 17.0
+
+    def test_late_committed_change_is_picked_up(self, db_session, sample_market, loader):
+        """A row stamped before the last read but committed after it is still loaded"""
+        loader.apply(loader.read())
+        sample_market.trading_params.trade_size = 12.0
+        db_session.commit()
+        loader.apply(loader.read())
+
+        # Stamped just behind the watermark, as by a writer whose commit was slow
+        sample_market.trading_params.trade_size = 33.0
+        sample_market.trading_params.updated_at = loader._watermark - timedelta(seconds=1)
+        db_session.commit()
+
+        delta = loader.apply(loader.read())
+
+        assert delta['changed'] == [sample_market.condition_id]
+        row = global_state.df[global_state.df['condition_id'] == sample_market.condition_id].iloc[0]
+        assert row['trade_size'] == 33.0
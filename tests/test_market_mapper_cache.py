@@ -0,0 +1,155 @@
+"""
+Tests for the TTL/LRU caches behind TokenMarketMapper.
+"""
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from database import SessionLocal, Market, TradingParams, init_db
+from services.market_mapping_service import TokenMarketMapper, _TTLCache, _MISSING
+from services.market_cache_service import MarketCacheService
+
+
+class TestTTLCache:
+    """Tests for _TTLCache"""
+
+    def test_lru_eviction(self):
+        cache = _TTLCache(max_size=2, ttl=60, negative_ttl=5)
+        cache.put('a', 1, now=0)
+        cache.put('b', 2, now=0)
+        cache.get('a', now=1)  # 'b' is now least recently used
+        cache.put('c', 3, now=1)
+
+        assert cache.get('b', now=1) is _MISSING
+        assert cache.get('a', now=1) == 1
+        assert cache.stats['evictions'] == 1
+
+    def test_entries_expire(self):
+        cache = _TTLCache(max_size=10, ttl=60, negative_ttl=5)
+        cache.put('found', 'market', now=0)
+        cache.put('unknown', None, now=0)
+
+        assert cache.get('unknown', now=4) is None
+        assert cache.get('unknown', now=6) is _MISSING
+        assert cache.get('found', now=59) == 'market'
+        assert cache.get('found', now=61) is _MISSING
+        assert cache.stats['expirations'] == 2
+        assert cache.stats['negative_hits'] == 1
+
+
+class CountingMapper(TokenMarketMapper):
+    """Mapper that counts database sessions opened for lookups"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.queries = 0
+
+    def _get_db_session(self):
+        self.queries += 1
+        return super()._get_db_session()
+
+
+class TestTokenMarketMapperCache:
+    """Tests for mapper-level caching"""
+
+    def test_unknown_token_is_negatively_cached(self):
+        init_db()
+        mapper = CountingMapper()
+
+        assert mapper.get_market_by_token_id("no_such_token") is None
+        assert mapper.get_market_by_token_id("no_such_token") is None
+
+        assert mapper.queries == 1
+        stats = mapper.get_cache_stats()
+        assert (stats['hits'], stats['misses'], stats['negative_hits']) == (1, 1, 1)
+        assert stats['hit_rate'] == 0.5
+
+    def test_invalidation_drops_negative_entry(self):
+        init_db()
+        mapper = CountingMapper()
+        mapper.get_market_by_condition_id("no_such_condition")
+
+        mapper.invalidate_many(condition_ids=["no_such_condition"])
+        mapper.get_market_by_condition_id("no_such_condition")
+
+        assert mapper.queries == 2
+
+    def test_size_limit(self):
+        init_db()
+        mapper = TokenMarketMapper(cache_size=3)
+        # The token cache holds two tokens per market
+        for n in range(8):
+            mapper.get_market_by_token_id(f"missing_{n}")
+
+        stats = mapper.get_cache_stats()
+        assert stats['token_cache_size'] == 6
+        assert stats['token_evictions'] == 2
+
+    def test_full_replace_is_not_evicted(self):
+        """A warm reload with more markets than cache_size keeps every token"""
+        mapper = CountingMapper(cache_size=3)
+        markets = [SimpleNamespace(condition_id=f"c{n}", token1=f"{n}1", token2=f"{n}2") for n in range(5)]
+        mapper.replace(markets)
+
+        assert all(mapper.get_market_by_token_id(f"{n}1") is markets[n] for n in range(5))
+        assert mapper.get_market_by_condition_id("c0") is markets[0]
+        assert mapper.queries == 0
+        assert mapper.get_cache_stats()['token_evictions'] == 0
+
+
+@pytest.fixture
+def market():
+    init_db()
+    db = SessionLocal()
+    market = Market(condition_id="cache_refresh_test", question="Refresh?", answer1='YES', answer2='NO',
+                    token1="6660001", token2="6660002")
+    market.trading_params = TradingParams()
+    db.add(market)
+    db.commit()
+    try:
+        yield market
+    finally:
+        db.query(TradingParams).filter(TradingParams.market_id == market.id).delete()
+        db.query(Market).filter(Market.id == market.id).delete()
+        db.commit()
+        db.close()
+
+
+class TestMarketCacheRefresh:
+    """Tests for MarketCacheService full and incremental refresh"""
+
+    def _service(self):
+        service = MarketCacheService()
+        service.mapper = CountingMapper()
+        return service
+
+    def test_full_refresh_swaps_in_markets(self, market):
+        service = self._service()
+        service.mapper.get_market_by_token_id("stale_token")
+
+        service.refresh_cache()
+
+        cached = service.mapper.get_market_by_token_id("6660002")
+        assert cached.condition_id == "cache_refresh_test"
+        assert cached.trading_params is not None
+        # Served from the refreshed cache; the old negative entry is gone
+        assert service.mapper.queries == 1
+        assert service.mapper.get_cache_stats()['token_cache_size'] >= 2
+
+    def test_incremental_refresh_reloads_changed_markets(self, market):
+        service = self._service()
+        service.refresh_cache()
+
+        db = SessionLocal()
+        db.query(Market).filter(Market.id == market.id).update({'is_active': False})
+        db.commit()
+        db.close()
+
+        assert service.refresh_changed() >= 1
+        assert service.mapper.get_market_by_condition_id("cache_refresh_test").is_active is False
+        assert service.mapper.queries == 0
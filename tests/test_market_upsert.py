@@ -0,0 +1,101 @@
+"""
+Tests for the set-based market upsert used by the fetch background tasks.
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal, Market, TradingParams, init_db
+from api.markets import _save_market_batch
+
+PREFIX = "upsert_test_"
+
+
+def _market(n, **overrides):
+    data = {
+        'condition_id': f"{PREFIX}{n}",
+        'question': f"Upsert market {n}?",
+        'answer1': 'YES',
+        'answer2': 'NO',
+        'token1': f"88800{n}1",
+        'token2': f"88800{n}2",
+        'best_bid': 0.4,
+        'best_ask': 0.6,
+        'volume': 123.0,  # not a Market column, must be ignored
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def db_session():
+    init_db()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        for market in db.query(Market).filter(Market.condition_id.like(f"{PREFIX}%")):
+            db.delete(market)
+        db.commit()
+        db.close()
+
+
+class TestMarketUpsert:
+    """Tests for _save_market_batch"""
+
+    def test_inserts_markets_with_default_params(self, db_session):
+        saved, errors = _save_market_batch([_market(1), _market(2, category='politics')], 'other')
+
+        assert (saved, errors) == (2, [])
+        markets = {m.condition_id: m for m in db_session.query(Market).filter(Market.condition_id.like(f"{PREFIX}%"))}
+        assert markets[f"{PREFIX}1"].category == 'other'
+        assert markets[f"{PREFIX}2"].category == 'politics'
+        assert all(m.trading_params is not None for m in markets.values())
+
+    def test_updates_existing_without_duplicating_params(self, db_session):
+        _save_market_batch([_market(1)], 'other')
+        params_id = db_session.query(Market).filter_by(condition_id=f"{PREFIX}1").one().trading_params.id
+
+        saved, _ = _save_market_batch([_market(1, best_bid=0.45)], 'other')
+        db_session.expire_all()
+
+        market = db_session.query(Market).filter_by(condition_id=f"{PREFIX}1").one()
+        assert saved == 1
+        assert market.best_bid == 0.45
+        assert market.trading_params.id == params_id
+        assert db_session.query(TradingParams).filter_by(market_id=market.id).count() == 1
+
+    def test_category_insert_only(self, db_session):
+        """Crypto fetches tag new markets but keep the category of existing ones"""
+        _save_market_batch([_market(1, category='politics')], 'other')
+
+        _save_market_batch([_market(1), _market(2)], 'crypto', update_category=False)
+        db_session.expire_all()
+
+        categories = dict(db_session.query(Market.condition_id, Market.category)
+                          .filter(Market.condition_id.like(f"{PREFIX}%")))
+        assert categories == {f"{PREFIX}1": 'politics', f"{PREFIX}2": 'crypto'}
+
+    def test_invalid_rows_are_reported(self, db_session):
+        saved, errors = _save_market_batch([_market(1), _market(2, token1=None)], 'other')
+
+        assert saved == 1
+        assert len(errors) == 1
+
+    def test_unchanged_rows_keep_updated_at(self, db_session):
+        """Re-fetching identical markets must not look like a change to the incremental loaders"""
+        _save_market_batch([_market(1), _market(2)], 'other')
+        stamps = dict(db_session.query(Market.condition_id, Market.updated_at)
+                      .filter(Market.condition_id.like(f"{PREFIX}%")))
+
+        _save_market_batch([_market(1), _market(2, best_ask=0.65)], 'other')
+        db_session.expire_all()
+
+        after = dict(db_session.query(Market.condition_id, Market.updated_at)
+                     .filter(Market.condition_id.like(f"{PREFIX}%")))
+        assert after[f"{PREFIX}1"] == stamps[f"{PREFIX}1"]
+        assert after[f"{PREFIX}2"] > stamps[f"{PREFIX}2"]
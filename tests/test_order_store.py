@@ -0,0 +1,97 @@
+"""
+Tests for the order-id keyed OrderStore.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from poly_data.order_store import OrderStore
+
+
+def _row(order_id, token, side, price, original_size, size_matched=0):
+    """Open order as returned by the CLOB /orders endpoint"""
+    return {
+        'id': order_id,
+        'asset_id': token,
+        'side': side,
+        'price': str(price),
+        'original_size': str(original_size),
+        'size_matched': str(size_matched),
+    }
+
+
+class TestOrderStore:
+    """Tests for OrderStore"""
+
+    def test_empty_token_returns_zeros(self):
+        """Unknown tokens read as empty on both sides"""
+        store = OrderStore()
+        assert store.get('123') == {'buy': {'price': 0, 'size': 0}, 'sell': {'price': 0, 'size': 0}}
+
+    def test_sides_are_independent(self):
+        """Updating one side keeps the other side's order"""
+        store = OrderStore()
+        store.apply_event('a', '123', 'BUY', 'PLACEMENT', 0.45, 10, 0)
+        store.apply_event('b', '123', 'SELL', 'PLACEMENT', 0.55, 8, 0)
+        store.apply_event('a', '123', 'BUY', 'UPDATE', 0.45, 10, 4)
+
+        orders = store.get(123)
+        assert orders['buy'] == {'price': 0.45, 'size': 6.0}
+        assert orders['sell'] == {'price': 0.55, 'size': 8.0}
+
+    def test_cancellation_and_full_fill_remove_order(self):
+        """Cancelled or fully matched orders drop out of the aggregate"""
+        store = OrderStore()
+        store.apply_event('a', '123', 'BUY', 'PLACEMENT', 0.45, 10, 0)
+        store.apply_event('b', '123', 'SELL', 'PLACEMENT', 0.55, 8, 0)
+
+        store.apply_event('a', '123', 'BUY', 'CANCELLATION', 0.45, 10, 0)
+        store.apply_event('b', '123', 'SELL', 'UPDATE', 0.55, 8, 8)
+
+        assert len(store) == 0
+        assert '123' not in store
+        assert store.get('123')['buy']['size'] == 0
+
+    def test_aggregate_is_size_weighted(self):
+        """Several orders on one side aggregate size and size-weighted price"""
+        store = OrderStore()
+        store.upsert('a', '123', 'buy', 0.40, 10)
+        store.upsert('b', '123', 'buy', 0.50, 30)
+
+        orders = store.get('123')
+        assert orders['buy']['size'] == 40
+        assert abs(orders['buy']['price'] - 0.475) < 1e-9
+
+    def test_snapshot_diff(self):
+        """Snapshot upserts present orders, removes missing ones and reports changes"""
+        store = OrderStore()
+        store.upsert('stale', '111', 'buy', 0.30, 5)
+        store.upsert('keep', '222', 'sell', 0.60, 5)
+
+        result = store.apply_snapshot([
+            _row('keep', '222', 'SELL', 0.60, 5),
+            _row('new', '333', 'BUY', 0.20, 10, 2),
+        ])
+
+        assert result['changed'] == {'111', '333'}
+        assert result['duplicated'] == set()
+        assert '111' not in store
+        assert store.get('222')['sell'] == {'price': 0.60, 'size': 5.0}
+        assert store.get('333')['buy'] == {'price': 0.20, 'size': 8.0}
+
+    def test_snapshot_reports_duplicated_sides(self):
+        """Tokens with more than one order on a side are flagged"""
+        store = OrderStore()
+        result = store.apply_snapshot([
+            _row('a', '123', 'BUY', 0.40, 10),
+            _row('b', '123', 'BUY', 0.41, 10),
+            _row('c', '456', 'BUY', 0.40, 10),
+            _row('d', '456', 'SELL', 0.60, 10),
+        ])
+
+        assert result['duplicated'] == {'123'}
+
+        store.clear_token('123')
+        assert '123' not in store
+        assert len(store) == 2
@@ -0,0 +1,83 @@
+"""
+Tests for delta-based position synchronization.
+"""
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import poly_data.global_state as global_state
+from poly_data.position_sync import PositionSyncEngine
+
+
+def _page(*rows):
+    """Raw /positions response body"""
+    return json.dumps([
+        {'asset': asset, 'conditionId': f'cond_{asset}', 'size': size, 'avgPrice': avg}
+        for asset, size, avg in rows
+    ]).encode()
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Reset the state the engine reads and writes"""
+    global_state.publish(positions={}, performing={})
+    global_state.last_trade_update = {}
+    yield
+    global_state.publish(positions={}, performing={})
+    global_state.last_trade_update = {}
+
+
+class TestPositionSyncEngine:
+    """Tests for PositionSyncEngine"""
+
+    def test_full_sync_reports_changed_assets(self):
+        """New and moved assets are written and reported with their market"""
+        engine = PositionSyncEngine()
+        global_state.publish(positions={'1': {'size': 10.0, 'avgPrice': 0.5}})
+
+        changed = engine.sync([_page(('1', 10.0, 0.5), ('2', 5.0, 0.3))])
+
+        assert changed == {'2': 'cond_2'}
+        assert global_state.positions['2'] == {'size': 5.0, 'avgPrice': 0.3}
+
+    def test_unchanged_response_is_skipped(self):
+        """An identical response with no local trades is not re-applied"""
+        engine = PositionSyncEngine()
+        page = _page(('1', 10.0, 0.5))
+
+        engine.sync([page], avgOnly=True)
+        # Would be overwritten if applied
+        global_state.publish(positions={'1': {'size': 99.0, 'avgPrice': 0.5}})
+
+        assert engine.sync([page], avgOnly=True) == {}
+        assert engine.stats['skipped'] == 1
+        assert global_state.positions['1']['size'] == 99.0
+
+    def test_pending_trades_defer_size_update(self):
+        """avgOnly keeps local size while trades are pending, then catches up"""
+        engine = PositionSyncEngine()
+        global_state.publish(positions={'1': {'size': 10.0, 'avgPrice': 0.5}},
+                             performing={'1_buy': frozenset({'trade_a'})})
+        page = _page(('1', 4.0, 0.5))
+
+        assert engine.sync([page], avgOnly=True) == {}
+        assert global_state.positions['1']['size'] == 10.0
+
+        # Same response, but the deferred asset forces a re-check
+        global_state.publish(performing={'1_buy': frozenset()})
+        assert engine.sync([page], avgOnly=True) == {'1': 'cond_1'}
+        assert global_state.positions['1']['size'] == 4.0
+
+    def test_missing_assets_are_left_alone(self):
+        """Assets missing from the response keep their local position, as update_positions did"""
+        engine = PositionSyncEngine()
+        engine.sync([_page(('1', 10.0, 0.5))])
+
+        changed = engine.sync([_page(('2', 1.0, 0.2))])
+
+        assert changed == {'2': 'cond_2'}
+        assert global_state.positions['1'] == {'size': 10.0, 'avgPrice': 0.5}
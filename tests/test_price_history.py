@@ -0,0 +1,146 @@
+"""
+Tests for the incremental price-history store and vectorized volatility windows.
+"""
+import sys
+import os
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from data_updater import price_history
+from data_updater.find_markets import calculate_annualized_volatility
+from data_updater.price_history import PriceHistoryStore, annualized_volatilities, VOLATILITY_WINDOWS
+
+
+class FakeHistory:
+    """prices-history for a few tokens, one point every 10 minutes"""
+
+    def __init__(self, now):
+        self.now = now
+        self.origin = now - 31 * 86400
+        self.calls = []
+
+    def points(self, token, start, end):
+        rng = np.random.default_rng(int(token))
+        t = np.arange(self.origin, self.origin + 32 * 86400, 600)
+        p = np.clip(0.5 + np.cumsum(rng.normal(0, 0.01, len(t))), 0.01, 0.99)
+        return [{'t': int(ts), 'p': float(price)} for ts, price in zip(t, p) if start <= ts <= end]
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(dict(params))
+        if 'interval' in params:
+            history = self.points(params['market'], self.now - 30 * 86400, self.now)
+        else:
+            history = self.points(params['market'], params['startTs'], self.now)
+        return FakeResponse({'history': history})
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def _reference(t, p):
+    """The per-window pandas computation add_volatility used before"""
+    df = pd.DataFrame({'t': pd.to_datetime(t, unit='s'), 'p': pd.Series(p).round(2)})
+    df['log_return'] = np.log(df['p'] / df['p'].shift(1))
+    return {name: calculate_annualized_volatility(df, hours) for name, hours in VOLATILITY_WINDOWS.items()}
+
+
+def _same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+def test_refresh_fetches_only_new_points(tmp_path, monkeypatch):
+    now = (int(time.time()) // 600) * 600
+    fake = FakeHistory(now - 3600)
+    monkeypatch.setattr(price_history.requests, 'get', fake.get)
+    store = PriceHistoryStore(path=str(tmp_path / 'history.db'))
+
+    first = store.refresh(['1', '2', '3'], max_workers=3)
+    assert all(points > 4000 for points in first.values())
+    assert all(call['interval'] == '1m' for call in fake.calls)
+
+    # An hour later only the newest points (plus the re-read last one) come back
+    fake.now = now
+    fake.calls.clear()
+    second = store.refresh(['1', '2', '3'], max_workers=3)
+    assert second == {'1': 7, '2': 7, '3': 7}
+    assert all('interval' not in call and call['startTs'] == now - 3600 for call in fake.calls)
+
+    t, p = store.load('2')
+    expected = fake.points('2', now - 3600 - 30 * 86400, now)
+    assert t[-1] == now
+    assert list(t) == [point['t'] for point in expected]
+
+    stats = store.volatility_stats('2')
+    reference = _reference(t, p)
+    assert all(_same(stats[name], reference[name]) for name in VOLATILITY_WINDOWS)
+    assert stats['volatility_price'] == round(expected[-1]['p'], 2)
+    assert store.volatility_stats('unknown') is None
+
+
+def test_refresh_prunes_tokens_that_left_the_scan(tmp_path, monkeypatch):
+    now = (int(time.time()) // 600) * 600
+    fake = FakeHistory(now)
+    monkeypatch.setattr(price_history.requests, 'get', fake.get)
+    store = PriceHistoryStore(path=str(tmp_path / 'history.db'), retention_days=2)
+
+    store.refresh(['1', '2'], max_workers=2)
+    # A day later token 2 is no longer scanned; its expired points still go
+    fake.now = now + 86400
+    monkeypatch.setattr(price_history.time, 'time', lambda: now + 86400)
+    store.refresh(['1'], max_workers=1)
+
+    cutoff = now + 86400 - 2 * 86400
+    t1, _ = store.load('1')
+    t2, _ = store.load('2')
+    assert t1[0] >= cutoff and t2[0] >= cutoff and len(t2) < len(t1)
+
+
+def test_volatility_windows_match_pandas():
+    rng = np.random.default_rng(5)
+    for trial in range(60):
+        n = int(rng.integers(1, 4000))
+        t = np.sort(rng.choice(np.arange(0, 31 * 86400, 600), n, replace=False)) + 1_700_000_000
+        p = np.clip(0.5 + np.cumsum(rng.normal(0, 0.01, n)), 0, 1)
+        if trial % 5 == 0:
+            # A zero price makes the windows that include it NaN
+            p[rng.integers(0, n)] = 0
+
+        got = annualized_volatilities(t, p)
+        reference = _reference(t, p)
+        assert all(_same(got[name], reference[name]) for name in VOLATILITY_WINDOWS), trial
+
+
+def test_failed_refresh_drops_market_from_volatility_scan(tmp_path, monkeypatch):
+    from data_updater import find_markets
+
+    now = (int(time.time()) // 600) * 600
+    fake = FakeHistory(now)
+    monkeypatch.setattr(price_history.requests, 'get', fake.get)
+    store = PriceHistoryStore(path=str(tmp_path / 'history.db'))
+    store.refresh(['1', '2'], max_workers=2)
+    monkeypatch.setattr(find_markets, 'get_price_history_store', lambda: store)
+
+    def failing_for_2(url, params=None, timeout=None):
+        if params['market'] == '2':
+            raise ConnectionError("timeout")
+        return fake.get(url, params=params, timeout=timeout)
+
+    monkeypatch.setattr(price_history.requests, 'get', failing_for_2)
+    df = find_markets.add_volatility_to_df(pd.DataFrame({'token1': ['1', '2'], 'question': ['A?', 'B?']}),
+                                           max_workers=2)
+
+    assert df['token1'].tolist() == ['1']
+    assert '24_hour' in df.columns
@@ -0,0 +1,85 @@
+"""
+Tests for the vectorized liquidity-reward estimation against the per-market path.
+"""
+import sys
+import os
+import math
+import random
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from data_updater import find_markets
+from data_updater.reward_engine import tick_grids
+
+USDC = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'
+
+
+def _side(rng, mid, tick, decimals, sign):
+    levels = rng.choice([0, 1, 3, 10, 30])
+    prices = sorted({round(mid + sign * rng.randint(1, 60) * tick, decimals) for _ in range(levels)})
+    prices = [price for price in prices if 0 < price < 1]
+    # Best level last: bids ascending, asks descending
+    if sign > 0:
+        prices = prices[::-1]
+    return np.array(prices, dtype=float), np.array([float(rng.randint(1, 900)) for _ in prices])
+
+
+def _market(rng, i):
+    tick = rng.choice([0.01, 0.01, 0.001])
+    decimals = 2 if tick == 0.01 else 3
+    mid = rng.randint(1, 10 ** decimals - 1) / 10 ** decimals
+    book = {'bids': _side(rng, mid, tick, decimals, -1), 'asks': _side(rng, mid, tick, decimals, 1)}
+    row = {
+        'question': f"Market {i}?",
+        'neg_risk': False,
+        'tokens': [{'token_id': str(i), 'outcome': 'Yes'}, {'token_id': f"n{i}", 'outcome': 'No'}],
+        'rewards': {'min_size': 50, 'max_spread': rng.choice([0.5, 1, 3, 3.5, 4.5]),
+                    'rates': [{'asset_address': USDC, 'rewards_daily_rate': rng.choice([1, 10, 25.5, 100])}]},
+        'minimum_tick_size': tick,
+        'end_date_iso': '2026-01-01',
+        'market_slug': f"market-{i}",
+        'condition_id': f"0x{i:04x}",
+    }
+    return row, book
+
+
+def _same(a, b):
+    if isinstance(b, float) and math.isnan(b):
+        return isinstance(a, float) and math.isnan(a)
+    return a == b and type(a) == type(b)
+
+
+def test_estimate_rewards_matches_process_single_row():
+    rng = random.Random(7)
+    rows, books = [], {}
+    for i in range(600):
+        row, book = _market(rng, i)
+        rows.append(row)
+        books[str(i)] = book
+    del books['42']
+
+    results, missing = find_markets.estimate_rewards(rows, books)
+
+    assert missing == 1
+    expected = [find_markets.process_single_row(row, None, books[row['tokens'][0]['token_id']])
+                for row in rows if row['tokens'][0]['token_id'] in books]
+    assert len(results) == len(expected)
+    for result, reference in zip(results, expected):
+        assert list(result) == list(reference)
+        mismatched = [key for key in result if not _same(result[key], reference[key])]
+        assert mismatched == [], (result['question'], mismatched)
+
+
+def test_tick_grids_match_generate_numbers():
+    rng = random.Random(11)
+    cases = [(0, 0.05, 0.01), (0.3, 0.35, 0.01), (0.125, 0.2, 0.01), (0.5, 0.5, 0.01), (0.42, 0.43, 0.001)]
+    cases += [(round(rng.random(), 3), round(rng.random(), 3), rng.choice([0.01, 0.001])) for _ in range(300)]
+
+    starts = [find_markets.grid_start(start, end, tick) for start, end, tick in cases]
+    first_prices, first_ticks, steps, scales = zip(*starts)
+    market_index, prices = tick_grids(first_prices, first_ticks, steps, scales, [end for _, end, _ in cases])
+
+    for i, (start, end, tick) in enumerate(cases):
+        assert list(prices[market_index == i]) == find_markets.generate_numbers(start, end, tick)
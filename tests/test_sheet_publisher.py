@@ -0,0 +1,120 @@
+"""
+Tests for diff-based publishing of the market scan to the database and sheet.
+"""
+import re
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import SessionLocal, MarketScanRow, init_db
+from data_updater.sheet_publisher import save_scan, publish, column_letter
+
+SHEET = "Test Scan Sheet"
+
+
+class FakeWorksheet:
+    """Grid of cell values that applies A1-range batch updates"""
+
+    def __init__(self, title, values=None):
+        self.title = title
+        self.grid = [list(row) for row in (values or [])]
+        self.row_count = max(len(self.grid), 100)
+        self.col_count = 26
+        self.updates = []
+
+    def get_all_values(self):
+        return [[str(value) for value in row] for row in self.grid]
+
+    def resize(self, rows=None, cols=None):
+        self.row_count, self.col_count = rows or self.row_count, cols or self.col_count
+
+    def batch_update(self, data, value_input_option=None):
+        assert value_input_option == 'USER_ENTERED'
+        self.updates.append(data)
+        for item in data:
+            first_col, first_row = re.match(r'([A-Z]+)(\d+):', item['range']).groups()
+            col0 = sum((ord(c) - 64) * 26 ** i for i, c in enumerate(reversed(first_col))) - 1
+            for r, values in enumerate(item['values']):
+                row = int(first_row) - 1 + r
+                while len(self.grid) <= row:
+                    self.grid.append([])
+                line = self.grid[row]
+                line.extend([""] * (col0 + len(values) - len(line)))
+                line[col0:col0 + len(values)] = values
+
+    def rows(self):
+        """Grid without trailing blanks"""
+        rows = [list(row) for row in self.grid]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+
+@pytest.fixture
+def db_session():
+    init_db()
+    db = SessionLocal()
+    yield db
+    db.query(MarketScanRow).filter(MarketScanRow.sheet == SHEET).delete()
+    db.commit()
+    db.close()
+
+
+def _frame(count):
+    return pd.DataFrame({
+        'question': [f"Market {i}?" for i in range(count)],
+        'gm_reward_per_100': np.round(np.linspace(0.5, 3, count), 2),
+        'volatility_sum': [np.nan if i == 3 else float(i) for i in range(count)],
+        'neg_risk': [i % 2 == 0 for i in range(count)],
+        'condition_id': [f"0x{i:03x}" for i in range(count)],
+    })
+
+
+def _sheet_rows(df):
+    return [list(df.columns)] + [[q, g, "" if pd.isnull(v) else v, n, c] for q, g, v, n, c in df.itertuples(index=False)]
+
+
+def test_publish_sends_only_changed_rows(db_session):
+    # The sheet already holds an older, longer scan
+    worksheet = FakeWorksheet(SHEET, [['old'] * 7 for _ in range(60)])
+    df = _frame(40)
+
+    assert save_scan(SHEET, df, db_session) == 41
+    first = publish(SHEET, worksheet, db_session)
+    assert first['rows'] == 60
+    assert worksheet.rows() == _sheet_rows(df)
+
+    # Unchanged scan: nothing is written
+    worksheet.updates.clear()
+    assert save_scan(SHEET, df, db_session) == 0
+    assert publish(SHEET, worksheet, db_session) == {'rows': 0, 'ranges': 0, 'requests': 0}
+    assert worksheet.updates == []
+
+    # Two adjacent rows and one far away change; the scan shrinks by five rows
+    df.loc[10, 'gm_reward_per_100'] = 9.99
+    df.loc[11, 'gm_reward_per_100'] = 8.88
+    df.loc[30, 'question'] = "Renamed?"
+    df = df.iloc[:35]
+    assert save_scan(SHEET, df, db_session) == 3 + 5
+    stats = publish(SHEET, worksheet, db_session)
+
+    ranges = [item['range'] for item in worksheet.updates[0]]
+    assert ranges == ['B12:B13', 'A32:A32', 'A37:E41']
+    assert stats == {'rows': 8, 'ranges': 3, 'requests': 1}
+    assert worksheet.rows() == _sheet_rows(df) and worksheet.rows()[11][1] == 9.99
+
+    # Removed rows are gone from the table once cleared from the sheet
+    assert db_session.query(MarketScanRow).filter(MarketScanRow.sheet == SHEET).count() == 36
+
+
+def test_column_letters():
+    assert [column_letter(col) for col in (1, 26, 27, 52, 703)] == ['A', 'Z', 'AA', 'AZ', 'AAA']
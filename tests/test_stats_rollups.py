@@ -0,0 +1,122 @@
+"""
+Tests for the daily performance rollups behind the stats API.
+"""
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import (SessionLocal, AsyncSessionLocal, async_engine, Market, TradingParams,
+                      Position, Order, DailyMarketStats, MarketPnlTotals, init_db)
+from api.stats import get_daily_performance, get_pnl_breakdown, get_stats
+
+
+@pytest.fixture
+def db_session():
+    init_db()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def market(db_session):
+    """Market whose rollups and child rows are removed afterwards"""
+    market = Market(condition_id="rollup_condition_1", question="Rollup Market?",
+                    answer1="YES", answer2="NO", token1="777000111", token2="777000222")
+    db_session.add(market)
+    db_session.flush()
+    db_session.add(TradingParams(market_id=market.id))
+    db_session.commit()
+
+    yield market
+
+    for model in (DailyMarketStats, MarketPnlTotals, Position, Order):
+        db_session.query(model).filter(model.market_id == market.id).delete()
+    db_session.delete(market)
+    db_session.commit()
+
+
+def _call(endpoint, **kwargs):
+    """Run an async endpoint with its own async session"""
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return await endpoint(db=db, **kwargs)
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(run())
+
+
+def _today():
+    return datetime.utcnow().strftime('%Y-%m-%d')
+
+
+class TestStatsRollups:
+    """Rollups follow order fills and position PnL"""
+
+    def test_fill_updates_daily_rollup(self, db_session, market):
+        """An order reaching FILLED counts once with its filled volume"""
+        order = Order(market_id=market.id, order_id="rollup_order", token_id="777000111",
+                      side_type="BUY", price=0.5, size=10.0, status="PENDING")
+        db_session.add(order)
+        db_session.commit()
+
+        order.filled_size = 10.0
+        order.status = 'FILLED'
+        db_session.commit()
+        order.filled_size = 10.0  # no-op update
+        db_session.commit()
+
+        daily = db_session.query(DailyMarketStats).filter_by(market_id=market.id, day=_today()).one()
+        assert daily.fills == 1
+        assert daily.volume == pytest.approx(5.0)
+        assert order.filled_at is not None
+
+    def test_position_pnl_deltas_accumulate(self, db_session, market):
+        """Realized/unrealized changes are added as deltas to day and totals"""
+        position = Position(market_id=market.id, token_id="777000111", size=10.0,
+                            avg_price=0.5, realized_pnl=1.0, unrealized_pnl=2.0)
+        db_session.add(position)
+        db_session.commit()
+
+        position.realized_pnl = 3.0
+        position.unrealized_pnl = 0.5
+        db_session.commit()
+
+        totals = db_session.query(MarketPnlTotals).filter_by(market_id=market.id).one()
+        assert (totals.realized_pnl, totals.unrealized_pnl) == (3.0, 0.5)
+
+        breakdown = _call(get_pnl_breakdown)['breakdown']
+        entry = next(b for b in breakdown if b['market_id'] == market.id)
+        assert entry['total_pnl'] == 3.5
+
+    def test_daily_endpoint_reads_rollups(self, db_session, market):
+        """/performance/daily returns one entry per day, oldest first"""
+        db_session.add(Position(market_id=market.id, token_id="777000222", size=1.0,
+                                avg_price=0.5, realized_pnl=4.0))
+        db_session.commit()
+
+        performance = _call(get_daily_performance, days=3)['performance']
+
+        assert len(performance) == 3
+        assert performance[-1]['date'] == _today()
+        assert performance[-1]['pnl'] >= 4.0
+
+    def test_stats_use_rollups(self, db_session, market):
+        """/api/stats totals include the market's rollup PnL"""
+        db_session.add(Position(market_id=market.id, token_id="777000111", size=2.0,
+                                avg_price=0.5, realized_pnl=1.5, unrealized_pnl=0.5))
+        db_session.commit()
+
+        stats = _call(get_stats)
+
+        assert stats.total_pnl >= 2.0
+        assert stats.total_positions >= 1
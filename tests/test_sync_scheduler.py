@@ -0,0 +1,98 @@
+"""
+Tests for the asyncio periodic state synchronizer.
+"""
+import asyncio
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import poly_data.sync_scheduler as sync_scheduler
+from poly_data.sync_scheduler import PeriodicSyncScheduler, SyncJob, spawn
+
+
+class TestSyncJob:
+    """Tests for SyncJob interval handling"""
+
+    def test_next_delay_within_jitter(self):
+        """Delay stays within +/- jitter of the interval"""
+        job = SyncJob('positions', 10.0, fetch=None, jitter=0.2)
+        for _ in range(100):
+            assert 8.0 <= job.next_delay() <= 12.0
+
+
+class TestPeriodicSyncScheduler:
+    """Tests for PeriodicSyncScheduler"""
+
+    def test_apply_runs_on_loop_thread(self):
+        """Fetch may run in a worker thread, apply must run on the loop thread"""
+        seen = {}
+
+        def blocking_fetch():
+            seen['fetch_thread'] = threading.get_ident()
+            return 42
+
+        async def fetch():
+            return await asyncio.to_thread(blocking_fetch)
+
+        def apply(result):
+            seen['apply_thread'] = threading.get_ident()
+            seen['result'] = result
+
+        async def run():
+            seen['loop_thread'] = threading.get_ident()
+            scheduler = PeriodicSyncScheduler()
+            scheduler.add_job('orders', 5.0, fetch, apply)
+            await scheduler.run_once('orders')
+            await scheduler.stop()
+            return scheduler.get_stats()
+
+        stats = asyncio.run(run())
+
+        assert seen['result'] == 42
+        assert seen['apply_thread'] == seen['loop_thread']
+        assert seen['fetch_thread'] != seen['loop_thread']
+        assert stats['orders']['runs'] == 1
+
+    def test_failing_job_does_not_stop_others(self):
+        """An exception in one job is counted and the other jobs keep running"""
+        applied = []
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        async def ok():
+            return 'ok'
+
+        async def run():
+            scheduler = PeriodicSyncScheduler()
+            scheduler.add_job('bad', 0.01, failing, jitter=0)
+            scheduler.add_job('good', 0.01, ok, applied.append, jitter=0)
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            await scheduler.stop()
+            return scheduler.get_stats()
+
+        stats = asyncio.run(run())
+
+        assert stats['bad']['errors'] > 0
+        assert stats['good']['runs'] > 0
+        assert applied and all(item == 'ok' for item in applied)
+
+    def test_spawned_tasks_are_held_and_failures_logged(self, capsys):
+        """Background tasks stay referenced until done and their errors are printed"""
+        async def requote():
+            await asyncio.sleep(0.01)
+            raise ValueError("order rejected")
+
+        async def run():
+            task = spawn(requote(), "requote m1")
+            assert task in sync_scheduler._background_tasks
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        assert not sync_scheduler._background_tasks
+        assert "requote m1" in capsys.readouterr().out
@@ -270,38 +270,25 @@ async def perform_trade(market):
                 # Fallback to dataframe if service layer fails
                 print(f"⚠️  Could not use service layer for market lookup: {e}, falling back to dataframe")
             
-            # Check if market exists in dataframe (fallback or primary if service layer not available)
-            if global_state.df.empty:
+            # Only market config (df, params, reverse_tokens) is read from this
+            # snapshot for the whole pass. Positions and orders are read live via
+            # get_position/get_order on purpose: the pass changes them itself (merges
+            # below, order placement) and must see fills that arrive meanwhile.
+            state = global_state.snapshot()
+            if state.df.empty:
                 if not market_obj:
                     print(f"⚠️  perform_trade called for {market} but no markets loaded in dataframe and service layer returned None")
-                    return
-            else:
-                market_rows = global_state.df[global_state.df['condition_id'] == market]
-                if market_rows.empty:
-                    if not market_obj:
-                        print(f"⚠️  perform_trade called for {market} but market not found in dataframe or service layer")
-                        print(f"   Available markets: {global_state.df['condition_id'].tolist() if not global_state.df.empty else 'None'}")
-                        return
                 else:
-                    # Get market details from the configuration
-                    row = market_rows.iloc[0]
-            
-            # If we got market from service layer but not from dataframe, try to use service layer data
-            # For now, we still need dataframe format, so we'll use dataframe as primary source
-            # but validate with service layer
-            if market_obj and global_state.df.empty:
-                print(f"⚠️  Market found in service layer but dataframe is empty. Cannot proceed without dataframe format.")
+                    print(f"⚠️  Market found in service layer but dataframe is empty. Cannot proceed without dataframe format.")
                 return
-            
-            # Get market details from the configuration (use dataframe as primary source for now)
-            if not global_state.df.empty:
-                market_rows = global_state.df[global_state.df['condition_id'] == market]
-                if market_rows.empty:
+
+            row = state.market_row(market)
+            if row is None:
+                if not market_obj:
+                    print(f"⚠️  perform_trade called for {market} but market not found in dataframe or service layer")
+                    print(f"   Available markets: {list(state.market_index)}")
+                else:
                     print(f"⚠️  Market not found in dataframe")
-                    return
-                row = market_rows.iloc[0]
-            else:
-                print(f"⚠️  Cannot proceed: dataframe is empty")
                 return
             print(f"🔍 Processing trade for market: {row['question']} (ID: {market})")
             trade_log_only_file("PROCESS_MARKET", "Processing market", market=market[:42], question=row.get('question', '')[:80])      
@@ -309,7 +296,7 @@ async def perform_trade(market):
             round_length = len(str(row['tick_size']).split(".")[1])
 
             # Get trading parameters for this market type
-            params = global_state.params[row['param_type']]
+            params = state.params[row['param_type']]
             
             # Create a list with both outcomes for the market
             deets = [
@@ -477,7 +464,7 @@ async def perform_trade(market):
                       f"Bid Price: {bid_price}, Ask Price: {ask_price}, Mid Price: {mid_price}")
 
                 # Get position for the opposite token to calculate total exposure
-                other_token = global_state.REVERSE_TOKENS[str(token)]
+                other_token = state.reverse_tokens[str(token)]
                 other_position = get_position(other_token)['size']
                 
                 # Calculate how much to buy or sell based on our position
@@ -766,7 +753,7 @@ async def perform_trade(market):
                             client.cancel_all_asset(order['token'])
                         else:
                             # Check for reverse position (holding opposite outcome)
-                            rev_token = global_state.REVERSE_TOKENS[str(token)]
+                            rev_token = state.reverse_tokens[str(token)]
                             rev_pos = get_position(rev_token)
 
                             # If we have significant opposing position, don't buy more
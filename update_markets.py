@@ -3,7 +3,7 @@ import pandas as pd
 from data_updater.trading_utils import get_clob_client
 from data_updater.google_utils import get_spreadsheet
 from data_updater.find_markets import get_sel_df, get_all_markets, get_all_results, get_markets, add_volatility_to_df
-from gspread_dataframe import set_with_dataframe
+from data_updater.sheet_publisher import save_scan, publish
 import traceback
 
 # Initialize global variables
@@ -16,23 +16,14 @@ wk_vol = spreadsheet.worksheet("Volatility Markets")
 sel_df = get_sel_df(spreadsheet, "Selected Markets")
 
 def update_sheet(data, worksheet):
-    all_values = worksheet.get_all_values()
-    existing_num_rows = len(all_values)
-    existing_num_cols = len(all_values[0]) if all_values else 0
-
-    num_rows, num_cols = data.shape
-    max_rows = max(num_rows, existing_num_rows)
-    max_cols = max(num_cols, existing_num_cols)
-
-    # Create a DataFrame with the maximum size and fill it with empty strings
-    padded_data = pd.DataFrame('', index=range(max_rows), columns=range(max_cols))
-
-    # Update the padded DataFrame with the original data and its columns
-    padded_data.iloc[:num_rows, :num_cols] = data.values
-    padded_data.columns = list(data.columns) + [''] * (max_cols - num_cols)
-
-    # Update the sheet with the padded DataFrame, including column headers
-    set_with_dataframe(worksheet, padded_data, include_index=False, include_column_header=True, resize=True)
+    """
+    Save the frame to the database and publish only the rows that changed
+    since the last publish to the worksheet.
+    """
+    saved = save_scan(worksheet.title, data)
+    stats = publish(worksheet.title, worksheet)
+    print(f'{worksheet.title}: {saved} rows changed in DB, {stats["rows"]} rows written to the sheet '
+          f'in {stats["ranges"]} ranges ({stats["requests"]} requests)')
 
 def sort_df(df):
     # Calculate the mean and standard deviation for each column